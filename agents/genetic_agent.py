@@ -1,9 +1,14 @@
+import copy
+
 import numpy as np
-import torch as T
 import torch.nn as nn
 from pysnakegym.game import SnakeGameSequencePlayer, GameSequence
 from pysnakegym.mdp import MDP
 
+from environment import Episode, SeededRandom, replay
+from environment.termination import LOOPED, STARVED, LoopDetector, Termination
+from evolution.inference import NumpyFFNN
+
 
 class GeneticAgent(object):
     fitness = 0
@@ -13,12 +18,37 @@ class GeneticAgent(object):
     time_alive = 0
     generation_fitness = []
     game_sequences = []
+    episode = None
+    genome_index = None
 
-    def __init__(self, mdp: MDP, neural_network: nn.Module, mutation_rate: float):
+    def __init__(self, mdp: MDP, neural_network: nn.Module, mutation_rate: float, termination: Termination = None):
         self.mdp = mdp
         self.neural_network = neural_network
         self.mutation_rate = mutation_rate
+        self.termination = termination if termination is not None else Termination()
         self.n_weights = len(self.get_genome())
+        self.actions = []
+        self.random = SeededRandom()
+        self.loop_detector = LoopDetector()
+        # the numpy copy of the network that chooses the actions. It is copied again by start_episode, set_genome and
+        # set_model. A network that is changed in place in between, e.g. through the genome matrix of a population,
+        # chooses the actions of its old weights until the next game starts.
+        self.inference = None
+
+    def __deepcopy__(self, memo):
+        # the layers of the network can be views into the genome matrix of a population, copying them directly would
+        # copy the whole matrix. Only the part of the matrix that belongs to this agent is copied.
+        for layer in self.neural_network.layers():
+            for parameter in [layer.weight, layer.bias]:
+                if id(parameter) not in memo:
+                    memo[id(parameter)] = nn.Parameter(parameter.data.clone(), parameter.requires_grad)
+
+        agent = GeneticAgent.__new__(GeneticAgent)
+        memo[id(self)] = agent
+        for key, value in self.__dict__.items():
+            setattr(agent, key, copy.deepcopy(value, memo))
+        agent.inference = None
+        return agent
 
     def get_genome(self):
         """
@@ -35,20 +65,26 @@ class GeneticAgent(object):
             reshaped_genome.append(gene.reshape(size))
 
         self.neural_network.set_layer_data(reshaped_genome)
+        self.inference = None
 
     def set_model(self, state_dict):
         self.neural_network.load_state_dict(state_dict)
+        self.inference = None
 
     def _calc_genome_index(self, size):
         w, h = size
         return w * h
 
     def choose_action(self, observation):
-        action = np.array([0, 0, 0])
-        state = T.tensor([observation]).to(self.neural_network.device)
-        actions = self.neural_network.forward(state.float())
-        action[T.argmax(actions).item()] = 1
-        return action
+        """
+        Chooses the action with the highest value of the network of this agent. The forward pass is computed by a numpy
+        copy of the network, which is much faster than torch for a single observation.
+        :param observation: the state of the MDP
+        :return: the one hot encoded action, a read only numpy array
+        """
+        if self.inference is None:
+            self.inference = NumpyFFNN.from_network(self.neural_network)
+        return self.inference.choose_action(observation)
 
     def mutate(self):
         pass
@@ -59,32 +95,105 @@ class GeneticAgent(object):
         :param fitness: a function that calculates the fitness of this snake
         :return:
         """
-        self.fitness = fitness(self.mdp)
+        self.fitness = fitness(self.episode)
         self.generation_fitness.append(self.fitness)
 
-    def simulate(self):
-        state, reward, done = self.mdp.reset()
-        self.game_sequences = []
-        self.game_sequences.append(self.mdp.environment.get_sequence())
+    def simulate(self, seed: int = None):
+        """
+        Plays a single game.
+        :param seed: the seed of the random numbers of the game. None uses the global random state and the game cannot
+        be replayed.
+        :return: this agent
+        """
+        state = self.start_episode(seed)
+        done = False
 
         while not done:
             action = self.choose_action(state)
-            state_, reward, done = self.mdp.step(action=action)
-            self.game_sequences.append(self.mdp.environment.get_sequence())
-            self.time_alive += 1
-            state = state_
+            state, done = self.take_action(action)
 
-        self.food_eaten = self.mdp.env_score()
         return self
 
+    def start_episode(self, seed: int = None) -> np.array:
+        """
+        Resets the MDP of this agent and starts recording a new game. Only the seed and the actions of the game are
+        recorded, its game sequences are re-simulated from them when they are needed.
+        :param seed: the seed of the random numbers of the game. None uses the global random state and the game cannot
+        be replayed.
+        :return: the start state of the MDP
+        """
+        self.random = SeededRandom(seed)
+        # the genome of this agent may have changed since its last game
+        self.inference = NumpyFFNN.from_network(self.neural_network)
+        state, reward, done = self.random.reset(self.mdp)
+        self.game_sequences = []
+        self.actions = []
+        if self.termination.loop_detection:
+            self.loop_detector = LoopDetector()
+            self.loop_detector.reset(self._game_state())
+        return state
+
+    def take_action(self, action: np.array) -> (np.array, bool):
+        """
+        Takes a single step in the MDP of this agent and records it.
+        :param action: the one hot encoded action to be taken
+        :return: a tuple containing the new state and whether the game is over
+        """
+        state, reward, done = self.mdp.step(action=action)
+        self.actions.append(int(np.argmax(action)))
+        self.time_alive += 1
+
+        termination = None if done else self._terminate()
+        if done or termination is not None:
+            actions = np.array(self.actions, dtype=np.int8) if self.random.seed is not None else None
+            self.finish_episode(Episode.from_mdp(self.mdp, self.random.seed, actions, termination))
+        return state, done or termination is not None
+
+    def _terminate(self):
+        """
+        Checks whether the Termination of this agent ends the running game early.
+        :return: the reason why the game is ended, or None if it continues
+        """
+        game = self.mdp.environment
+        if self.termination.starved(game.n_steps_without_food(), len(game.snake_position())):
+            return STARVED
+
+        if self.termination.loop_detection:
+            if game.ate_food:
+                self.loop_detector.reset(self._game_state())
+            elif self.loop_detector.is_loop(self._game_state()):
+                return LOOPED
+        return None
+
+    def _game_state(self) -> bytes:
+        # the body, the direction in which the snake moves, and the food determine the rest of a game
+        game = self.mdp.environment
+        food = game.food_position()
+        return game.snake_position().tobytes() + game.grid.snake().previous_delta.tobytes() + \
+            np.array([food.x, food.y]).tobytes()
+
+    def finish_episode(self, episode: Episode):
+        """
+        Stores the outcome of a game that was played by this agent.
+        :param episode: the outcome of the game
+        :return:
+        """
+        self.episode = episode
+        self.food_eaten = episode.env_score()
+
     def replay(self):
         player = SnakeGameSequencePlayer(20)
-        for sequence in self.game_sequences:
+        for sequence in self.get_replay():
             player.add(sequence)
 
         player.play()
 
     def get_replay(self) -> [GameSequence]:
+        # games are not recorded step by step but re-simulated from their seed and actions when they are needed
+        if not self.game_sequences and self.episode is not None and self.episode.is_replayable():
+            environment = self.mdp.environment
+            self.game_sequences = replay(self.episode, environment.screen_width, environment.screen_height,
+                                         environment.snake_size)
         return self.game_sequences
 
     def reset(self):
@@ -93,4 +202,5 @@ class GeneticAgent(object):
         self.eps_moves = 0
         self.food_eaten = 0
         self.time_alive = 0
+        self.episode = None
         self.mdp.reset()
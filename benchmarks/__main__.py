@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import sys
+
+from benchmarks import suite
+from util.io.loader.json_loader import JsonLoader
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+
+    parser.add_argument("-hp", "--hyper_params", nargs='?', type=str, default="hyper_params.json", help="the hyper parameters json file from which the populations and the network shape are taken")
+    parser.add_argument("-o", "--output", nargs='?', type=str, default="benchmarks/results.json", help="the json file to which the results are written")
+    parser.add_argument("-b", "--baseline", nargs='?', type=str, default=None, help="a results json file of an earlier run to compare the results with")
+    parser.add_argument("-t", "--threshold", nargs='?', type=float, default=0.2, help="the fraction by which a benchmark may be slower than in the baseline before it is a regression")
+    parser.add_argument("--min_difference", nargs='?', type=float, default=0.001, help="the seconds by which a benchmark must be slower than in the baseline before it is a regression")
+    parser.add_argument("-r", "--repeats", nargs='?', type=int, default=5, help="the number of times every benchmark is run")
+    parser.add_argument("--population_sizes", nargs='+', type=int, default=[10, 100], help="the population sizes of the grid")
+    parser.add_argument("--networks", nargs='+', type=str, default=None, help="additional hidden layers of the grid, e.g. 22 16x8")
+    parser.add_argument("--board_sizes", nargs='+', type=int, default=[200, 400], help="the board widths in pixels of the grid")
+    parser.add_argument("--simulation_modes", nargs='+', type=str, default=["SERIAL", "BATCHED", "VECTORIZED"], help="the simulation modes whose games are timed")
+    parser.add_argument("--genome_dtypes", nargs='*', type=str, default=["FLOAT32", "FLOAT16", "INT8"], help="the genome dtypes whose memory and fitness are compared, none skips the comparison")
+    parser.add_argument("--fitness_generations", nargs='?', type=int, default=10, help="the number of generations of the runs that compare the genome dtypes")
+
+    args = parser.parse_args()
+    loader = JsonLoader(args.hyper_params)
+    if not loader.load():
+        exit(1)
+
+    params = loader.get_data()
+    networks = [params["neural_network"]]
+    for network in args.networks or []:
+        hidden_layers = [int(layer) for layer in network.split("x")]
+        if hidden_layers not in networks:
+            networks.append(hidden_layers)
+
+    results = suite.run(params, args.population_sizes, networks, args.board_sizes, args.simulation_modes, args.repeats,
+                        genome_dtypes=args.genome_dtypes, fitness_generations=args.fitness_generations)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as outfile:
+        json.dump(results, outfile, indent=4, sort_keys=True)
+
+    for name, result in sorted(results["results"].items()):
+        print(f"{name:<80} {result['median'] * 1000:>10.2f} ms (min {result['min'] * 1000:.2f} ms)")
+    for genome_dtype, result in results.get("genome_dtypes", {}).items():
+        print(f"genome_dtype[{genome_dtype}]: {result['genome_bytes']} bytes, best fitness {result['best_fitness']:.2f}, "
+              f"final mean fitness {result['final_mean_fitness']:.2f}, {result['generation_seconds'] * 1000:.2f} ms per generation")
+    print(f"Results written to {args.output}")
+
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            regressions = suite.compare(results, json.load(baseline_file), args.threshold, args.min_difference)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression['name']}: {regression['baseline'] * 1000:.2f} ms -> {regression['current'] * 1000:.2f} ms ({regression['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"No benchmark is more than {args.threshold:.0%} slower than the baseline")
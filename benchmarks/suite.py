@@ -0,0 +1,261 @@
+import contextlib
+import itertools
+import os
+import platform
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import torch as T
+
+from evolution import SnakePopulation
+from evolution.hall_of_fame import best_genomes
+from evolution.selection import RankSelection, RouletteWheelSelection, TournamentSelection
+from train import genetic_operators
+from util import GeneticArgumentValidator
+from util.io.export import GameSequenceExporter, GeneticPopulationDataExporter, ModelArchiveExporter
+
+SEED = 0
+
+# the phases of a generation in the order in which they are run by a Generational algorithm
+PHASES = ["calculate_fitness", "candidate_selection", "crossover", "mutate_children", "replace"]
+
+SELECTIONS = {
+    "ROULETTE": (RouletteWheelSelection, {}),
+    "RANK": (RankSelection, {"bias": 1.5}),
+    "TOURNAMENT": (TournamentSelection, {"tournament_size": 0.2}),
+}
+
+
+@contextlib.contextmanager
+def quiet():
+    # the progress bars and prints of the population would drown the results
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        yield
+
+
+class Timer:
+    """
+    Class that collects the durations of repeated runs of the benchmarks. The duration of a benchmark is summarised by
+    the median and the minimum of its runs, as the median is robust to outliers and the minimum is the run with the
+    least interference.
+    """
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextlib.contextmanager
+    def time(self, name: str):
+        with quiet():
+            start = time.perf_counter()
+            yield
+            duration = time.perf_counter() - start
+        self.durations.setdefault(name, []).append(duration)
+
+    def results(self) -> Dict:
+        return {name: {"median": float(np.median(durations)), "min": float(np.min(durations)),
+                       "repeats": len(durations)} for name, durations in self.durations.items()}
+
+
+def _seed(seed: int = SEED) -> None:
+    random.seed(seed)
+    np.random.seed(seed)
+    T.manual_seed(seed)
+
+
+def _population(params: Dict, pop_size: int, hidden_layers: List[int], board_size: int, simulation_mode: str,
+                genome_dtype: str = "FLOAT32", seed: int = SEED) -> SnakePopulation:
+    arg_validator = GeneticArgumentValidator()
+    return SnakePopulation(pop_size=pop_size, hidden_layers=hidden_layers,
+                           fitness_func=arg_validator.get_fitness_func(params["fitness_function"]), show_game=False,
+                           screen_width=board_size, screen_height=board_size, snake_size=params["snake_size"],
+                           simulation_mode=simulation_mode, seed=seed, genome_dtype=genome_dtype,
+                           **genetic_operators(arg_validator, params))
+
+
+def benchmark_generation(timer: Timer, case: str, params: Dict, pop_size: int, hidden_layers: List[int],
+                         board_size: int, simulation_modes: List[str], repeats: int) -> SnakePopulation:
+    """
+    Times every phase of repeated generations of a population. The games are timed for every simulation mode, the other
+    phases only for the population of the first mode, as they do not depend on how the games were played.
+    :return: the population of the first simulation mode after its generations, which is used by the exporters
+    """
+    populations = []
+    for simulation_mode in simulation_modes:
+        _seed()
+        population = _population(params, pop_size, hidden_layers, board_size, simulation_mode)
+        with timer.time(f"initialise_population/{case}"):
+            population.initialise_population()
+        populations.append(population)
+
+    for _ in range(repeats):
+        for simulation_mode, population in zip(simulation_modes, populations):
+            with timer.time(f"simulate[{simulation_mode}]/{case}"):
+                population.simulate()
+
+        population = populations[0]
+        for phase in PHASES:
+            with timer.time(f"{phase}/{case}"):
+                getattr(population, phase)()
+        with quiet():
+            for other in populations[1:]:
+                for phase in PHASES:
+                    getattr(other, phase)()
+            for other in populations:
+                other.reset()
+
+    for other in populations[1:]:
+        other.close()
+    return populations[0]
+
+
+def benchmark_selections(timer: Timer, pop_size: int, repeats: int) -> None:
+    fitness = np.random.default_rng(SEED).random(pop_size) * 100
+    for name, (selection_class, params) in SELECTIONS.items():
+        selection = selection_class(params)
+        _seed()
+        for _ in range(repeats):
+            with timer.time(f"select[{name}]/pop={pop_size}"):
+                # a generation selects as many parents as there are individuals, repeated to be measurable
+                for _ in range(100):
+                    selection.select(fitness, pop_size)
+
+
+def benchmark_exporters(timer: Timer, case: str, population: SnakePopulation, repeats: int) -> None:
+    best = population.best_individual
+    sequences = best.get_replay()
+    with tempfile.TemporaryDirectory() as path:
+        for _ in range(repeats):
+            with timer.time(f"export[population_data]/{case}"):
+                GeneticPopulationDataExporter(path).export(population.population_data)
+            with timer.time(f"export[model_archive]/{case}"):
+                ModelArchiveExporter(path).export_genomes(population.hall_of_fame.features,
+                                                          best_genomes([population.hall_of_fame], population.generation))
+            with timer.time(f"export[game_sequence]/{case}"):
+                GameSequenceExporter(path).export(sequences)
+
+
+def benchmark_genome_dtypes(params: Dict, pop_size: int, hidden_layers: List[int], board_size: int,
+                            simulation_mode: str, genome_dtypes: List[str], generations: int, repeats: int) -> Dict:
+    """
+    Evolves populations whose genomes are stored in every dtype from the same seeds, so that the fitness that is lost by
+    the rounding of a compact dtype can be compared with its memory.
+    :param genome_dtypes: the dtypes of the genomes that are compared
+    :param generations: the number of generations of every run
+    :param repeats: the number of runs of every dtype, each with its own seed
+    :return: a dictionary with the bytes of the genome matrix, the mean of the best fitness of every run, the mean of
+    the mean fitness of the last generation of every run, and the median seconds of a generation of every dtype
+    """
+    results = {}
+    for genome_dtype in genome_dtypes:
+        best_fitness, final_fitness, durations = [], [], []
+        for repeat in range(repeats):
+            _seed(SEED + repeat)
+            population = _population(params, pop_size, hidden_layers, board_size, simulation_mode, genome_dtype,
+                                     SEED + repeat)
+            with quiet():
+                population.initialise_population()
+                start = time.perf_counter()
+                for generation in range(generations):
+                    population.simulate()
+                    for phase in PHASES:
+                        getattr(population, phase)()
+                    if generation < generations - 1:
+                        population.reset()
+                durations.append((time.perf_counter() - start) / generations)
+            best_fitness.append(max(population.hall_of_fame.fitness(i) for i in range(len(population.hall_of_fame))))
+            final_fitness.append(population.population_data.get_generational_data()[:, -1].mean())
+            genome_bytes = population.genomes.nbytes()
+            population.close()
+
+        results[genome_dtype] = {"genome_bytes": genome_bytes, "best_fitness": float(np.mean(best_fitness)),
+                                 "final_mean_fitness": float(np.mean(final_fitness)),
+                                 "generation_seconds": float(np.median(durations))}
+    return results
+
+
+def run(params: Dict, pop_sizes: List[int], networks: List[List[int]], board_sizes: List[int],
+        simulation_modes: List[str], repeats: int, progress: Callable[[str], None] = print,
+        genome_dtypes: List[str] = None, fitness_generations: int = 10) -> Dict:
+    """
+    Runs all benchmarks over the grid of population sizes, network shapes, and board sizes.
+    :param params: the hyper parameters from which the populations are created
+    :param pop_sizes: the sizes of the populations
+    :param networks: the hidden layers of the networks
+    :param board_sizes: the widths and heights of the boards in pixels
+    :param simulation_modes: the simulation modes whose games are timed
+    :param repeats: the number of times every benchmark is run
+    :param progress: is called with the name of every case before it is run
+    :param genome_dtypes: the dtypes of the genomes whose fitness is compared on the largest population, the first
+    network and the first board. None does not compare them.
+    :param fitness_generations: the number of generations of the runs that compare the genome dtypes
+    :return: a dictionary of the environment of the run, the timings of all benchmarks, and the comparison of the
+    genome dtypes
+    """
+    timer = Timer()
+    for pop_size in pop_sizes:
+        benchmark_selections(timer, pop_size, repeats)
+
+    for pop_size, hidden_layers, board_size in itertools.product(pop_sizes, networks, board_sizes):
+        cells = board_size // params["snake_size"]
+        case = f"pop={pop_size}/net={'x'.join(map(str, hidden_layers))}/board={cells}x{cells}"
+        progress(case)
+        population = benchmark_generation(timer, case, params, pop_size, hidden_layers, board_size, simulation_modes,
+                                          repeats)
+        benchmark_exporters(timer, case, population, repeats)
+        population.close()
+
+    results = {"environment": environment(), "results": timer.results()}
+    if genome_dtypes:
+        progress(f"genome dtypes {', '.join(genome_dtypes)}")
+        simulation_mode = "VECTORIZED" if "VECTORIZED" in simulation_modes else simulation_modes[0]
+        results["genome_dtypes"] = benchmark_genome_dtypes(params, max(pop_sizes), networks[0], board_sizes[0],
+                                                           simulation_mode, genome_dtypes, fitness_generations, repeats)
+    return results
+
+
+def _version(package: str) -> str:
+    try:
+        from importlib import metadata
+        return metadata.version(package)
+    except ImportError:
+        # importlib.metadata is only available from python 3.8
+        import pkg_resources
+        return pkg_resources.get_distribution(package).version
+
+
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "torch": T.__version__,
+        "pysnakegym": _version("pysnakegym"),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, min_difference: float = 0.001) -> List[Dict]:
+    """
+    Compares the median durations of benchmarks with a baseline. Benchmarks that are missing in either of them are
+    ignored, so the grid of a run does not have to match the grid of the baseline.
+    :param results: the results of a run
+    :param baseline: the results of an earlier run
+    :param threshold: the fraction by which a benchmark may be slower than in the baseline, e.g. 0.2 for 20%
+    :param min_difference: the seconds by which a benchmark must be slower to be a regression, so that the noise of
+    very short benchmarks is not reported
+    :return: a list with the name, baseline, current duration, and ratio of every benchmark that regressed
+    """
+    regressions = []
+    for name, result in sorted(results["results"].items()):
+        if name not in baseline["results"]:
+            continue
+
+        expected = baseline["results"][name]["median"]
+        ratio = result["median"] / expected if expected > 0 else 1.0
+        if ratio > 1 + threshold and result["median"] - expected > min_difference:
+            regressions.append({"name": name, "baseline": expected, "current": result["median"], "ratio": ratio})
+
+    return regressions
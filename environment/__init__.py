@@ -0,0 +1,5 @@
+from environment.batch_snake import BatchSnakeMDP
+from environment.episode import Episode
+from environment.seeding import SeededRandom
+from environment.termination import Termination
+from environment.replay import replay
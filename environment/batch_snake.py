@@ -0,0 +1,343 @@
+import numpy as np
+from pysnakegym.game import GameSequence
+from pysnakegym.game.core import Direction, Food, Snake, SnakeGameSequence
+
+from environment.episode import Episode
+from environment.termination import LOOPED, MAX_STEPS_WITHOUT_FOOD, REASONS, STARVED, Termination
+
+# absolute directions in clockwise order so that turning right adds one and turning left subtracts one
+UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3
+DELTAS = np.array([[0, -1], [1, 0], [0, 1], [-1, 0]])
+
+# the change of the absolute direction for the actions [left, straight, right] of the MDP
+TURNS = np.array([-1, 0, 1])
+
+# the base of the polynomial hash of the bodies of the snakes. It is odd and therefore invertible modulo 2 ** 64
+HASH_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+class BatchSnakeMDP(object):
+    """
+    Class that plays many games of snake at the same time. The boards of all games are held in numpy arrays and every
+    call to step moves all snakes with a single array update. States and rewards are the same as those of the
+    pysnakegym SnakeMDP with a boolean state representation:
+
+    - the state is [up, down, left, right] for the direction of the last move, [left, straight, right] for dangers in
+      the vicinity of the head, and [up, down, left, right] for the direction of the food
+    - eating food is rewarded with 10 and the end of the game with -10
+    - a game ends when the head of the snake leaves the board or touches the body, when the board is full, when the
+      snake went more than 1000 steps without eating, or earlier if the Termination of the MDP ends it
+
+    For loop detection, the body of every snake is hashed with a rolling polynomial hash of random keys of its cells,
+    which is updated with the head and the tail in every step, and combined with keys of the direction and the food.
+
+    Every game draws its food positions from its own random number generator, so a game can be replayed exactly from
+    its seed and its actions.
+    """
+
+    def __init__(self, n_games: int, screen_width: int = 200, screen_height: int = 200, snake_size: int = 20,
+                 seed: int = None, termination: Termination = None):
+        """
+        Constructor for the BatchSnakeMDP class.
+        :param n_games: the number of games that are played at the same time
+        :param screen_width: the width of the screen of a game
+        :param screen_height: the height of the screen of a game
+        :param snake_size: the size of a single snake element
+        :param seed: the seed from which the seeds of the games are drawn when no seeds are passed to reset
+        :param termination: the policy that ends games early. None only ends games when they are over.
+        """
+        self.n_games = n_games
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.snake_size = snake_size
+        self.width = int(screen_width / snake_size)
+        self.height = int(screen_height / snake_size)
+        self.n_cells = self.width * self.height
+        self.max_food = self.n_cells - 1
+        self._seed_generator = np.random.default_rng(seed)
+
+        # the body of every snake is a ring buffer of x,y coordinates where the head is at _head_index and the tail
+        # _length - 1 slots before it
+        self._body = np.zeros((n_games, self.n_cells, 2), dtype=np.int16)
+        self._head_index = np.zeros(n_games, dtype=np.int64)
+        self._length = np.zeros(n_games, dtype=np.int64)
+        self._occupancy = np.zeros((n_games, self.height, self.width), dtype=np.int8)
+        self._direction = np.zeros(n_games, dtype=np.int64)
+        self._previous_head = np.zeros((n_games, 2), dtype=np.int64)
+        self._food = np.zeros((n_games, 2), dtype=np.int64)
+        self._grow = np.zeros(n_games, dtype=bool)
+        self._done = np.zeros(n_games, dtype=bool)
+
+        self._n_steps = np.zeros(n_games, dtype=np.int64)
+        self._score = np.zeros(n_games, dtype=np.int64)
+        self._reward_sum = np.zeros(n_games, dtype=np.float64)
+        self._steps_without_food = np.zeros(n_games, dtype=np.int64)
+
+        self.termination = termination if termination is not None else Termination()
+        self._termination = np.zeros(n_games, dtype=np.int8)
+
+        keys = np.random.default_rng(0)
+        self._cell_keys = keys.integers(0, 2 ** 63, size=self.n_cells, dtype=np.uint64)
+        self._direction_keys = keys.integers(0, 2 ** 63, size=len(DELTAS), dtype=np.uint64)
+        self._food_keys = keys.integers(0, 2 ** 63, size=self.n_cells, dtype=np.uint64)
+        # the hash of every body and HASH_BASE to the power of the length of the body
+        self._body_hash = np.zeros(n_games, dtype=np.uint64)
+        self._hash_power = np.ones(n_games, dtype=np.uint64)
+        # the state that is kept by Brent's algorithm, and the steps after which it is replaced
+        self._kept_hash = np.zeros(n_games, dtype=np.uint64)
+        self._brent_power = np.ones(n_games, dtype=np.int64)
+        self._brent_steps = np.zeros(n_games, dtype=np.int64)
+
+        self.seeds = np.zeros(n_games, dtype=np.int64)
+        self._generators = []
+
+    def reset(self, seeds: np.array = None) -> (np.array, np.array, np.array):
+        """
+        Resets all games to their start state.
+        :param seeds: the seeds of the games. If None, new seeds are drawn.
+        :return: a triplet containing the start states of shape (n_games, 11), the initial rewards, and whether the
+        states are final
+        """
+        if seeds is None:
+            seeds = self._seed_generator.integers(0, np.iinfo(np.int64).max, size=self.n_games)
+        self.seeds = np.asarray(seeds, dtype=np.int64).copy()
+        self._generators = [np.random.default_rng(int(seed)) for seed in self.seeds]
+
+        start = np.array([self.width // 2, self.height // 2])
+        self._body[:] = 0
+        self._body[:, 0] = start
+        self._head_index[:] = 0
+        self._length[:] = 1
+        self._occupancy[:] = 0
+        self._occupancy[:, start[1], start[0]] = 1
+        self._direction[:] = UP
+        self._previous_head[:] = start - DELTAS[UP]
+        self._grow[:] = False
+        self._done[:] = False
+
+        self._n_steps[:] = 0
+        self._score[:] = 0
+        self._reward_sum[:] = 0
+        self._steps_without_food[:] = 0
+        self._termination[:] = 0
+
+        for game in range(self.n_games):
+            self._food[game] = self._random_food(game)
+
+        self._body_hash[:] = self._cell_keys[start[1] * self.width + start[0]]
+        self._hash_power[:] = HASH_BASE
+        self._reset_loops(np.arange(self.n_games))
+
+        return self._states(), np.zeros(self.n_games), self._done.copy()
+
+    def step(self, actions: np.array) -> (np.array, np.array, np.array):
+        """
+        Takes a discrete step in every game that is not over yet.
+        :param actions: the actions as indices of shape (n_games,) or one hot encoded of shape (n_games, 3). The actions
+        of games that are over are ignored.
+        :return: a triplet containing the new states, the rewards obtained from the actions, and whether the new states
+        are final
+        """
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            actions = actions.argmax(axis=1)
+
+        rewards = np.zeros(self.n_games)
+        active = np.flatnonzero(~self._done)
+        if active.size == 0:
+            return self._states(), rewards, self._done.copy()
+
+        direction = (self._direction[active] + TURNS[actions[active]]) % 4
+        head = self._body[active, self._head_index[active]].astype(np.int64)
+        new_head = head + DELTAS[direction]
+        self._direction[active] = direction
+        self._previous_head[active] = head
+
+        # the tail moves along with the head unless the snake ate food in the previous step
+        moving = active[~self._grow[active]]
+        tail = self._body[moving, (self._head_index[moving] - self._length[moving] + 1) % self.n_cells]
+        self._occupancy[moving, tail[:, 1], tail[:, 0]] -= 1
+        growing = active[self._grow[active]]
+        self._length[growing] += 1
+        if self.termination.loop_detection:
+            self._hash_move(active, new_head, moving, tail, growing)
+
+        self._head_index[active] = (self._head_index[active] + 1) % self.n_cells
+        self._body[active, self._head_index[active]] = new_head
+        self._n_steps[active] += 1
+
+        x, y = new_head[:, 0], new_head[:, 1]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        collided = ~inside
+        collided[inside] = self._occupancy[active[inside], y[inside], x[inside]] > 0
+        self._occupancy[active[inside], y[inside], x[inside]] += 1
+
+        ate = ~collided & (new_head == self._food[active]).all(axis=1)
+        self._grow[active] = ate
+        self._score[active] += ate
+        self._steps_without_food[active] = np.where(ate, 0, self._steps_without_food[active] + 1)
+
+        won = ate & (self._score[active] == self.max_food)
+        starved = (self._steps_without_food[active] > MAX_STEPS_WITHOUT_FOOD) | \
+            self.termination.starved(self._steps_without_food[active], self._length[active])
+        looped = np.zeros(len(active), dtype=bool)
+        if self.termination.loop_detection:
+            searching = ~(collided | won | starved | ate)
+            looped[searching] = self._detect_loops(active[searching])
+        done = collided | won | starved | looped
+
+        rewards[active] = np.where(done, -10, np.where(ate, 10, 0))
+        self._reward_sum[active] += rewards[active]
+        self._done[active] = done
+        self._termination[active] = np.select([collided, won, starved, looped], [1, 2, 3, 4], 0)
+
+        for game in active[ate & ~done]:
+            self._food[game] = self._random_food(game)
+        if self.termination.loop_detection:
+            self._reset_loops(active[ate & ~done])
+
+        return self._states(), rewards, self._done.copy()
+
+    def _states(self) -> np.array:
+        """
+        Computes the boolean state of every game.
+        :return: an int numpy array of shape (n_games, 11)
+        """
+        games = np.arange(self.n_games)
+        head = self._body[games, self._head_index].astype(np.int64)
+        x, y = head[:, 0], head[:, 1]
+        previous_x, previous_y = self._previous_head[:, 0], self._previous_head[:, 1]
+        food_x, food_y = self._food[:, 0], self._food[:, 1]
+
+        game_direction = [previous_y > y, previous_y < y, previous_x > x, previous_x < x]
+
+        danger = []
+        for turn in TURNS:
+            vicinity = head + DELTAS[(self._direction + turn) % 4]
+            vicinity_x, vicinity_y = vicinity[:, 0], vicinity[:, 1]
+            inside = (vicinity_x >= 0) & (vicinity_x < self.width) & (vicinity_y >= 0) & (vicinity_y < self.height)
+            occupied = self._occupancy[games, vicinity_y.clip(0, self.height - 1), vicinity_x.clip(0, self.width - 1)]
+            danger.append(~inside | (occupied > 0))
+
+        food_position = [food_y < y, food_y > y, food_x < x, food_x > x]
+
+        return np.stack(game_direction + danger + food_position, axis=1).astype(int)
+
+    def _hash_move(self, active: np.array, new_head: np.array, moving: np.array, tail: np.array,
+                   growing: np.array) -> None:
+        """
+        Updates the hashes of the bodies of the snakes that moved. The new head is added at the front of a body and the
+        tail is removed from its end unless the snake grows.
+        """
+        x, y = new_head[:, 0].clip(0, self.width - 1), new_head[:, 1].clip(0, self.height - 1)
+        self._body_hash[active] = self._body_hash[active] * HASH_BASE + self._cell_keys[y * self.width + x]
+        tail_cells = tail[:, 1].astype(np.int64) * self.width + tail[:, 0]
+        self._body_hash[moving] -= self._cell_keys[tail_cells] * self._hash_power[moving]
+        self._hash_power[growing] *= HASH_BASE
+
+    def _state_hash(self, games: np.array) -> np.array:
+        food_cells = self._food[games, 1] * self.width + self._food[games, 0]
+        return self._body_hash[games] ^ self._direction_keys[self._direction[games]] ^ self._food_keys[food_cells]
+
+    def _reset_loops(self, games: np.array) -> None:
+        self._kept_hash[games] = self._state_hash(games)
+        self._brent_power[games] = 1
+        self._brent_steps[games] = 0
+
+    def _detect_loops(self, games: np.array) -> np.array:
+        """
+        Takes a step of Brent's algorithm in every game, see Termination.
+        :param games: the games in which the snake did not eat
+        :return: whether the current state of each game closes a loop
+        """
+        state = self._state_hash(games)
+        looped = state == self._kept_hash[games]
+        self._brent_steps[games] += 1
+        replace = ~looped & (self._brent_steps[games] == self._brent_power[games])
+        replaced = games[replace]
+        self._kept_hash[replaced] = state[replace]
+        self._brent_power[replaced] *= 2
+        self._brent_steps[replaced] = 0
+        return looped
+
+    def _random_food(self, game: int) -> np.array:
+        """
+        Draws a random position for the food of a game that is neither occupied by the snake nor by the current food.
+        :param game: the index of the game
+        :return: the x,y coordinates of the new food
+        """
+        available = np.flatnonzero(self._occupancy[game].ravel() == 0)
+        if available.size == 0:
+            return self._food[game]
+        y, x = divmod(available[self._generators[game].integers(available.size)], self.width)
+        return np.array([x, y])
+
+    def snake_position(self, game: int) -> np.array:
+        """
+        Gets the position of every element of a snake starting with the head.
+        :param game: the index of the game
+        :return: a numpy array of shape (length, 2)
+        """
+        indices = (self._head_index[game] - np.arange(self._length[game])) % self.n_cells
+        return self._body[game, indices].astype(np.int64)
+
+    def get_sequence(self, game: int) -> GameSequence:
+        """
+        Gets a sequence of a game which can be used to replay the game.
+        :param game: the index of the game
+        :return: a GameSequence object containing the Snake and Food.
+        """
+        position = self.snake_position(game)
+        snake = Snake(start_position=position[0], direction=Direction.STRAIGHT, snake_size=1, grid_slots=self.n_cells)
+        snake.segments[:len(position)] = position
+        snake.tail_index = len(position)
+        food = Food(screen_width=self.width, screen_height=self.height, position=self._food[game].copy())
+        return SnakeGameSequence(snake, food)
+
+    def replay(self, seed: int, actions: np.array) -> [GameSequence]:
+        """
+        Re-simulates a single recorded game on a board of the same size as the boards of this MDP.
+        :param seed: the seed of the recorded game
+        :param actions: the index of the action taken in every step of the recorded game
+        :return: a list of GameSequences, one for the start of the game and one for every step
+        """
+        game = BatchSnakeMDP(1, self.screen_width, self.screen_height, self.snake_size)
+        game.reset(seeds=[seed])
+        sequences = [game.get_sequence(0)]
+        for action in actions:
+            game.step(np.array([action]))
+            sequences.append(game.get_sequence(0))
+
+        return sequences
+
+    def episode(self, game: int) -> Episode:
+        """
+        Gets the outcome of a game.
+        :param game: the index of the game
+        :return: an Episode containing the score, the number of steps, the sum of rewards, and the seed of the game
+        """
+        return Episode(int(self._score[game]), int(self._n_steps[game]), float(self._reward_sum[game]),
+                       seed=int(self.seeds[game]), termination=REASONS[self._termination[game]],
+                       steps_without_food=int(self._steps_without_food[game]))
+
+    def is_done(self) -> np.array:
+        return self._done.copy()
+
+    def reward_sum(self) -> np.array:
+        return self._reward_sum.copy()
+
+    def n_steps(self) -> np.array:
+        return self._n_steps.copy()
+
+    def env_score(self) -> np.array:
+        return self._score.copy()
+
+    def stalled_steps(self) -> np.array:
+        stalled = np.isin(self._termination, [REASONS.index(STARVED), REASONS.index(LOOPED)])
+        return np.where(stalled, self._steps_without_food, 0)
+
+    def state_dims(self) -> (int, int):
+        return 11, 1
+
+    def n_actions(self) -> int:
+        return Direction.n_actions()
@@ -0,0 +1,95 @@
+import numpy as np
+from pysnakegym.mdp import MDP
+
+from environment.termination import COLLIDED, LOOPED, MAX_STEPS_WITHOUT_FOOD, STARVED, WON
+
+
+class Episode(object):
+    """
+    Class that holds the outcome of a single finished game. It offers the same accessors as an MDP so that it can be
+    passed to the fitness functions in place of the MDP the game was played in.
+
+    The environment of an episode is the kind of environment the game was played in, a SnakeMDP or a BatchSnakeMDP. A
+    game can only be replayed in the kind of environment it was played in, as they draw their food differently.
+    """
+    SNAKE_MDP_ENVIRONMENT = "SNAKE_MDP"
+    BATCH_ENVIRONMENT = "BATCH"
+
+    def __init__(self, score: float, n_steps: int, reward_sum: float, seed: int = None, actions: np.array = None,
+                 environment: str = BATCH_ENVIRONMENT, termination: str = None, steps_without_food: int = 0):
+        """
+        Constructor for the Episode class.
+        :param score: the score of the game, i.e. the number of food eaten
+        :param n_steps: the number of steps the game lasted
+        :param reward_sum: the sum of all rewards of the game
+        :param seed: the seed of the environment the game was played in. None if the game cannot be replayed.
+        :param actions: the index of the action taken in every step of the game. None if the actions were not recorded.
+        :param environment: the kind of environment the game was played in
+        :param termination: the reason why the game ended, one of the reasons in environment.termination. None if it is
+        not known.
+        :param steps_without_food: the number of steps between the last food and the end of the game
+        """
+        self._score = score
+        self._n_steps = n_steps
+        self._reward_sum = reward_sum
+        self.seed = seed
+        self.actions = actions
+        self.environment = environment
+        self.termination = termination
+        self.steps_without_food = steps_without_food
+
+    @staticmethod
+    def from_mdp(mdp: MDP, seed: int = None, actions: np.array = None, termination: str = None):
+        """
+        Creates an episode from a SnakeMDP whose game is over.
+        :param mdp: the MDP in which the game was played
+        :param seed: the seed of the random numbers of the game. None if the game cannot be replayed.
+        :param actions: the index of the action taken in every step of the game
+        :param termination: the reason why the game was ended early. None if the game itself is over.
+        :return: an Episode
+        """
+        game = mdp.environment
+        reward_sum = mdp.reward_sum()
+        if termination is None:
+            # a game is won once the snake fills every cell of the board, as in SnakeGame.move
+            width, height = game.dimensions()
+            max_food = (width / game.snake_size) * (height / game.snake_size) - 1
+            termination = WON if game.n_food_eaten() == max_food else \
+                STARVED if game.n_steps_without_food() > MAX_STEPS_WITHOUT_FOOD else COLLIDED
+        elif not game.is_game_over():
+            # a game that is ended early is penalised like any other end of a game
+            reward_sum -= 10
+
+        return Episode(mdp.env_score(), mdp.n_steps(), reward_sum, seed=seed, actions=actions,
+                       environment=Episode.SNAKE_MDP_ENVIRONMENT, termination=termination,
+                       steps_without_food=game.n_steps_without_food())
+
+    def env_score(self) -> float:
+        return self._score
+
+    def n_steps(self) -> int:
+        return self._n_steps
+
+    def reward_sum(self) -> float:
+        return self._reward_sum
+
+    def is_stalled(self) -> bool:
+        """
+        Returns whether the game ended because the snake starved or was caught in a loop.
+        :return: True if the snake stalled, False if not.
+        """
+        return self.termination in [STARVED, LOOPED]
+
+    def stalled_steps(self) -> int:
+        """
+        Returns the number of steps since the snake last ate if it stalled.
+        :return: the steps without food of a stalled snake, 0 if the snake did not stall
+        """
+        return self.steps_without_food if self.is_stalled() else 0
+
+    def is_replayable(self) -> bool:
+        """
+        Returns whether the game of this episode can be re-simulated.
+        :return: True if both the seed and the actions of the game were recorded, False if not.
+        """
+        return self.seed is not None and self.actions is not None
@@ -0,0 +1,36 @@
+from typing import List
+
+import numpy as np
+from pysnakegym.game import GameSequence
+from pysnakegym.mdp import SnakeMDP
+
+from environment.batch_snake import BatchSnakeMDP
+from environment.episode import Episode
+from environment.seeding import SeededRandom
+
+
+def replay(episode: Episode, screen_width: int, screen_height: int, snake_size: int) -> List[GameSequence]:
+    """
+    Re-simulates a recorded game in the same kind of environment in which it was played.
+    :param episode: a replayable episode, i.e. one whose seed and actions were recorded
+    :param screen_width: the width of the board of the game
+    :param screen_height: the height of the board of the game
+    :param snake_size: the size of a single element of the snake
+    :return: a list of GameSequences, one for the start of the game and one for every step
+    """
+    if not episode.is_replayable():
+        raise Exception("The episode cannot be replayed as its seed or actions were not recorded")
+
+    if episode.environment == Episode.BATCH_ENVIRONMENT:
+        game = BatchSnakeMDP(1, screen_width, screen_height, snake_size)
+        return game.replay(episode.seed, episode.actions)
+
+    mdp = SnakeMDP(screen_width=screen_width, screen_height=screen_height, snake_size=snake_size, show_game=False)
+    SeededRandom(episode.seed).reset(mdp)
+    one_hot = np.eye(3, dtype=int)
+    sequences = [mdp.environment.get_sequence()]
+    for action in episode.actions:
+        mdp.step(one_hot[action])
+        sequences.append(mdp.environment.get_sequence())
+
+    return sequences
@@ -0,0 +1,71 @@
+import functools
+
+import numpy as np
+from pysnakegym.game.core import Point
+from pysnakegym.mdp import SnakeMDP
+
+
+class SeededRandom(object):
+    """
+    Class that gives a game its own stream of random numbers. The SnakeMDP draws its food from the global numpy random
+    state, so the global state is swapped with the state of the game while food is drawn and swapped back afterwards.
+    This makes a game reproducible from its seed even if several games are stepped in turns.
+
+    A SeededRandom without a seed does not change the global random state.
+    """
+
+    def __init__(self, seed: int = None):
+        """
+        Constructor for the SeededRandom class.
+        :param seed: the seed of the game. None uses the global random state.
+        """
+        self.seed = seed
+        self._state = np.random.RandomState(np.random.MT19937(seed)).get_state() if seed is not None else None
+        self._outer_state = None
+
+    def __enter__(self):
+        if self._state is not None:
+            self._outer_state = np.random.get_state()
+            np.random.set_state(self._state)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._state is not None:
+            self._state = np.random.get_state()
+            np.random.set_state(self._outer_state)
+            self._outer_state = None
+
+    def wrap(self, function):
+        """
+        Wraps a function so that it draws its random numbers from this state.
+        :param function: the function to be wrapped
+        :return: the wrapped function
+        """
+        @functools.wraps(function)
+        def seeded(*args, **kwargs):
+            with self:
+                return function(*args, **kwargs)
+
+        return seeded
+
+    def reset(self, mdp: SnakeMDP) -> (np.array, float, bool):
+        """
+        Resets a SnakeMDP so that all food of its next game is drawn from this state. Swapping the global state takes
+        about as long as a step of the game, so it is only swapped when food is drawn, i.e. when the grid is created on
+        reset and when the snake ate.
+        :param mdp: the MDP to be reset
+        :return: the result of resetting the MDP, a triplet of the start state, the reward, and whether it is final
+        """
+        # the game and its state representation keep whether the snake ate in the last step and where its head was, so
+        # both are reset to what they are in a new SnakeMDP for the game to not depend on the previous one
+        mdp.environment.ate_food = False
+        with self:
+            mdp.reset()
+        head = mdp.environment.snake_head()
+        mdp.state_representation.previous_head = Point(head.x, head.y + 1)
+        result = mdp.state_representation.get_state(), 0, False
+
+        if self._state is not None:
+            grid = mdp.environment.grid
+            grid.random_food = self.wrap(grid.random_food)
+        return result
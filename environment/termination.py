@@ -0,0 +1,87 @@
+import numpy as np
+
+# the reasons for which a game ends
+COLLIDED = "COLLIDED"
+WON = "WON"
+STARVED = "STARVED"
+LOOPED = "LOOPED"
+REASONS = [None, COLLIDED, WON, STARVED, LOOPED]
+
+# the number of steps without food after which a game is over, the same as in pysnakegym
+MAX_STEPS_WITHOUT_FOOD = 1000
+
+
+class Termination(object):
+    """
+    Class for the policy that ends games early. A game ends when the snake starved, i.e. it went more steps without
+    eating than its budget of starvation_steps plus steps_per_length for every element of the snake, and, with loop
+    detection, when the snake is caught in a loop.
+
+    A game is a loop if a state repeats before the snake eats again, as the network and therefore the game are
+    deterministic. The state is the body of the snake, the direction of its head, and the food. Loops are detected with
+    Brent's algorithm, which only keeps a single earlier state: every state is compared with the kept one, which is
+    replaced by the current state after 1, 2, 4, 8, ... further steps, so a loop is found within at most twice its
+    length plus the steps before it.
+    """
+
+    def __init__(self, starvation_steps: int = None, steps_per_length: int = 0, loop_detection: bool = False):
+        """
+        Constructor for the Termination class.
+        :param starvation_steps: the number of steps a snake of length 0 may go without eating. None does not starve
+        snakes apart from the limit of the game itself.
+        :param steps_per_length: the additional steps without eating for every element of the snake
+        :param loop_detection: whether games in which the snake is caught in a loop are ended
+        """
+        self.starvation_steps = starvation_steps
+        self.steps_per_length = steps_per_length
+        self.loop_detection = loop_detection
+
+    def starved(self, steps_without_food, length):
+        """
+        Checks whether snakes exceeded their budget of steps without eating.
+        :param steps_without_food: the number of steps since the snakes last ate, an int or a numpy array
+        :param length: the number of elements of the snakes, an int or a numpy array
+        :return: whether the snakes starved, a bool or a boolean numpy array
+        """
+        if self.starvation_steps is None:
+            return np.zeros_like(steps_without_food, dtype=bool)
+
+        return steps_without_food > self.starvation_steps + self.steps_per_length * length
+
+
+class LoopDetector(object):
+    """
+    Class that detects a loop in the states of a single game with Brent's algorithm, see Termination. States are
+    compared exactly.
+    """
+
+    def __init__(self):
+        self._kept = None
+        self._power = 1
+        self._steps = 0
+
+    def reset(self, state: bytes) -> None:
+        """
+        Starts looking for a new loop, i.e. at the start of a game or after the snake ate.
+        :param state: the current state of the game
+        :return: None
+        """
+        self._kept = state
+        self._power = 1
+        self._steps = 0
+
+    def is_loop(self, state: bytes) -> bool:
+        """
+        Checks whether the state of the next step closes a loop.
+        :param state: the state of the game after the step
+        :return: True if the state was seen before since the last reset
+        """
+        if state == self._kept:
+            return True
+
+        self._steps += 1
+        if self._steps == self._power:
+            self._kept = state
+            self._power *= 2
+            self._steps = 0
+        return False
@@ -1,3 +1,10 @@
-from evolution.population import Population
-from evolution.population import SnakePopulation
-from evolution.generational import Generational
\ No newline at end of file
+from util.lazy_import import lazy_attributes
+
+# the evolution algorithms import torch and tensorboard, so modules that only need e.g. the genome or the evaluation of
+# games, like the worker processes of an EvaluationPool, do not import them
+lazy_attributes(__name__, {
+    "Population": "evolution.population",
+    "SnakePopulation": "evolution.population",
+    "Generational": "evolution.generational",
+    "SteadyState": "evolution.steady_state",
+})
@@ -0,0 +1,82 @@
+import os
+import pickle
+import random
+import time
+
+import numpy as np
+import torch as T
+
+
+class Checkpoint:
+    """
+    Class that periodically saves the state of a population and of all random number generators so that an interrupted
+    run can be resumed and continues exactly as if it had not been interrupted. A checkpoint is written to a temporary
+    file which then replaces the previous checkpoint, so a crash while saving never leaves a broken checkpoint behind.
+    """
+    FILE = "/checkpoint.pkl"
+
+    def __init__(self, path: str, every_n_generations: int = None, every_seconds: float = None):
+        """
+        Constructor for the Checkpoint class.
+        :param path: the directory in which the checkpoint is saved
+        :param every_n_generations: a checkpoint is saved after every n generations. None does not save by generations.
+        :param every_seconds: a checkpoint is saved if this many seconds passed since the last one. None does not save by
+        time.
+        """
+        self.path = path
+        self.every_n_generations = every_n_generations
+        self.every_seconds = every_seconds
+        self._last_save = time.monotonic()
+
+    def is_due(self, generation: int) -> bool:
+        """
+        Checks whether a checkpoint should be saved.
+        :param generation: the number of generations that are completed
+        :return: True if a checkpoint should be saved
+        """
+        if self.every_n_generations is not None and generation % self.every_n_generations == 0:
+            return True
+
+        return self.every_seconds is not None and time.monotonic() - self._last_save >= self.every_seconds
+
+    def save(self, population) -> None:
+        """
+        Atomically saves the state of a population and of the random number generators of python, numpy and torch.
+        :param population: a population between two generations
+        :return: None
+        """
+        state = {
+            "population": population.state_dict(),
+            "random": random.getstate(),
+            "numpy": np.random.get_state(),
+            "torch": T.get_rng_state(),
+        }
+
+        os.makedirs(self.path, exist_ok=True)
+        file_path = self.path + Checkpoint.FILE
+        with open(file_path + ".tmp", "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(file_path + ".tmp", file_path)
+        self._last_save = time.monotonic()
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.isfile(path + Checkpoint.FILE)
+
+    @staticmethod
+    def restore(path: str, population) -> None:
+        """
+        Restores a population and the random number generators from the checkpoint in a directory.
+        :param path: the directory of the checkpoint
+        :param population: an initialised population with the same hyperparameters as the saved one
+        :return: None
+        """
+        with open(path + Checkpoint.FILE, "rb") as file:
+            state = pickle.load(file)
+
+        population.load_state_dict(state["population"])
+        random.setstate(state["random"])
+        np.random.set_state(state["numpy"])
+        T.set_rng_state(state["torch"])
@@ -0,0 +1,90 @@
+from typing import Dict, List
+
+import torch as T
+
+
+def segment_mask(n_pairs: int, n_columns: int, n_crossover_points: int) -> T.Tensor:
+    """
+    Draws sorted crossover points for a batch of parent pairs and turns them into a mask of alternating segments. The
+    first segment of every pair, i.e. the columns before the first crossover point, is swapped, the next one is kept and
+    so on.
+    :param n_pairs: the number of parent pairs
+    :param n_columns: the number of genes in which the crossover points are chosen
+    :param n_crossover_points: the number of crossover points of every pair
+    :return: a boolean tensor of shape (n_pairs, n_columns) which is True for every gene that is swapped
+    """
+    points = T.randint(0, n_columns + 1, (n_pairs, n_crossover_points)).sort(dim=1).values
+    # the segment of a gene is the number of crossover points at or before it, a running count of the points
+    counts = T.zeros(n_pairs, n_columns + 1, dtype=points.dtype).scatter_add_(1, points, T.ones_like(points))
+    segments = counts.cumsum(dim=1)[:, :n_columns]
+    return segments % 2 == 0
+
+
+class Crossover:
+    """
+    Interface for the evolutionary crossover mechanism. A crossover creates two children from every pair of parents of a
+    whole batch of parents at once.
+    """
+    def __init__(self, params: Dict):
+        self.params = params
+
+    def crossover(self, parents_1: T.Tensor, parents_2: T.Tensor, layers: List[slice],
+                  n_crossover_points: int = 1) -> (T.Tensor, T.Tensor):
+        """
+        Creates the children of a batch of parent pairs.
+        :param parents_1: the genomes of the first parents, a tensor of shape (n_pairs, n_weights)
+        :param parents_2: the genomes of the second parents, a tensor of shape (n_pairs, n_weights)
+        :param layers: the columns of every layer in the genomes
+        :param n_crossover_points: the number of crossover points in every layer
+        :return: a tuple containing the first and the second child of every pair, both of shape (n_pairs, n_weights)
+        """
+        pass
+
+    def set_params(self, params):
+        pass
+
+
+class NPointCrossover(Crossover):
+    """
+    Implementation of an n-point crossover. The crossover points are chosen for every layer separately and the children
+    take alternating segments from their parents.
+    """
+
+    def crossover(self, parents_1: T.Tensor, parents_2: T.Tensor, layers: List[slice],
+                  n_crossover_points: int = 1) -> (T.Tensor, T.Tensor):
+        swap = T.cat([segment_mask(len(parents_1), columns.stop - columns.start, n_crossover_points)
+                      for columns in layers], dim=1)
+        return T.where(swap, parents_2, parents_1), T.where(swap, parents_1, parents_2)
+
+
+class UniformCrossover(Crossover):
+    """
+    Implementation of a uniform crossover where every gene is swapped with the probability of the param "p" which
+    defaults to 0.5.
+    """
+
+    def set_params(self, params):
+        self.params = params
+
+    def crossover(self, parents_1: T.Tensor, parents_2: T.Tensor, layers: List[slice],
+                  n_crossover_points: int = 1) -> (T.Tensor, T.Tensor):
+        swap = T.rand(parents_1.shape) < self.params.get("p", 0.5)
+        return T.where(swap, parents_2, parents_1), T.where(swap, parents_1, parents_2)
+
+
+class BlendCrossover(Crossover):
+    """
+    Implementation of a blend crossover (BLX-alpha). Every gene of a child is drawn uniformly from the interval spanned
+    by the genes of its parents, extended by the param "alpha" times its length on both sides. With an alpha of 0 this
+    is an arithmetic crossover with a random weight for every gene. Alpha defaults to 0.5.
+    """
+
+    def set_params(self, params):
+        self.params = params
+
+    def crossover(self, parents_1: T.Tensor, parents_2: T.Tensor, layers: List[slice],
+                  n_crossover_points: int = 1) -> (T.Tensor, T.Tensor):
+        alpha = self.params.get("alpha", 0.5)
+        difference = parents_2 - parents_1
+        weights = T.rand((2, *parents_1.shape)) * (1 + 2 * alpha) - alpha
+        return parents_1 + weights[0] * difference, parents_2 - weights[1] * difference
@@ -0,0 +1,143 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+import torch as T
+from tqdm import tqdm
+
+from environment import BatchSnakeMDP, Episode
+from evolution.inference import BatchedFFNN
+
+
+def play(mdp: BatchSnakeMDP, network: BatchedFFNN, seeds: np.array, progress: tqdm = None) -> List[Episode]:
+    """
+    Plays one game per network in a BatchSnakeMDP until every game is over. Networks are dropped from the batch as soon
+    as their game is over.
+    :param mdp: the MDP with one game per network
+    :param network: the batched networks that choose the actions
+    :param seeds: the seed of every game
+    :param progress: an optional progress bar that is updated whenever a game is over
+    :return: the Episode of every game including its seed and actions
+    """
+    states, _, dones = mdp.reset(seeds=seeds)
+    alive = np.arange(mdp.n_games)
+    actions = np.zeros(mdp.n_games, dtype=np.int8)
+    action_history = []
+
+    while len(alive) > 0:
+        actions[alive] = network.choose_actions(states[alive])
+        action_history.append(actions.copy())
+        states, _, dones = mdp.step(actions)
+
+        still_alive = ~dones[alive]
+        if not still_alive.all():
+            if progress is not None:
+                progress.update(len(alive) - still_alive.sum())
+            network.keep(still_alive)
+            alive = alive[still_alive]
+
+    action_history = np.stack(action_history)
+    episodes = []
+    for game in range(mdp.n_games):
+        episode = mdp.episode(game)
+        episode.actions = action_history[:episode.n_steps(), game].copy()
+        episodes.append(episode)
+
+    return episodes
+
+
+def evaluate_genomes(weights: List[np.array], biases: List[np.array], environment: Dict,
+                     seeds: np.array) -> List[Episode]:
+    """
+    Plays one game for each genome. This is the function that is run by the worker processes of an EvaluationPool.
+    :param weights: the stacked weights of every layer, each of shape (n_genomes, out_features, in_features)
+    :param biases: the stacked biases of every layer, each of shape (n_genomes, out_features)
+    :param environment: the keyword arguments for the BatchSnakeMDP, i.e. screen_width, screen_height, snake_size, and
+    termination
+    :param seeds: the seed of the game of every genome
+    :return: the Episode of every game
+    """
+    network = BatchedFFNN([T.from_numpy(weight) for weight in weights], [T.from_numpy(bias) for bias in biases])
+    mdp = BatchSnakeMDP(len(seeds), **environment)
+    return play(mdp, network, seeds)
+
+
+_worker_initialised = False
+
+
+def _evaluate_in_worker(weights: List[np.array], biases: List[np.array], environment: Dict,
+                        seeds: np.array) -> List[Episode]:
+    # the worker is set up by its first task, as the initializer of a ProcessPoolExecutor needs python 3.7
+    global _worker_initialised
+    if not _worker_initialised:
+        # every worker evaluates small batches, so additional threads per worker would only compete for the same cores
+        T.set_num_threads(1)
+        _worker_initialised = True
+    return evaluate_genomes(weights, biases, environment, seeds)
+
+
+class EvaluationPool:
+    """
+    Class that evaluates genomes in a pool of worker processes. The genomes are split into chunks of a fixed size, so
+    the games that are played, and therefore their results, do not depend on the number of workers. A pool without
+    workers evaluates the genomes in the calling process.
+    """
+
+    def __init__(self, n_workers: int, chunk_size: int = 64):
+        """
+        Constructor for the EvaluationPool class.
+        :param n_workers: the number of worker processes
+        :param chunk_size: the number of genomes that are sent to a worker at once
+        """
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self._executor = None
+
+    def evaluate(self, weights: List[np.array], biases: List[np.array], environment: Dict, seeds: np.array,
+                 progress: tqdm = None) -> List[Episode]:
+        """
+        Plays one game for each genome in the worker processes.
+        :param weights: the stacked weights of every layer, each of shape (n_genomes, out_features, in_features)
+        :param biases: the stacked biases of every layer, each of shape (n_genomes, out_features)
+        :param environment: the keyword arguments for the BatchSnakeMDP
+        :param seeds: the seed of the game of every genome
+        :param progress: an optional progress bar that is updated whenever a chunk has been evaluated
+        :return: the Episode of every game in the same order as the genomes
+        """
+        futures = []
+        for start in range(0, len(seeds), self.chunk_size):
+            chunk = slice(start, start + self.chunk_size)
+            futures.append(self.submit([weight[chunk] for weight in weights], [bias[chunk] for bias in biases],
+                                       environment, seeds[chunk]))
+
+        episodes = []
+        for future in futures:
+            chunk_episodes = future.result()
+            if progress is not None:
+                progress.update(len(chunk_episodes))
+            episodes.extend(chunk_episodes)
+
+        return episodes
+
+    def submit(self, weights: List[np.array], biases: List[np.array], environment: Dict, seeds: np.array) -> Future:
+        """
+        Schedules the evaluation of a batch of genomes without waiting for its result.
+        :param weights: the stacked weights of every layer, each of shape (n_genomes, out_features, in_features)
+        :param biases: the stacked biases of every layer, each of shape (n_genomes, out_features)
+        :param environment: the keyword arguments for the BatchSnakeMDP
+        :param seeds: the seed of the game of every genome
+        :return: a Future of the Episodes of the games. Without workers the Future is already done.
+        """
+        if self.n_workers == 0:
+            future = Future()
+            future.set_result(evaluate_genomes(weights, biases, environment, seeds))
+            return future
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers)
+        return self._executor.submit(_evaluate_in_worker, weights, biases, environment, seeds)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
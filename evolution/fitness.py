@@ -1,3 +1,7 @@
+"""
+Fitness functions. Every function accepts an object that offers the accessors of an MDP, i.e. a SnakeMDP, the Episode of a
+finished game, or a BatchSnakeMDP in which case the fitness of all of its games is returned as a numpy array.
+"""
 from pysnakegym.game import SnakeGame
 from pysnakegym.mdp import MDP
 
@@ -13,5 +17,6 @@ def maximise_reward(env: MDP) -> float:
     return env.reward_sum()
 
 
-
-
+def maximise_moves_without_stalling(env: MDP) -> float:
+    # the steps in which a starved or looping snake did not make progress are not rewarded
+    return env.n_steps() - env.stalled_steps()
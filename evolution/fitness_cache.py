@@ -0,0 +1,74 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from environment import Episode
+
+
+class FitnessCache:
+    """
+    Class that memoises the outcome of games with a bounded least recently used cache. A game is deterministic given
+    the genome of the individual and the seed of the game, so the Episode of a game is stored under a hash of the bytes
+    of the weights and biases of the genome and of the seed. The fitness is calculated from the cached Episode, so
+    the cache works with every fitness function.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Constructor for the FitnessCache class.
+        :param max_size: the maximum number of Episodes that are kept. The least recently used one is evicted first.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._episodes = OrderedDict()
+
+    def __len__(self):
+        return len(self._episodes)
+
+    @staticmethod
+    def key(weights: np.array, biases: np.array, seed: int) -> bytes:
+        """
+        Hashes a genome and the seed of its game.
+        :param weights: the weights of the genome
+        :param biases: the biases of the genome
+        :param seed: the seed of the game
+        :return: a 16 byte digest
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(weights).tobytes())
+        digest.update(np.ascontiguousarray(biases).tobytes())
+        digest.update(np.int64(seed).tobytes())
+        return digest.digest()
+
+    def get(self, key: bytes) -> Episode:
+        """
+        Looks up the Episode of a game and counts the lookup as a hit or a miss.
+        :param key: the key of the game
+        :return: the cached Episode, or None if the game is not cached
+        """
+        episode = self._episodes.get(key)
+        if episode is None:
+            self.misses += 1
+            return None
+
+        self._episodes.move_to_end(key)
+        self.hits += 1
+        return episode
+
+    def put(self, key: bytes, episode: Episode) -> None:
+        """
+        Stores the Episode of a game, evicting the least recently used Episode if the cache is full.
+        :param key: the key of the game
+        :param episode: the Episode of the game
+        :return: None
+        """
+        self._episodes[key] = episode
+        self._episodes.move_to_end(key)
+        while len(self._episodes) > self.max_size:
+            self._episodes.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
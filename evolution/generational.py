@@ -1,9 +1,11 @@
 import functools
-
-from torch.utils.tensorboard import SummaryWriter
+from typing import List
 
 from agents import GeneticAgent
 from evolution import Population
+from evolution.checkpoint import Checkpoint
+from evolution.hall_of_fame import HallOfFame
+from evolution.phase_timer import PhaseTimer
 
 
 class Generational:
@@ -11,48 +13,100 @@ class Generational:
     Class for a generational evolution algorithm where the entire population is replaced each generation.
     """
 
-    def __init__(self, population: Population):
+    def __init__(self, population: Population, checkpoint: Checkpoint = None, migration=None,
+                 phase_timer: PhaseTimer = None, log_dir: str = None):
+        """
+        Constructor for the Generational class.
+        :param population: the population that is evolved
+        :param checkpoint: saves the state of the run between generations. None does not save checkpoints.
+        :param migration: exchanges individuals with other populations after their fitness is calculated, e.g. a
+        Migration of an island model. None does not migrate.
+        :param phase_timer: times the phases of every generation. None only writes the times to TensorBoard.
+        :param log_dir: the directory of the TensorBoard logs, e.g. the directory of the run. None logs into ./runs.
+        """
         self.population = population
-        self.writer = SummaryWriter()
-        self.best_individuals = []
+        self.checkpoint = checkpoint
+        self.migration = migration
+        self.phase_timer = phase_timer if phase_timer is not None else PhaseTimer()
+        self.resumed = False
+        # tensorboard takes long to import, so it is only imported once a writer is created
+        from torch.utils.tensorboard import SummaryWriter
+        self.writer = SummaryWriter(log_dir)
 
     def run(self, n_generations: int) -> None:
         """
-        Runs the generational evolution algorithm with the population for the number of generations.
+        Runs the generational evolution algorithm with the population for the number of generations. A resumed run
+        continues with the generation after its checkpoint.
         :return:
         """
-        self.population.initialise_population()
+        if not self.resumed:
+            self.population.initialise_population()
 
-        for generation in range(n_generations):
+        for generation in range(self.population.generation, n_generations):
             print(f"\n------------- Generation {generation} -------------")
-            self.population.simulate()
-            self.population.calculate_fitness()
-            self.best_individuals.append(self.population.best_individual)
-            self.population.candidate_selection()
-            self.population.crossover()
-            self.population.mutate_children()
-            self.population.replace()
+            with self.phase_timer.profile(generation):
+                self._run_generation(generation)
 
             total_fitness = functools.reduce(lambda x, y: x + y,
                                             map(lambda solution: solution.fitness, self.population.individuals))
             avg_fitness = total_fitness / self.population.pop_size
             print(f"Avg Fitness {avg_fitness}\n")
             self.writer.add_scalar("Average Fitness", avg_fitness, global_step=generation)
+            simulated_steps, simulated_games = self.population.simulated_steps, self.population.simulated_games
             #
-            self.population.reset()
+            with self.phase_timer.phase("reset"):
+                self.population.reset()
+            self.phase_timer.finish_generation(self.writer, generation, simulated_steps, simulated_games)
+
+            if self.checkpoint is not None and self.checkpoint.is_due(self.population.generation):
+                self.checkpoint.save(self.population)
+
+        self.population.close()
+
+    def _run_generation(self, generation: int) -> None:
+        timer = self.phase_timer
+        with timer.phase("simulate"):
+            self.population.simulate()
+        with timer.phase("calculate_fitness"):
+            self.population.calculate_fitness()
+        if self.migration is not None and self.migration.is_due(generation):
+            with timer.phase("migrate"):
+                self.migration.migrate(self.population, generation)
+        with timer.phase("candidate_selection"):
+            self.population.candidate_selection()
+        with timer.phase("crossover"):
+            self.population.crossover()
+        with timer.phase("mutate_children"):
+            self.population.mutate_children()
+        with timer.phase("replace"):
+            self.population.replace()
+
+    def resume(self, path: str) -> None:
+        """
+        Initialises the population and restores it from the checkpoint in a directory.
+        :param path: the directory of the checkpoint
+        :return: None
+        """
+        self.population.initialise_population()
+        Checkpoint.restore(path, self.population)
+        self.resumed = True
 
     def best_individual_of(self, generation: int) -> GeneticAgent:
         """
-        Returns the best individual of the specified generation where the first generations is generation 0. The last
-        generation is n_generations - 1.
+        Returns the best individual of all generations up to the specified generation where the first generations is
+        generation 0. The last generation is n_generations - 1. The individual is rebuilt from the hall of fame.
         :param generation: the generation from which the best individual is to be returned
-        :return: the best individual of a generation. If the generation doesn't exist, None is returned
+        :return: the best individual up to and including the generation
         """
-        return self.best_individuals[generation]
+        return self.population.best_individual_of(generation)
 
     def best_individual(self) -> GeneticAgent:
         return self.population.best_individual
 
+    @property
+    def hall_of_fames(self) -> List[HallOfFame]:
+        return [self.population.hall_of_fame]
+
     def get_population_data(self):
         return self.population.population_data
 
@@ -0,0 +1,236 @@
+from typing import List
+
+import numpy as np
+import torch as T
+from pysnakegym.model import FFNN
+
+# the dtypes in which the genomes of a population can be stored
+GENOME_DTYPES = {"FLOAT32": T.float32, "FLOAT16": T.float16, "INT8": T.int8}
+NUMPY_DTYPES = {"FLOAT32": np.float32, "FLOAT16": np.float16, "INT8": np.int8}
+INT8_MAX = 127
+
+
+def quantise(values: T.Tensor, layers: List[slice]) -> (T.Tensor, T.Tensor):
+    """
+    Quantises genomes to int8 with one scale per layer of every genome, so that the largest absolute value of a layer is
+    mapped to 127.
+    :param values: the float genomes, a tensor of shape (n_genomes, n_columns)
+    :param layers: the columns of every layer
+    :return: a tuple of the int8 codes of the same shape as values and the float32 scales of shape (n_genomes, n_layers)
+    """
+    values = values.float()
+    codes = T.empty(values.shape, dtype=T.int8)
+    scales = T.empty((len(values), len(layers)), dtype=T.float32)
+    for i, columns in enumerate(layers):
+        layer = values[:, columns]
+        scale = layer.abs().max(dim=1).values / INT8_MAX
+        # a layer of zeros gets a scale of 1, so that its codes do not divide by 0
+        scale[scale == 0] = 1.0
+        codes[:, columns] = T.round(layer / scale.unsqueeze(1)).clamp(-INT8_MAX, INT8_MAX).to(T.int8)
+        scales[:, i] = scale
+    return codes, scales
+
+
+def dequantise(codes: T.Tensor, scales: T.Tensor, layers: List[slice]) -> T.Tensor:
+    """
+    Reverses quantise.
+    :param codes: the int8 codes, a tensor of shape (n_genomes, n_columns)
+    :param scales: the scales of every layer, a tensor of shape (n_genomes, n_layers)
+    :param layers: the columns of every layer
+    :return: the float32 genomes of the same shape as codes
+    """
+    values = codes.float()
+    for i, columns in enumerate(layers):
+        values[:, columns] *= scales[:, i].unsqueeze(1)
+    return values
+
+
+class GenomeMatrix:
+    """
+    Class that holds the genomes of a whole population in a single contiguous (pop_size x n_weights) float32 matrix.
+    Row i is the genome of individual i, i.e. the flattened weights of all layers of its network starting with the input
+    layer. The networks of the individuals read their weights as views into their row, so writing to the matrix changes
+    the networks without copying.
+
+    The biases of the networks are not part of the genome and are not evolved, they are kept in a second matrix of
+    shape (pop_size x n_biases) so that a network can be rebuilt from its row alone. Every genome also carries a mutation
+    step size sigma which is only used by self-adaptive mutations.
+
+    The genomes can be stored in a compact dtype, "FLOAT16" or "INT8" with a scale for every layer of every genome, which
+    takes a half or a quarter of the memory. Rows are then read and written as float32 with genomes and set_genomes, and
+    the networks read from a single float32 row into which a genome is decoded by load.
+    """
+
+    def __init__(self, pop_size: int, features: List[int], dtype: str = "FLOAT32"):
+        """
+        Constructor for the GenomeMatrix class.
+        :param pop_size: the number of genomes
+        :param features: the number of nodes of every layer of the networks, i.e. [input, hidden..., output]
+        :param dtype: the dtype in which the genomes are stored, one of GENOME_DTYPES
+        """
+        self.pop_size = pop_size
+        self.features = list(features)
+        # weights of a layer have the shape (out_features, in_features) as in torch.nn.Linear
+        self.layer_shapes = [(features[i + 1], features[i]) for i in range(len(features) - 1)]
+        self.offsets = np.concatenate([[0], np.cumsum([rows * columns for rows, columns in self.layer_shapes])])
+        self.bias_offsets = np.concatenate([[0], np.cumsum([rows for rows, _ in self.layer_shapes])])
+        self.n_weights = int(self.offsets[-1])
+        self.n_biases = int(self.bias_offsets[-1])
+        self.dtype = dtype
+        self.weights = T.zeros((pop_size, self.n_weights), dtype=GENOME_DTYPES[dtype])
+        self.biases = T.zeros((pop_size, self.n_biases), dtype=T.float32)
+        self.sigmas = T.zeros(pop_size, dtype=T.float32)
+        self.scales = T.ones((pop_size, self.n_layers()), dtype=T.float32) if dtype == "INT8" else None
+        # the float32 row from which the networks of a compact matrix read the genome that was loaded last
+        self.decoded = T.zeros(self.n_weights, dtype=T.float32) if self.is_compact() else None
+
+    def is_compact(self) -> bool:
+        return self.dtype != "FLOAT32"
+
+    def initialise(self) -> None:
+        """
+        Fills the weights and biases of all genomes with a single random draw from the same distribution that is used
+        by torch.nn.Linear, i.e. uniform in [-1/sqrt(in_features), 1/sqrt(in_features)].
+        :return: None
+        """
+        weight_bounds = T.cat([T.full((rows * columns,), 1 / np.sqrt(columns)) for rows, columns in self.layer_shapes])
+        bias_bounds = T.cat([T.full((rows,), 1 / np.sqrt(columns)) for rows, columns in self.layer_shapes])
+        if self.is_compact():
+            weights = T.empty((self.pop_size, self.n_weights)).uniform_(-1, 1).mul_(weight_bounds)
+            self.set_genomes(T.arange(self.pop_size), weights)
+        else:
+            self.weights.uniform_(-1, 1).mul_(weight_bounds)
+        self.biases.uniform_(-1, 1).mul_(bias_bounds)
+
+    def genomes(self, rows: T.Tensor) -> T.Tensor:
+        """
+        Copies several genomes out of the matrix.
+        :param rows: the indices of the genomes, a long tensor
+        :return: a float32 tensor of shape (n_rows, n_weights)
+        """
+        weights = self.weights.index_select(0, rows)
+        if self.dtype == "INT8":
+            return dequantise(weights, self.scales.index_select(0, rows), self.layer_slices())
+        return weights.float()
+
+    def set_genomes(self, rows: T.Tensor, genomes: T.Tensor) -> None:
+        """
+        Writes several genomes into the matrix, they are rounded to the dtype of the matrix.
+        :param rows: the indices of the genomes, a long tensor
+        :param genomes: a float tensor of shape (n_rows, n_weights)
+        :return: None
+        """
+        if self.dtype == "INT8":
+            codes, scales = quantise(genomes, self.layer_slices())
+            self.weights.index_copy_(0, rows, codes)
+            self.scales.index_copy_(0, rows, scales)
+        else:
+            self.weights.index_copy_(0, rows, genomes.to(self.weights.dtype))
+
+    def codes(self, rows: T.Tensor) -> (T.Tensor, T.Tensor):
+        """
+        Copies several genomes out of the matrix in the dtype of the matrix, so that they can be written back by
+        set_codes without being rounded again.
+        :param rows: the indices of the genomes, a long tensor
+        :return: a tuple of the weights of shape (n_rows, n_weights) and the scales of shape (n_rows, n_layers), which
+        are None unless the matrix is "INT8"
+        """
+        scales = self.scales.index_select(0, rows) if self.scales is not None else None
+        return self.weights.index_select(0, rows), scales
+
+    def set_codes(self, rows: T.Tensor, weights: T.Tensor, scales: T.Tensor = None) -> None:
+        """
+        Writes several genomes that were copied by codes into the matrix.
+        :param rows: the indices of the genomes, a long tensor
+        :param weights: the weights in the dtype of the matrix, a tensor of shape (n_rows, n_weights)
+        :param scales: the scales of an "INT8" matrix, a tensor of shape (n_rows, n_layers)
+        :return: None
+        """
+        self.weights.index_copy_(0, rows, weights)
+        if self.scales is not None:
+            self.scales.index_copy_(0, rows, scales)
+
+    def genome(self, row: int) -> np.array:
+        """
+        Gets a single genome as float32.
+        :param row: the index of the genome
+        :return: an array of shape (n_weights,), a view into the matrix unless the matrix is compact
+        """
+        if not self.is_compact():
+            return self.weights[row].numpy()
+        return self.genomes(T.tensor([row]))[0].numpy()
+
+    def load(self, row: int) -> None:
+        """
+        Decodes a genome of a compact matrix into the row from which the attached networks read. The networks of a
+        float32 matrix read from their own row, so nothing is done.
+        :param row: the index of the genome
+        :return: None
+        """
+        if self.is_compact():
+            self.decoded.copy_(self.genomes(T.tensor([row]))[0])
+
+    def nbytes(self) -> int:
+        """
+        Gets the memory of the genomes, biases, step sizes and scales.
+        :return: the number of bytes
+        """
+        tensors = [self.weights, self.biases, self.sigmas] + ([self.scales] if self.scales is not None else [])
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+    def n_layers(self) -> int:
+        return len(self.layer_shapes)
+
+    def layer_slice(self, layer: int) -> slice:
+        """
+        Gets the columns of the matrix that hold the weights of a layer.
+        :param layer: the index of the layer
+        :return: a slice of the columns of the layer
+        """
+        return slice(int(self.offsets[layer]), int(self.offsets[layer + 1]))
+
+    def layer(self, row: int, layer: int) -> T.Tensor:
+        """
+        Gets the weights of a single layer of a genome as a view.
+        :param row: the index of the genome
+        :param layer: the index of the layer
+        :return: a view of shape (out_features, in_features). The view of a compact matrix is into the decoded row,
+        whatever the row.
+        """
+        if self.is_compact():
+            return self.decoded[self.layer_slice(layer)].view(self.layer_shapes[layer])
+        return self.weights[row, self.layer_slice(layer)].view(self.layer_shapes[layer])
+
+    def layer_slices(self) -> List[slice]:
+        return [self.layer_slice(layer) for layer in range(self.n_layers())]
+
+    def bias(self, row: int, layer: int) -> T.Tensor:
+        return self.biases[row, int(self.bias_offsets[layer]):int(self.bias_offsets[layer + 1])]
+
+    def attach(self, row: int, network: FFNN) -> None:
+        """
+        Replaces the weights and biases of a network with views into a row of this matrix. The networks of a compact
+        matrix all read the genome that was loaded last.
+        :param row: the index of the genome
+        :param network: the network whose layers will read from the row
+        :return: None
+        """
+        for i, layer in enumerate(network.layers()):
+            layer.weight.data = self.layer(row, i)
+            layer.bias.data = self.bias(row, i)
+
+    def stacked_layers(self, rows: List[int]) -> (List[T.Tensor], List[T.Tensor]):
+        """
+        Gathers the layers of several genomes so that they can be evaluated by a BatchedFFNN.
+        :param rows: the indices of the genomes in the order in which they are stacked
+        :return: a tuple containing the weights of shape (n_rows, out_features, in_features) and the biases of shape
+        (n_rows, out_features) of every layer
+        """
+        index = T.as_tensor(rows, dtype=T.long)
+        weights = self.genomes(index)
+        biases = self.biases.index_select(0, index)
+        stacked_weights = [weights[:, self.layer_slice(i)].reshape(len(index), *shape)
+                           for i, shape in enumerate(self.layer_shapes)]
+        stacked_biases = [biases[:, int(self.bias_offsets[i]):int(self.bias_offsets[i + 1])]
+                          for i in range(self.n_layers())]
+        return stacked_weights, stacked_biases
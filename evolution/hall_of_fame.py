@@ -0,0 +1,173 @@
+from typing import Iterator, List
+
+import numpy as np
+from pysnakegym.mdp import MDP
+from pysnakegym.model import FFNN
+
+from agents import GeneticAgent
+from environment import Episode
+from evolution.genome import GenomeMatrix
+
+
+class HallOfFame:
+    """
+    Class that stores a snapshot of the best individual of every generation. A snapshot is only the generation, the
+    fitness, the genome and the biases of the individual and a handle to replay its game, all kept in preallocated
+    buffers that double in size when they are full. Agents are rebuilt from a snapshot when they are needed.
+
+    The replay handle is the Episode of the game if it can be re-simulated from its seed and actions. Otherwise it is
+    the list of recorded game sequences, which is only kept for the best snapshot as it grows with the length of the game.
+    """
+
+    def __init__(self, features: List[int], capacity: int = 64):
+        """
+        Constructor for the HallOfFame class.
+        :param features: the number of nodes of every layer of the networks, i.e. [input, hidden..., output]
+        :param capacity: the number of snapshots for which memory is allocated up front
+        """
+        self.features = list(features)
+        layout = GenomeMatrix(0, features)
+        self._generations = np.zeros(capacity, dtype=np.int64)
+        self._fitness = np.zeros(capacity, dtype=np.float64)
+        self._weights = np.zeros((capacity, layout.n_weights), dtype=np.float32)
+        self._biases = np.zeros((capacity, layout.n_biases), dtype=np.float32)
+        self._replays = [None] * capacity
+        self._size = 0
+        self._best = None
+
+    def __len__(self):
+        return self._size
+
+    def add(self, generation: int, fitness: float, weights: np.array, biases: np.array, replay=None) -> int:
+        """
+        Adds a snapshot to the hall of fame.
+        :param generation: the generation of the individual
+        :param fitness: the fitness of the individual
+        :param weights: the genome of the individual, an array of shape (n_weights,)
+        :param biases: the biases of the network of the individual, an array of shape (n_biases,)
+        :param replay: an Episode or a list of GameSequence with which the game of the individual can be replayed
+        :return: the index of the snapshot
+        """
+        if self._size == len(self._generations):
+            self._grow()
+
+        index = self._size
+        self._generations[index] = generation
+        self._fitness[index] = fitness
+        self._weights[index] = weights
+        self._biases[index] = biases
+        self._replays[index] = replay
+        self._size += 1
+
+        if self._best is None or fitness > self._fitness[self._best]:
+            # recorded games that cannot be re-simulated are only kept for the best snapshot
+            if self._best is not None and not isinstance(self._replays[self._best], Episode):
+                self._replays[self._best] = None
+            self._best = index
+        elif not isinstance(replay, Episode):
+            self._replays[index] = None
+
+        return index
+
+    def _grow(self):
+        capacity = max(2 * len(self._generations), 1)
+        self._generations = np.resize(self._generations, capacity)
+        self._fitness = np.resize(self._fitness, capacity)
+        self._weights = np.concatenate([self._weights, np.zeros_like(self._weights)])[:capacity]
+        self._biases = np.concatenate([self._biases, np.zeros_like(self._biases)])[:capacity]
+        self._replays.extend([None] * (capacity - len(self._replays)))
+
+    def best(self, generation: int = None) -> int:
+        """
+        Gets the index of the snapshot with the highest fitness. If several snapshots have the same fitness, the
+        earliest one is returned.
+        :param generation: only snapshots up to and including this generation are considered. None considers all.
+        :return: the index of the best snapshot
+        """
+        if self._size == 0:
+            raise Exception("The hall of fame is empty")
+
+        if generation is None:
+            return self._best
+
+        candidates = np.flatnonzero(self._generations[:self._size] <= generation)
+        if len(candidates) == 0:
+            raise Exception(f"The hall of fame has no snapshot up to generation {generation}")
+
+        return int(candidates[self._fitness[candidates].argmax()])
+
+    def best_of_generations(self, n_generations: int) -> np.array:
+        """
+        Gets the index of the best snapshot up to every generation in a single pass over the snapshots, which is the
+        same as calling best for every generation.
+        :param n_generations: the number of generations, starting with generation 0
+        :return: an array of shape (n_generations,) with the index of the best snapshot up to each generation
+        """
+        best = np.zeros(n_generations, dtype=np.int64)
+        # the snapshots are visited by generation, and by index within a generation, so ties keep the earliest snapshot
+        order = np.lexsort((np.arange(self._size), self._generations[:self._size]))
+        position, index = 0, None
+        for generation in range(n_generations):
+            while position < len(order) and self._generations[order[position]] <= generation:
+                if index is None or self._fitness[order[position]] > self._fitness[index] or \
+                        (self._fitness[order[position]] == self._fitness[index] and order[position] < index):
+                    index = order[position]
+                position += 1
+            if index is None:
+                raise Exception(f"The hall of fame has no snapshot up to generation {generation}")
+            best[generation] = index
+
+        return best
+
+    def generation(self, index: int) -> int:
+        return int(self._generations[index])
+
+    def fitness(self, index: int) -> float:
+        return float(self._fitness[index])
+
+    def genome(self, index: int) -> (np.array, np.array):
+        return self._weights[index], self._biases[index]
+
+    def replay(self, index: int):
+        return self._replays[index]
+
+    def agent(self, index: int, mdp: MDP, mutation_rate: float) -> GeneticAgent:
+        """
+        Rebuilds the individual of a snapshot.
+        :param index: the index of the snapshot
+        :param mdp: the MDP in which the agent acts
+        :param mutation_rate: the mutation rate of the agent
+        :return: a GeneticAgent with its own copy of the genome of the snapshot
+        """
+        genomes = GenomeMatrix(1, self.features)
+        genomes.weights[0] = genomes.weights.new_tensor(self._weights[index])
+        genomes.biases[0] = genomes.biases.new_tensor(self._biases[index])
+        neural_network = FFNN(self.features)
+        genomes.attach(0, neural_network)
+
+        agent = GeneticAgent(mdp=mdp, neural_network=neural_network, mutation_rate=mutation_rate)
+        agent.fitness = self.fitness(index)
+        replay = self._replays[index]
+        if isinstance(replay, Episode):
+            agent.finish_episode(replay)
+        elif replay is not None:
+            agent.game_sequences = replay
+        return agent
+
+
+def best_genomes(hall_of_fames: List[HallOfFame], n_generations: int) -> Iterator[tuple]:
+    """
+    Streams the genome of the best individual up to every generation out of several halls of fame, e.g. those of the
+    islands of a run, without rebuilding the individuals as agents. If several halls of fame have the same best fitness,
+    the first one is used.
+    :param hall_of_fames: the halls of fame, which all store networks of the same features
+    :param n_generations: the number of generations, starting with generation 0
+    :return: an iterator of the fitness, weights, and biases of the best individual of every generation, where the
+    weights and biases are views of the buffers of the halls of fame
+    """
+    best = [hall_of_fame.best_of_generations(n_generations) for hall_of_fame in hall_of_fames]
+    for generation in range(n_generations):
+        fitness = [hall_of_fame.fitness(indices[generation]) for hall_of_fame, indices in zip(hall_of_fames, best)]
+        island = int(np.argmax(fitness))
+        weights, biases = hall_of_fames[island].genome(best[island][generation])
+        yield fitness[island], weights, biases
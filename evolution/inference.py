@@ -0,0 +1,149 @@
+from typing import List
+
+import numpy as np
+import torch as T
+import torch.nn.functional as F
+from pysnakegym.model import FFNN
+
+
+class BatchedFFNN:
+    """
+    Class that stacks the layers of several feed forward networks of identical shape so that the actions of all of them
+    can be computed with a single batched matrix multiplication per layer.
+    """
+
+    def __init__(self, weights: List[T.Tensor], biases: List[T.Tensor], device: T.device = T.device('cpu')):
+        """
+        Constructor for the BatchedFFNN class.
+        :param weights: the stacked weights of every layer, each of shape (n_networks, out_features, in_features)
+        :param biases: the stacked biases of every layer, each of shape (n_networks, out_features)
+        :param device: the device on which the forward pass is computed
+        """
+        self.device = device
+        self.weights = [weight.to(device) for weight in weights]
+        # biases are kept as column vectors so that they can be added by baddbmm
+        self.biases = [bias.unsqueeze(2).to(device) for bias in biases]
+        self.indices = np.arange(len(weights[0]))
+
+    @staticmethod
+    def from_networks(networks: List[FFNN]):
+        """
+        Creates a BatchedFFNN from several networks.
+        :param networks: the networks that will be stacked. All networks must have the same layer sizes.
+        :return: a BatchedFFNN
+        """
+        weights, biases = stack_layers(networks)
+        return BatchedFFNN(weights, biases, networks[0].device)
+
+    def forward(self, observations: T.Tensor) -> T.Tensor:
+        """
+        Computes the output of every stacked network for its own observation.
+        :param observations: a tensor of shape (n_networks, input_features) where row i is the input of network i
+        :return: a tensor of shape (n_networks, output_features)
+        """
+        x = observations.unsqueeze(2)
+        for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+            x = T.baddbmm(bias, weight, x)
+            # the output layer is linear, every other layer is followed by a relu
+            if i < len(self.weights) - 1:
+                x = F.relu(x)
+
+        return x.squeeze(2)
+
+    def choose_actions(self, observations: np.array) -> np.array:
+        """
+        Chooses the action with the highest value for every stacked network.
+        :param observations: a numpy array of shape (n_networks, input_features)
+        :return: a numpy array of shape (n_networks,) with the index of the chosen action of each network
+        """
+        with T.no_grad():
+            state = T.from_numpy(np.asarray(observations, dtype=np.float32)).to(self.device)
+            return T.argmax(self.forward(state), dim=1).cpu().numpy()
+
+    def keep(self, mask: np.array) -> None:
+        """
+        Removes networks from the batch.
+        :param mask: a boolean numpy array of shape (n_networks,) which is True for every network that is kept
+        :return: None
+        """
+        index = T.from_numpy(np.flatnonzero(mask)).to(self.device)
+        self.weights = [weight.index_select(0, index) for weight in self.weights]
+        self.biases = [bias.index_select(0, index) for bias in self.biases]
+        self.indices = self.indices[mask]
+
+    def __len__(self):
+        return len(self.indices)
+
+
+class NumpyFFNN:
+    """
+    Class that computes the forward pass of a single feed forward network with numpy. The layers of the network are
+    copied once into contiguous float32 arrays and every layer writes its output into an array that is allocated once,
+    so that choosing an action does not allocate memory or dispatch any torch operations. It computes the same output
+    as the forward pass of the network.
+    """
+
+    def __init__(self, weights: List[np.array], biases: List[np.array]):
+        """
+        Constructor for the NumpyFFNN class.
+        :param weights: the weights of every layer, each of shape (out_features, in_features)
+        :param biases: the biases of every layer, each of shape (out_features,)
+        """
+        self.weights = [np.ascontiguousarray(weight, dtype=np.float32) for weight in weights]
+        self.biases = [np.ascontiguousarray(bias, dtype=np.float32) for bias in biases]
+        self._input = np.zeros(self.weights[0].shape[1], dtype=np.float32)
+        self._outputs = [np.zeros(len(bias), dtype=np.float32) for bias in self.biases]
+        # the one hot encoded actions are shared by every call, they are read only so that no caller can change them
+        self._actions = np.eye(len(self.biases[-1]), dtype=int)
+        self._actions.setflags(write=False)
+
+    @staticmethod
+    def from_network(network: FFNN):
+        """
+        Creates a NumpyFFNN from a copy of the current layers of a network. Later changes of the network are not seen by
+        the NumpyFFNN.
+        :param network: the network that will be copied
+        :return: a NumpyFFNN
+        """
+        with T.no_grad():
+            return NumpyFFNN([layer.weight.data.cpu().numpy() for layer in network.layers()],
+                             [layer.bias.data.cpu().numpy() for layer in network.layers()])
+
+    def forward(self, observation: np.array) -> np.array:
+        """
+        Computes the output of the network.
+        :param observation: a numpy array of shape (input_features,)
+        :return: a numpy array of shape (output_features,). It is overwritten by the next forward pass.
+        """
+        self._input[:] = observation
+        x = self._input
+        for i, (weight, bias, output) in enumerate(zip(self.weights, self.biases, self._outputs)):
+            np.matmul(weight, x, out=output)
+            output += bias
+            # the output layer is linear, every other layer is followed by a relu
+            if i < len(self.weights) - 1:
+                np.maximum(output, 0, out=output)
+            x = output
+
+        return x
+
+    def choose_action(self, observation: np.array) -> np.array:
+        """
+        Chooses the action with the highest value.
+        :param observation: a numpy array of shape (input_features,)
+        :return: the one hot encoded action, a read only numpy array of shape (output_features,)
+        """
+        return self._actions[np.argmax(self.forward(observation))]
+
+
+def stack_layers(networks: List[FFNN]) -> (List[T.Tensor], List[T.Tensor]):
+    """
+    Stacks the weights and biases of several networks layer by layer.
+    :param networks: the networks whose layers will be stacked. All networks must have the same layer sizes.
+    :return: a tuple containing the stacked weights of shape (n_networks, out_features, in_features) and the stacked
+    biases of shape (n_networks, out_features) of every layer
+    """
+    n_layers = len(networks[0].layers())
+    weights = [T.stack([network.layers()[i].weight.data for network in networks]) for i in range(n_layers)]
+    biases = [T.stack([network.layers()[i].bias.data for network in networks]) for i in range(n_layers)]
+    return weights, biases
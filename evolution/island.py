@@ -0,0 +1,180 @@
+import multiprocessing
+import queue
+import random
+from typing import Dict, List
+
+import numpy as np
+import torch as T
+from pysnakegym.mdp import SnakeMDP
+
+from agents import GeneticAgent
+from evolution.generational import Generational
+from evolution.population import SnakePopulation
+from util.io.export import GeneticPopulationData
+
+
+class Migration:
+    """
+    Class that exchanges the fittest individuals of an island with the other islands every interval generations. The
+    emigrants of an island replace the least fit individuals of its destination, which is the next island for a "RING"
+    topology and drawn anew for every migration for a "RANDOM" topology. Only the genomes, step sizes, and fitness of
+    the migrants are sent, through the inbox queue of the destination.
+    """
+
+    def __init__(self, island: int, inboxes: List, interval: int, n_migrants: int, topology: str = "RING",
+                 seed: int = None):
+        """
+        Constructor for the Migration class.
+        :param island: the index of the island of this migration
+        :param inboxes: the queue of every island through which it receives its immigrants
+        :param interval: the number of generations between two migrations
+        :param n_migrants: the number of individuals that every island sends
+        :param topology: "RING" or "RANDOM"
+        :param seed: the seed from which the destinations of a random topology are drawn, the same for all islands
+        """
+        self.island = island
+        self.inboxes = inboxes
+        self.interval = interval
+        self.n_migrants = n_migrants
+        self.topology = topology
+        self.seed = seed
+        self._received = {}
+
+    def is_due(self, generation: int) -> bool:
+        return generation > 0 and generation % self.interval == 0
+
+    def destination(self, generation: int) -> int:
+        """
+        Gets the island to which the emigrants of this island are sent. The destinations of all islands are a
+        permutation, so every island receives the emigrants of exactly one island.
+        :param generation: the generation in which the individuals migrate
+        :return: the index of the destination island
+        """
+        n_islands = len(self.inboxes)
+        if self.topology == "RING":
+            return (self.island + 1) % n_islands
+
+        seed_sequence = np.random.SeedSequence(self.seed, spawn_key=(generation,))
+        return int(np.random.default_rng(seed_sequence).permutation(n_islands)[self.island])
+
+    def migrate(self, population: SnakePopulation, generation: int) -> None:
+        """
+        Sends the fittest individuals of a population to its destination and waits for its own immigrants.
+        :param population: the population of the island after its fitness has been calculated
+        :param generation: the current generation
+        :return: None
+        """
+        weights, sigmas, fitness = population.emigrants(self.n_migrants)
+        self.inboxes[self.destination(generation)].put((generation, weights, sigmas, fitness))
+
+        # the immigrants of a later migration can arrive first if their island is ahead
+        while generation not in self._received:
+            message = self.inboxes[self.island].get()
+            self._received[message[0]] = message[1:]
+        population.immigrate(*self._received.pop(generation))
+
+
+def _run_island(island: int, population_params: Dict, n_generations: int, path: str, migration: Migration,
+                results) -> None:
+    # every island is a single process, so it should not start threads that compete with the other islands
+    T.set_num_threads(1)
+    seed = population_params["seed"]
+    random.seed(seed)
+    np.random.seed(seed)
+    T.manual_seed(seed)
+
+    island_path = None if path is None else f"{path}/island_{island}"
+    population_data = GeneticPopulationData(island_path)
+    population = SnakePopulation(**population_params, population_data=population_data)
+    Generational(population, migration=migration, log_dir=island_path).run(n_generations)
+    results.put((island, population.hall_of_fame, np.array(population_data.get_generational_data())))
+
+
+class IslandModel:
+    """
+    Class for an island model where several populations evolve in separate processes. Each island is a generational
+    evolution with its own hyperparameters, and every migration_interval generations the islands exchange their
+    fittest individuals. Apart from the migrations the islands do not synchronise.
+    """
+
+    def __init__(self, islands: List[Dict], migration_interval: int, n_migrants: int, topology: str = "RING",
+                 seed: int = None, path: str = None):
+        """
+        Constructor for the IslandModel class.
+        :param islands: the keyword arguments of the SnakePopulation of every island, without seed and population_data
+        :param migration_interval: the number of generations between two migrations
+        :param n_migrants: the number of individuals that every island sends in a migration
+        :param topology: "RING" or "RANDOM"
+        :param seed: the seed of the run from which the seeds of the islands are derived
+        :param path: the directory to which the fitness of every island is streamed. None keeps it in memory.
+        """
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        self.topology = topology
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.path = path
+        self.hall_of_fames = []
+        self.population_data = None
+
+    def run(self, n_generations: int) -> None:
+        """
+        Runs every island in its own process for the number of generations and collects their results.
+        :return:
+        """
+        seeds = [int(seed_sequence.generate_state(1)[0]) for seed_sequence in self.seed_sequence.spawn(len(self.islands))]
+        inboxes = [multiprocessing.Queue() for _ in self.islands]
+        results = multiprocessing.Queue()
+        processes = []
+        for island, params in enumerate(self.islands):
+            migration = Migration(island, inboxes, self.migration_interval, self.n_migrants, self.topology,
+                                  self.seed_sequence.entropy)
+            processes.append(multiprocessing.Process(target=_run_island, daemon=True,
+                                                     args=(island, dict(params, seed=seeds[island]), n_generations,
+                                                           self.path, migration, results)))
+        for process in processes:
+            process.start()
+
+        island_results = {}
+        try:
+            while len(island_results) < len(processes):
+                try:
+                    island, hall_of_fame, fitness = results.get(timeout=1)
+                    island_results[island] = (hall_of_fame, fitness)
+                except queue.Empty:
+                    # the other islands would wait forever for the migrants of an island that failed
+                    failed = [i for i, process in enumerate(processes) if process.exitcode not in [None, 0]]
+                    if failed:
+                        raise Exception(f"The islands {failed} failed")
+        finally:
+            for process in processes:
+                if process.exitcode is None and len(island_results) < len(processes):
+                    process.terminate()
+                process.join()
+
+        self.hall_of_fames = [island_results[island][0] for island in range(len(processes))]
+        # the individuals of all islands form the population of a generation
+        self.population_data = GeneticPopulationData()
+        fitness = np.concatenate([island_results[island][1] for island in range(len(processes))])
+        for generation in range(n_generations):
+            self.population_data.add_generational_fitness(np.sort(fitness[:, generation]))
+
+    def best_individual_of(self, generation: int = None) -> GeneticAgent:
+        """
+        Returns the best individual of all islands up to the specified generation, rebuilt from the hall of fame of
+        its island.
+        :param generation: the last generation that is considered. None considers all generations.
+        :return: the individual with the highest fitness up to and including the generation
+        """
+        best = [hall_of_fame.best(generation) for hall_of_fame in self.hall_of_fames]
+        island = int(np.argmax([hall_of_fame.fitness(index) for hall_of_fame, index in zip(self.hall_of_fames, best)]))
+        params = self.islands[island]
+        mdp = SnakeMDP(screen_width=params["screen_width"], screen_height=params["screen_height"],
+                       snake_size=params["snake_size"], show_game=False)
+        return self.hall_of_fames[island].agent(best[island], mdp, params["mutation_rate"])
+
+    def best_individual(self) -> GeneticAgent:
+        return self.best_individual_of()
+
+    def get_population_data(self):
+        return self.population_data
@@ -0,0 +1,110 @@
+import math
+from typing import Dict, List
+
+import torch as T
+
+from evolution.genome import GenomeMatrix
+
+
+def mutation_mask(genomes: T.Tensor, mutation_rate: float) -> T.Tensor:
+    """
+    Draws a Bernoulli mask for a whole batch of genomes at once.
+    :param genomes: a tensor of shape (n_genomes, n_weights)
+    :param mutation_rate: the probability of each gene being mutated
+    :return: a boolean tensor of the same shape as genomes which is True for every gene that is mutated
+    """
+    return T.rand(genomes.shape) < mutation_rate
+
+
+def _per_layer(value, n_layers: int) -> List:
+    if isinstance(value, list):
+        if len(value) != n_layers:
+            raise Exception(f'{value} must contain one value for each of the {n_layers} layers')
+        return value
+    return [value] * n_layers
+
+
+class Mutation:
+    """
+    Interface for the evolutionary mutation mechanism. A mutation changes a whole batch of genomes in place.
+    """
+    def __init__(self, params: Dict):
+        self.params = params
+
+    def initialise(self, genomes: GenomeMatrix) -> None:
+        """
+        Prepares the genomes of a new population for this mutation.
+        :param genomes: the genome matrix of the population
+        :return: None
+        """
+        pass
+
+    def mutate(self, genomes: T.Tensor, sigmas: T.Tensor, layers: List[slice], mutation_rate: float) -> None:
+        """
+        Mutates a batch of genomes in place.
+        :param genomes: a tensor of shape (n_genomes, n_weights)
+        :param sigmas: the mutation step size of every genome, a tensor of shape (n_genomes,)
+        :param layers: the columns of every layer in the genomes
+        :param mutation_rate: the probability of each gene being mutated
+        :return: None
+        """
+        pass
+
+    def set_params(self, params):
+        pass
+
+
+class UniformMutation(Mutation):
+    """
+    Implementation of a uniform reset mutation where a mutated gene is replaced by a value drawn uniformly from [-1, 1].
+    """
+
+    def mutate(self, genomes: T.Tensor, sigmas: T.Tensor, layers: List[slice], mutation_rate: float) -> None:
+        mask = mutation_mask(genomes, mutation_rate)
+        genomes[mask] = T.rand(int(mask.sum())) * 2 - 1
+
+
+class GaussianMutation(Mutation):
+    """
+    Implementation of a Gaussian perturbation where normally distributed noise is added to a mutated gene. Mean and
+    standard deviation of the noise can be set per layer with the params "mean" and "sd", either as a single value for
+    all layers or as a list with one value per layer. If no standard deviation is set, the standard deviation of the
+    genes of the layer across the batch is used.
+    """
+
+    def set_params(self, params):
+        self.params = params
+
+    def mutate(self, genomes: T.Tensor, sigmas: T.Tensor, layers: List[slice], mutation_rate: float) -> None:
+        means = _per_layer(self.params.get("mean", 0.0), len(layers))
+        sds = _per_layer(self.params.get("sd", None), len(layers))
+        mask = mutation_mask(genomes, mutation_rate)
+
+        noise = T.randn(genomes.shape)
+        for columns, mean, sd in zip(layers, means, sds):
+            if sd is None:
+                sd = genomes[:, columns].std().item() if genomes[:, columns].numel() > 1 else 0.0
+            noise[:, columns].mul_(sd).add_(mean)
+
+        genomes.add_(noise * mask)
+
+
+class SelfAdaptiveMutation(Mutation):
+    """
+    Implementation of a self-adaptive Gaussian mutation. Every genome carries its own step size sigma which is mutated
+    log-normally before it is used to perturb the genome, sigma' = sigma * exp(tau * N(0, 1)) and x' = x + sigma' * N(0, 1).
+    The param "sigma" sets the initial step size and "tau" the learning rate which defaults to 1 / sqrt(n_weights).
+    """
+
+    def set_params(self, params):
+        self.params = params
+
+    def initialise(self, genomes: GenomeMatrix) -> None:
+        genomes.sigmas.fill_(self.params.get("sigma", 0.1))
+
+    def mutate(self, genomes: T.Tensor, sigmas: T.Tensor, layers: List[slice], mutation_rate: float) -> None:
+        tau = self.params.get("tau", 1 / math.sqrt(max(genomes.shape[1], 1)))
+        sigmas.mul_(T.exp(tau * T.randn(sigmas.shape)))
+
+        mask = mutation_mask(genomes, mutation_rate)
+        genomes.add_(T.randn(genomes.shape) * sigmas.unsqueeze(1) * mask)
@@ -0,0 +1,86 @@
+import contextlib
+import cProfile
+import json
+import os
+import time
+
+
+class PhaseTimer:
+    """
+    Class that measures the wall clock and CPU time of every phase of a generation. The times of a generation, together
+    with the steps and games that were simulated per second, are written to a SummaryWriter and, if a path is given, as
+    one json line per generation to phases.jsonl. The CPU time is the time of the training process, the games that are
+    played by worker processes do not count towards it.
+
+    A single generation can be profiled with cProfile, its dump is saved as generation_<generation>.prof in the path.
+    """
+    FILE = "/phases.jsonl"
+
+    def __init__(self, path: str = None, profile_generation: int = None):
+        """
+        Constructor for the PhaseTimer class.
+        :param path: the directory to which the times and the profile are written. None only writes to the
+        SummaryWriter.
+        :param profile_generation: the generation that is profiled. None does not profile.
+        """
+        self.path = path
+        self.profile_generation = profile_generation
+        self.times = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        yield
+        self.times[name] = {"wall": time.perf_counter() - wall, "cpu": time.process_time() - cpu}
+
+    @contextlib.contextmanager
+    def profile(self, generation: int):
+        """
+        Profiles the generation if it is the generation that should be profiled.
+        :param generation: the generation that is run inside the context
+        """
+        if generation != self.profile_generation or self.path is None:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(self.path, exist_ok=True)
+            profiler.dump_stats(f"{self.path}/generation_{generation}.prof")
+
+    def finish_generation(self, writer, generation: int, simulated_steps: int,
+                          simulated_games: int) -> None:
+        """
+        Records the times of the phases of a generation and starts timing the next generation.
+        :param writer: the SummaryWriter of the run
+        :param generation: the generation whose phases were timed
+        :param simulated_steps: the number of steps of all games that were played in the generation
+        :param simulated_games: the number of games that were played in the generation
+        :return: None
+        """
+        simulate = self.times.get("simulate", {}).get("wall", 0.0)
+        record = {
+            "generation": generation,
+            "phases": self.times,
+            "steps_per_second": simulated_steps / simulate if simulate > 0 else 0.0,
+            "evaluations_per_second": simulated_games / simulate if simulate > 0 else 0.0,
+        }
+
+        for name, times in self.times.items():
+            writer.add_scalar(f"Wall Time/{name}", times["wall"], global_step=generation)
+            writer.add_scalar(f"CPU Time/{name}", times["cpu"], global_step=generation)
+        writer.add_scalar("Steps per Second", record["steps_per_second"], global_step=generation)
+        writer.add_scalar("Evaluations per Second", record["evaluations_per_second"], global_step=generation)
+
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+            # a resumed run appends to the times of the interrupted run, the generations that were run after its last
+            # checkpoint are recorded twice
+            with open(self.path + PhaseTimer.FILE, "a") as file:
+                file.write(json.dumps(record) + "\n")
+
+        self.times = {}
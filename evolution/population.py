@@ -1,5 +1,4 @@
-import copy
-import random
+from typing import Dict
 
 import numpy as np
 import torch as T
@@ -9,6 +8,13 @@ from pysnakegym.model import FFNN
 from tqdm import tqdm, trange
 
 from agents import GeneticAgent
+from environment import BatchSnakeMDP, Termination
+from evolution.crossover import Crossover, NPointCrossover
+from evolution.evaluation import EvaluationPool, play
+from evolution.genome import GenomeMatrix
+from evolution.hall_of_fame import HallOfFame
+from evolution.inference import BatchedFFNN
+from evolution.mutation import Mutation, UniformMutation
 from evolution.selection import Selection
 from util.io.export import GeneticPopulationData
 
@@ -17,7 +23,8 @@ class Population:
 
     def __init__(self, pop_size: int, hidden_layers, mutation_rate: float, crossover_rate: float, elitism: float,
                  fitness_func, selection: Selection, show_game: bool, screen_width: int, screen_height: int,
-                 snake_size: int):
+                 snake_size: int, simulation_mode: str = "SERIAL", workers: int = 0, seed: int = None,
+                 mutation: Mutation = None, crossover_func: Crossover = None, crossover_points: int = 1):
         self.pop_size = pop_size
         self.hidden_layers = hidden_layers
         self.mutation_rate = mutation_rate
@@ -26,14 +33,25 @@ class Population:
         self.fitness_func = fitness_func
         self.selection = selection
         self.individuals = []
-        self.best_individual = None
+        self.hall_of_fame = None
         self.population_data = None
         self.selected_individuals = []
         self.elites = []
+        self.elite_scales = None
         self.show_game = show_game
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.snake_size = snake_size
+        self.simulation_mode = simulation_mode
+        self.workers = workers
+        self.seed = seed
+        self.mutation = mutation if mutation is not None else UniformMutation({})
+        self.crossover_func = crossover_func if crossover_func is not None else NPointCrossover({})
+        self.crossover_points = crossover_points
+        self.generation = 0
+        # the number of steps and games that were played in the last call of simulate
+        self.simulated_steps = 0
+        self.simulated_games = 0
         pass
 
     def initialise_population(self):
@@ -63,6 +81,15 @@ class Population:
     def reset(self):
         pass
 
+    def state_dict(self):
+        pass
+
+    def load_state_dict(self, state):
+        pass
+
+    def close(self):
+        pass
+
     def is_finished(self):
         pass
 
@@ -70,7 +97,9 @@ class Population:
 class SnakePopulation(Population):
 
     def __init__(self, pop_size, hidden_layers, mutation_rate, crossover_rate, elitism, fitness_func, selection,
-                 show_game, screen_width, screen_height, snake_size):
+                 show_game, screen_width, screen_height, snake_size, simulation_mode="SERIAL", workers=0, seed=None,
+                 mutation=None, crossover_func=None, crossover_points=1, population_data=None, fitness_cache=None,
+                 same_games=False, termination=None, genome_dtype="FLOAT32"):
         Population.__init__(self,
                             pop_size=pop_size,
                             hidden_layers=hidden_layers,
@@ -82,148 +111,341 @@ class SnakePopulation(Population):
                             show_game=show_game,
                             screen_width=screen_width,
                             screen_height=screen_height,
-                            snake_size=snake_size)
-        self.population_data = GeneticPopulationData()
+                            snake_size=snake_size,
+                            simulation_mode=simulation_mode,
+                            workers=workers,
+                            seed=seed,
+                            mutation=mutation,
+                            crossover_func=crossover_func,
+                            crossover_points=crossover_points)
+        self.population_data = population_data if population_data is not None else GeneticPopulationData()
+        self.fitness_cache = fitness_cache
+        self.same_games = same_games
+        self.termination = termination if termination is not None else Termination()
+        self.genome_dtype = genome_dtype
+        self.batch_mdp = None
+        self.evaluation_pool = None
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.genomes = None
 
     def initialise_population(self):
         self.selected_individuals = []
         self.children_genomes = []
 
-        for _ in trange(self.pop_size, desc='Initialising population'):
-            mdp = SnakeMDP(screen_width=self.screen_width, screen_height=self.screen_height, snake_size=self.snake_size,
-                           show_game=self.show_game)
-            layers = self.hidden_layers.copy()
-            layers.insert(0, mdp.state_dims()[0])
-            layers.append(Direction.n_actions())
+        mdps = [SnakeMDP(screen_width=self.screen_width, screen_height=self.screen_height, snake_size=self.snake_size,
+                         show_game=self.show_game) for _ in trange(self.pop_size, desc='Initialising population')]
+        layers = self.hidden_layers.copy()
+        layers.insert(0, mdps[0].state_dims()[0])
+        layers.append(Direction.n_actions())
+
+        # the weights of all individuals are drawn at once and their networks are attached to their row of the matrix
+        self.genomes = GenomeMatrix(self.pop_size, layers, self.genome_dtype)
+        self.genomes.initialise()
+        self.mutation.initialise(self.genomes)
+
+        for i, mdp in enumerate(mdps):
             neural_network = FFNN(layers)
-            self.individuals.append(
-                GeneticAgent(mdp=mdp, neural_network=neural_network, mutation_rate=self.mutation_rate))
+            self.genomes.attach(i, neural_network)
+            solution = GeneticAgent(mdp=mdp, neural_network=neural_network, mutation_rate=self.mutation_rate,
+                                    termination=self.termination)
+            solution.genome_index = i
+            self.individuals.append(solution)
 
-        self.best_individual = copy.deepcopy(self.individuals[0])
+        self.hall_of_fame = HallOfFame(layers)
+
+    @property
+    def best_individual(self) -> GeneticAgent:
+        return self.best_individual_of()
+
+    def best_individual_of(self, generation: int = None) -> GeneticAgent:
+        """
+        Rebuilds the best individual from the hall of fame.
+        :param generation: the last generation that is considered. None considers all generations.
+        :return: the individual with the highest fitness up to the generation
+        """
+        mdp = SnakeMDP(screen_width=self.screen_width, screen_height=self.screen_height, snake_size=self.snake_size,
+                       show_game=False)
+        return self.hall_of_fame.agent(self.hall_of_fame.best(generation), mdp, self.mutation_rate)
 
     def simulate(self):
-        for solution in tqdm(self.individuals, desc='Simulating'):
-            solution.simulate()
+        individuals, seeds = self.individuals, self._episode_seeds()
+        # games that are shown on the screen are always played, even if their outcome is known
+        use_cache = self.fitness_cache is not None and not self.show_game
+        if use_cache:
+            individuals, seeds, keys = self._cached_episodes(individuals, seeds)
+
+        if len(individuals) > 0:
+            self._play(individuals, seeds)
+        # games whose outcome was cached are not played
+        self.simulated_steps = sum(solution.episode.n_steps() for solution in individuals)
+        self.simulated_games = len(individuals)
+
+        if use_cache:
+            for solution, key in zip(individuals, keys):
+                if solution.episode.is_replayable():
+                    self.fitness_cache.put(key, solution.episode)
+            print(f'Fitness cache: {self.fitness_cache.hits} hits, {self.fitness_cache.misses} misses')
+
+    def _play(self, individuals, seeds):
+        # games that are shown on the screen share a single window, so they are always played one after the other
+        if self.workers > 0 and not self.show_game:
+            self._simulate_parallel(individuals, seeds)
+        elif self.simulation_mode == "BATCHED" and not self.show_game:
+            self._simulate_batched(individuals, seeds)
+        elif self.simulation_mode == "VECTORIZED" and not self.show_game:
+            self._simulate_vectorized(individuals, seeds)
+        else:
+            for solution, seed in tqdm(zip(individuals, seeds), total=len(seeds), desc='Simulating'):
+                self.genomes.load(solution.genome_index)
+                solution.simulate(int(seed))
+
+    def _cached_episodes(self, individuals, seeds):
+        """
+        Finishes the episodes of the individuals whose games are in the fitness cache.
+        :param individuals: the individuals that play a game
+        :param seeds: the seed of the game of every individual
+        :return: a tuple of the individuals whose games are not cached, their seeds, and the cache keys of their games
+        """
+        misses, miss_seeds, keys = [], [], []
+        biases = self.genomes.biases.numpy()
+        for solution, seed in zip(individuals, seeds):
+            key = self.fitness_cache.key(self.genomes.genome(solution.genome_index), biases[solution.genome_index], seed)
+            episode = self.fitness_cache.get(key)
+            if episode is None:
+                misses.append(solution)
+                miss_seeds.append(seed)
+                keys.append(key)
+            else:
+                self._finish_episodes([solution], [episode])
+
+        return misses, np.array(miss_seeds, dtype=np.int64), keys
+
+    def _simulate_batched(self, individuals, seeds):
+        """
+        Plays the games of all individuals at the same time. The actions of all individuals that are still alive are
+        computed with one batched forward pass per step and individuals are dropped from the batch as soon as their
+        game is over.
+        :return:
+        """
+        network = self._batched_network(individuals)
+        alive = np.array([solution for solution in individuals], dtype=object)
+        states = np.stack([solution.start_episode(int(seed)) for solution, seed in zip(alive, seeds)])
+
+        with tqdm(total=len(alive), desc='Simulating') as progress:
+            while len(alive) > 0:
+                actions = np.eye(Direction.n_actions(), dtype=int)[network.choose_actions(states)]
+                still_alive = np.ones(len(alive), dtype=bool)
+
+                for i, (solution, action) in enumerate(zip(alive, actions)):
+                    states[i], done = solution.take_action(action)
+                    still_alive[i] = not done
+
+                if not still_alive.all():
+                    progress.update(len(alive) - still_alive.sum())
+                    network.keep(still_alive)
+                    alive = alive[still_alive]
+                    states = states[still_alive]
+
+    def _simulate_vectorized(self, individuals, seeds):
+        """
+        Plays the games of all individuals at the same time in a BatchSnakeMDP. Only the seed and the actions of each
+        game are recorded, the game sequences of an individual are re-simulated from them when they are needed.
+        :return:
+        """
+        if self.batch_mdp is None or self.batch_mdp.n_games != len(individuals):
+            self.batch_mdp = BatchSnakeMDP(len(individuals), **self._environment_config())
+
+        network = self._batched_network(individuals)
+        with tqdm(total=len(individuals), desc='Simulating') as progress:
+            episodes = play(self.batch_mdp, network, seeds, progress)
+
+        self._finish_episodes(individuals, episodes)
+
+    def _simulate_parallel(self, individuals, seeds):
+        """
+        Plays the games of all individuals in the worker processes of an EvaluationPool. Only the weights and biases of
+        the individuals are sent to the workers.
+        :return:
+        """
+        if self.evaluation_pool is None:
+            self.evaluation_pool = EvaluationPool(self.workers)
+
+        weights, biases = self.genomes.stacked_layers(self._genome_rows(individuals))
+        with tqdm(total=len(individuals), desc='Simulating') as progress:
+            episodes = self.evaluation_pool.evaluate([weight.numpy() for weight in weights],
+                                                     [bias.numpy() for bias in biases],
+                                                     self._environment_config(), seeds, progress)
+
+        self._finish_episodes(individuals, episodes)
+
+    def _finish_episodes(self, individuals, episodes):
+        for solution, episode in zip(individuals, episodes):
+            solution.game_sequences = []
+            solution.time_alive += episode.n_steps()
+            solution.finish_episode(episode)
+
+    @staticmethod
+    def _genome_rows(individuals):
+        return [solution.genome_index for solution in individuals]
+
+    def _batched_network(self, individuals) -> BatchedFFNN:
+        weights, biases = self.genomes.stacked_layers(self._genome_rows(individuals))
+        return BatchedFFNN(weights, biases, individuals[0].neural_network.device)
+
+    def _environment_config(self):
+        return dict(screen_width=self.screen_width, screen_height=self.screen_height, snake_size=self.snake_size,
+                    termination=self.termination)
+
+    def _episode_seeds(self) -> np.array:
+        """
+        Derives the seed of the game of every individual from the seed of the population, the generation, and the
+        position of the individual in the population. If the population plays the same games, every individual of every
+        generation plays the game of a single seed that is derived from the seed of the population.
+        :return: a numpy array of shape (pop_size,)
+        """
+        if self.same_games:
+            seed = self.seed_sequence.generate_state(1, np.uint64) >> np.uint64(1)
+            return np.full(len(self.individuals), seed[0], dtype=np.int64)
 
+        seed_sequence = np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=(self.generation,))
+        return (seed_sequence.generate_state(len(self.individuals), np.uint64) >> np.uint64(1)).astype(np.int64)
 
     def calculate_fitness(self):
         for solution in tqdm(self.individuals, desc='Calculating fitness'):
             solution.calculate_fitness(self.fitness_func)
 
-            # keeping track of the best performing individual across all generations
-            if solution.fitness > self.best_individual.fitness:
-                self.best_individual = copy.deepcopy(solution)
+        # keeping track of the best performing individual of every generation
+        best = max(self.individuals, key=lambda solution: solution.fitness)
+        replay = best.episode if best.episode is not None and best.episode.is_replayable() else best.game_sequences
+        self.hall_of_fame.add(self.generation, best.fitness, self.genomes.genome(best.genome_index),
+                              self.genomes.biases[best.genome_index].numpy(), replay)
 
-        print(f'best fitness: {self.best_individual.fitness}')
+        print(f'best fitness: {self.hall_of_fame.fitness(self.hall_of_fame.best())}')
 
         self.individuals = sorted(self.individuals, key=lambda solution: solution.fitness)
-        self.population_data.add_generational_fitness(np.array([[solution.fitness for solution in self.individuals]]))
+        self.population_data.add_generational_fitness(np.array([solution.fitness for solution in self.individuals]))
 
     def candidate_selection(self):
         # self.elitism of len of self.individuals
         elite_index = len(self.individuals) - int(self.elitism * len(self.individuals))
         elites = self.individuals[elite_index:]
-        for elite in tqdm(elites, desc='Copying elites into the next generation'):
-            self.elites.append(elite.get_genome())
+        # indexing the matrix copies the rows, so the elites are not changed by the replacement. The elites are copied
+        # in the dtype of the matrix, so that a compact matrix does not round them again
+        elite_rows = T.tensor([elite.genome_index for elite in elites], dtype=T.long)
+        self.elites, self.elite_scales = self.genomes.codes(elite_rows)
+        self.elite_sigmas = self.genomes.sigmas.index_select(0, elite_rows)
 
         print(f'Elite fitness:{[individual.fitness for individual in self.individuals[elite_index:]]}')
         print(f'Selecting {elite_index} individuals from the population')
-        selected = self.selection.select(self.individuals, len(self.individuals[:elite_index]))
-        self.selected_individuals.extend(selected)
+        fitness = np.array([solution.fitness for solution in self.individuals])
+        selected = self.selection.select(fitness, len(self.individuals[:elite_index]))
+        self.selected_individuals.extend(self.individuals[i] for i in selected)
 
-    def crossover(self, n_crossover_points=1):
+    def crossover(self, n_crossover_points=None):
         """
-
-        :param n_crossover_points:
+        Pairs the first half of the selected individuals with the second half and creates two children for every pair
+        that crosses over. The children of all pairs are created at once by the crossover function of the population.
+        :param n_crossover_points: the number of crossover points in every layer, defaults to the crossover points of
+        the population
         :return:
         """
+        if n_crossover_points is None:
+            n_crossover_points = self.crossover_points
 
         middle = int(len(self.selected_individuals) / 2)
+        rows = T.tensor([solution.genome_index for solution in self.selected_individuals[:2 * middle]], dtype=T.long)
+        rows_1, rows_2 = rows[:middle], rows[middle:]
+        crossing = T.rand(middle) <= self.crossover_rate
+        rows_1, rows_2 = rows_1[crossing], rows_2[crossing]
 
-        for parent_1, parent_2 in zip(self.selected_individuals[:middle], self.selected_individuals[middle:]):
-            if random.random() <= self.crossover_rate:
-                # get genomes
-                parent_1_genomes = parent_1.get_genome()
-                parent_2_genomes = parent_2.get_genome()
-
-                child_1_genomes = []
-                child_2_genomes = []
-
-                for parent_1_genome, parent_2_genome in zip(parent_1_genomes, parent_2_genomes):
-                    child_1_genome, child_2_genome = self._make_children(parent_1_genome, parent_2_genome,
-                                                                         n_crossover_points)
-
-                    child_1_genomes.append(child_1_genome)
-                    child_2_genomes.append(child_2_genome)
+        parents_1 = self.genomes.genomes(rows_1)
+        parents_2 = self.genomes.genomes(rows_2)
+        children_1, children_2 = self.crossover_func.crossover(parents_1, parents_2, self.genomes.layer_slices(),
+                                                               n_crossover_points)
 
-                self.children_genomes.append(child_1_genomes)
-                self.children_genomes.append(child_2_genomes)
-
-    def _make_children(self, parent_1_genome, parent_2_genome, n_crossover_points: int):
-        crossover_indexes = self._get_crossover_indeces(n_crossover_points, parent_1_genome)
-        crossover_indexes.append(len(parent_1_genome))  # append final index of list so that we can get the final slice
-
-        # prepare the child genomes
-        child_1_genome = T.tensor([])
-        child_2_genome = T.tensor([])
-
-        start_index = 0
-        for i in range(len(crossover_indexes)):
-            index: int = crossover_indexes[i]
-
-            # slice parents
-            parent_1_partition = parent_1_genome[start_index:index]
-            parent_2_partition = parent_2_genome[start_index:index]
-
-            # this is to ensure that only ever other index is actually swapped
-            if i % 2 == 0:
-                child_1_genome = T.cat([child_1_genome, parent_2_partition])
-                child_2_genome = T.cat([child_2_genome, parent_1_partition])
-            else:
-                child_1_genome = T.cat([child_1_genome, parent_1_partition])
-                child_2_genome = T.cat([child_2_genome, parent_2_partition])
-
-            start_index = index
-
-        return child_1_genome, child_2_genome
-
-    def _get_crossover_indeces(self, n_crossover_points, parent_genome):
-        return [random.randint(0, len(parent_genome)) for i in range(n_crossover_points)]
+        # the two children of a pair are next to each other and both inherit the mean step size of their parents
+        self.children_genomes = T.stack([children_1, children_2], dim=1).reshape(-1, self.genomes.n_weights)
+        sigmas = (self.genomes.sigmas[rows_1] + self.genomes.sigmas[rows_2]) / 2
+        self.children_sigmas = sigmas.repeat_interleave(2)
 
     def mutate_children(self):
         """
-
+        Mutates the genomes of all children at once with the mutation of the population.
         :return:
         """
+        self.mutation.mutate(self.children_genomes, self.children_sigmas, self.genomes.layer_slices(),
+                             self.mutation_rate)
 
-        def mutate(value):
-            if self.mutation_rate > random.random():
-                return random.random() * 2 - 1
-            return value
+    def replace(self):
+        """
+        Replacement strategy?
+        :return:
+        """
+        # the children replace the genomes of the worst individuals, followed by the elites. The children and the elites
+        # are each written to the genome matrix with a single copy, so the networks of the individuals see their new
+        # weights immediately. A compact matrix rounds the children to its dtype, the elites are copied unchanged
+        n_children = min(len(self.children_genomes), len(self.individuals))
+        n_elites = min(len(self.elites), len(self.individuals) - n_children)
+        rows = T.tensor([solution.genome_index for solution in self.individuals[:n_children + n_elites]], dtype=T.long)
+        self.genomes.set_genomes(rows[:n_children], self.children_genomes[:n_children])
+        self.genomes.set_codes(rows[n_children:], self.elites[:n_elites],
+                               self.elite_scales[:n_elites] if self.elite_scales is not None else None)
+        sigmas = T.cat([self.children_sigmas, self.elite_sigmas])[:len(rows)]
+        self.genomes.sigmas.index_copy_(0, rows, sigmas)
+
+    def emigrants(self, n_migrants: int) -> (np.array, np.array, np.array):
+        """
+        Copies the genomes of the fittest individuals so that they can be sent to another population. The fitness of
+        the population must have been calculated.
+        :param n_migrants: the number of individuals that emigrate
+        :return: a tuple of the weights of shape (n_migrants, n_weights), the step sizes and the fitness of the emigrants
+        """
+        emigrants = self.individuals[len(self.individuals) - n_migrants:]
+        rows = T.tensor([solution.genome_index for solution in emigrants], dtype=T.long)
+        return self.genomes.genomes(rows).numpy(), self.genomes.sigmas.index_select(0, rows).numpy(), \
+            np.array([solution.fitness for solution in emigrants])
 
-        def mutate_gauss(value, mean, sd):
-            if self.mutation_rate > random.random():
-                return np.random.normal(loc=mean, scale=sd, size=1)
-            return value
+    def immigrate(self, weights: np.array, sigmas: np.array, fitness: np.array) -> None:
+        """
+        Replaces the least fit individuals by immigrants from another population. The immigrants keep the fitness they
+        had in their population, so they take part in the selection of this generation.
+        :param weights: the genomes of the immigrants, an array of shape (n_migrants, n_weights)
+        :param sigmas: the mutation step sizes of the immigrants
+        :param fitness: the fitness of the immigrants
+        :return:
+        """
+        replaced = self.individuals[:len(weights)]
+        rows = T.tensor([solution.genome_index for solution in replaced], dtype=T.long)
+        self.genomes.set_genomes(rows, T.as_tensor(weights, dtype=T.float32))
+        self.genomes.sigmas.index_copy_(0, rows, T.as_tensor(sigmas, dtype=self.genomes.sigmas.dtype))
+        for solution, solution_fitness in zip(replaced, fitness):
+            solution.fitness = float(solution_fitness)
+            solution.episode = None
+            solution.game_sequences = []
 
-        for child_genome in self.children_genomes:
-            for layer_genome in child_genome:
-                # mean = np.mean(layer_genome.numpy())
-                # sd = np.std(layer_genome.numpy())
-                # layer_genome.apply_(lambda x: mutate_gauss(x, mean, sd))
-                layer_genome.apply_(lambda x: mutate(x))
+        self.individuals = sorted(self.individuals, key=lambda solution: solution.fitness)
 
-    def replace(self):
+    def breed(self, parent_1: int, parent_2: int, row: int) -> None:
         """
-        Replacement strategy?
+        Creates a single child of two parents and writes it into a row of the genome matrix. The parents cross over with
+        the crossover rate of the population, otherwise the child is a copy of the first parent, and the child is mutated
+        before it is written. One of the parents may be the individual that is replaced.
+        :param parent_1: the row of the first parent in the genome matrix
+        :param parent_2: the row of the second parent in the genome matrix
+        :param row: the row of the individual that is replaced by the child
         :return:
         """
-        # loop over the genomes of children
-        # create a new Genetic Agent for each genome
-        # replace agent in population
-        self.children_genomes.extend(self.elites)
-        for solution, child in zip(self.individuals, self.children_genomes):
-            solution.set_genome(child)
+        parents = T.tensor([parent_1, parent_2], dtype=T.long)
+        parent_genomes = self.genomes.genomes(parents)
+        child = parent_genomes[:1]
+        if T.rand(1).item() <= self.crossover_rate:
+            child, _ = self.crossover_func.crossover(parent_genomes[:1], parent_genomes[1:], self.genomes.layer_slices(),
+                                                     self.crossover_points)
+
+        sigma = self.genomes.sigmas.index_select(0, parents).mean(dim=0, keepdim=True)
+        self.mutation.mutate(child, sigma, self.genomes.layer_slices(), self.mutation_rate)
+        self.genomes.set_genomes(T.tensor([row]), child)
+        self.genomes.sigmas[row] = sigma[0]
 
     def reset(self):
         for solution in self.individuals:
@@ -231,7 +453,66 @@ class SnakePopulation(Population):
 
         self.selected_individuals = []
         self.children_genomes = []
+        self.children_sigmas = []
         self.elites = []
+        self.elite_scales = None
+        self.elite_sigmas = []
+        self.generation += 1
+
+    def state_dict(self) -> Dict:
+        """
+        Gets the state of the population between two generations, i.e. everything that is needed to continue the run
+        apart from the random number generators.
+        :return: a dictionary with the state of the population
+        """
+        return {
+            "generation": self.generation,
+            "seed_entropy": self.seed_sequence.entropy,
+            "weights": self.genomes.weights.clone(),
+            "biases": self.genomes.biases.clone(),
+            "sigmas": self.genomes.sigmas.clone(),
+            "scales": self.genomes.scales.clone() if self.genomes.scales is not None else None,
+            "order": [solution.genome_index for solution in self.individuals],
+            "hall_of_fame": self.hall_of_fame,
+            "population_data": self.population_data.state_dict(),
+            "selection": self.selection,
+            "mutation": self.mutation,
+            "crossover_func": self.crossover_func,
+        }
+
+    def load_state_dict(self, state: Dict):
+        """
+        Restores the state of an initialised population. The genomes are copied into the genome matrix, so the networks
+        of the individuals keep reading from it.
+        :param state: a dictionary returned by state_dict
+        :return:
+        """
+        self.generation = state["generation"]
+        self.seed_sequence = np.random.SeedSequence(state["seed_entropy"])
+        self.genomes.weights.copy_(state["weights"])
+        self.genomes.biases.copy_(state["biases"])
+        self.genomes.sigmas.copy_(state["sigmas"])
+        if self.genomes.scales is not None:
+            self.genomes.scales.copy_(state["scales"])
+
+        # the order of the individuals decides which game seed each of them gets
+        individuals = {solution.genome_index: solution for solution in self.individuals}
+        self.individuals = [individuals[index] for index in state["order"]]
+        self.hall_of_fame = state["hall_of_fame"]
+        self.population_data.load_state_dict(state["population_data"])
+        self.selection = state["selection"]
+        self.mutation = state["mutation"]
+        self.crossover_func = state["crossover_func"]
+
+    def close(self):
+        """
+        Releases the worker processes of the population and closes the files of its data.
+        :return:
+        """
+        if self.evaluation_pool is not None:
+            self.evaluation_pool.close()
+            self.evaluation_pool = None
+        self.population_data.close()
 
     def is_finished(self):
         # here return the max value that we expect
@@ -1,36 +1,76 @@
+import functools
 import math
-import random
-from typing import List, Dict
+from typing import Dict
 
-from agents.genetic_agent import GeneticAgent
+import numpy as np
 
 
-def roulette_wheel_select(probabilities):
+def roulette_wheel_select(cumulative_probabilities: np.array, n_parents: int) -> np.array:
     """
-    selects a single individual from the population
-    :return:
+    Spins a roulette wheel n_parents times. Every spin is a binary search of a random number in the cumulative
+    probabilities, so selecting all parents costs O(n_parents log n).
+    :param cumulative_probabilities: the cumulative sum of the selection probabilities of the individuals
+    :param n_parents: the number of individuals to be selected
+    :return: the indices of the selected individuals
     """
-    # I have a list of probabilities ordered ascendingly
-    # initialise a sum
-    # I pick a random number
-    # if the probability is greater than the random number
-    random_number = random.random()
-    probability_sum = next(iter(probabilities.items()))[1]  # start with highest value in the sum
-    for item in probabilities.items():
-        if probability_sum > random_number:
-            return item[0]
+    spins = np.random.random(n_parents) * cumulative_probabilities[-1]
+    return np.searchsorted(cumulative_probabilities, spins, side='right').clip(max=len(cumulative_probabilities) - 1)
 
-        probability_sum += item[1]
+
+def stochastic_universal_sampling(cumulative_probabilities: np.array, n_parents: int) -> np.array:
+    """
+    Selects n_parents individuals with a single spin of a wheel with n_parents equally spaced pointers. The expected
+    number of selections is the same as for the roulette wheel, but the spread is minimal.
+    :param cumulative_probabilities: the cumulative sum of the selection probabilities of the individuals
+    :param n_parents: the number of individuals to be selected
+    :return: the indices of the selected individuals
+    """
+    distance = cumulative_probabilities[-1] / n_parents
+    pointers = (np.random.random() + np.arange(n_parents)) * distance
+    return np.searchsorted(cumulative_probabilities, pointers, side='right').clip(max=len(cumulative_probabilities) - 1)
+
+
+@functools.lru_cache(maxsize=32)
+def rank_table(pop_size: int, bias: float) -> np.array:
+    """
+    Calculates the cumulative selection probabilities of the ranks of a population. Rank 1 is the individual with the
+    lowest fitness and rank pop_size the one with the highest, the probability of a rank is proportional to rank ** bias.
+    The table only depends on the size of the population and the bias, so it is cached.
+    :param pop_size: the number of individuals in the population
+    :param bias: the bias which decides the selection pressure
+    :return: a read only array of the cumulative probabilities of all ranks in ascending order
+    """
+    weights = np.arange(1, pop_size + 1, dtype=np.float64) ** bias
+    table = np.cumsum(weights / weights.sum())
+    table.setflags(write=False)
+    return table
+
+
+def _sample(cumulative_probabilities: np.array, n_parents: int, params: Dict) -> np.array:
+    sampling = params.get("sampling", "ROULETTE")
+    if sampling == "ROULETTE":
+        return roulette_wheel_select(cumulative_probabilities, n_parents)
+    if sampling == "SUS":
+        return stochastic_universal_sampling(cumulative_probabilities, n_parents)
+
+    raise Exception(f'{sampling} is not recognised as a sampling method. It must be in ["ROULETTE", "SUS"]')
 
 
 class Selection:
     """
-    Interface for the evolutionary selection mechanism
+    Interface for the evolutionary selection mechanism. A selection works on the fitness of the whole population and
+    returns the indices of the selected individuals.
     """
     def __init__(self, params: Dict):
         self.params = params
 
-    def select(self, population: List[GeneticAgent], n_parents: int = 1):
+    def select(self, fitness: np.array, n_parents: int = 1) -> np.array:
+        """
+        Selects parents from the population.
+        :param fitness: the fitness of every individual of the population
+        :param n_parents: the number of parents to be selected
+        :return: an array of length n_parents with the indices of the selected individuals
+        """
         pass
 
     def set_params(self, params):
@@ -39,53 +79,45 @@ class Selection:
 
 class RouletteWheelSelection(Selection):
     """
-    Implementation of a roulette wheel selection algorithm
+    Implementation of a roulette wheel selection algorithm. The param "sampling" chooses between independent spins of
+    the wheel, "ROULETTE", and stochastic universal sampling, "SUS".
     """
 
-    def select(self, population: List[GeneticAgent], n_parents: int = 1):
-        return RouletteWheelSelection.roulette_wheel(population, n_parents, self.params)
+    def select(self, fitness: np.array, n_parents: int = 1) -> np.array:
+        return RouletteWheelSelection.roulette_wheel(fitness, n_parents, self.params)
+
+    def set_params(self, params):
+        self.params = params
 
     @staticmethod
-    def roulette_wheel(population: List[GeneticAgent], n_parents: int = 1, params: Dict = {}) -> List:
+    def roulette_wheel(fitness: np.array, n_parents: int = 1, params: Dict = {}) -> np.array:
         """
         Performs a roulette wheel selection on the population fitness. For each entry in the fitness array, the probability
-        of it being chosen is proportional to its fitness.
+        of it being chosen is proportional to its fitness. Negative fitness values are shifted so that the lowest fitness
+        is 0, and if all fitness values are 0 every individual is equally likely to be chosen.
+        :param fitness: the fitness of every individual of the population
+        :param n_parents: the number of parents to be selected
         :param params:
-        :param population:
-        :return: a list of parents that have been chosen
+        :return: the indices of the parents that have been chosen
         """
+        fitness = np.asarray(fitness, dtype=np.float64)
+        if fitness.min() < 0:
+            fitness = fitness - fitness.min()
 
-        # sum up the fitness for all individuals
-        fitness_sum = sum(solution.fitness for solution in population)
-
-        # calculate the probability of an individual being selected
-
-        # calculate probability of entry: fitness over sum and add to list which is sorted in descending order
-        probability_map = dict()
-        for solution in population:
-            probability = solution.fitness / fitness_sum
-            probability_map[solution] = probability
+        if fitness.sum() <= 0:
+            fitness = np.ones_like(fitness)
 
-        sorted_probability_map = dict(sorted(probability_map.items(), key=lambda item: item[1], reverse=True))
-
-        parents = []
-        for n in range(n_parents):
-            parents.append(roulette_wheel_select(sorted_probability_map))
-
-        return parents
-
-        # generate random number n
-
-        # loop over list of sorted probabilities and choose the first that is greater than n
+        return _sample(np.cumsum(fitness), n_parents, params)
 
 
 class RankSelection(Selection):
     """
-    Implementation of a rank based selection algorithm
+    Implementation of a rank based selection algorithm. The param "sampling" chooses between independent spins of the
+    wheel, "ROULETTE", and stochastic universal sampling, "SUS".
     """
 
-    def select(self, population: List[GeneticAgent], n_parents: int = 1):
-        return RankSelection.rank_based_selection(population, n_parents, self.params)
+    def select(self, fitness: np.array, n_parents: int = 1) -> np.array:
+        return RankSelection.rank_based_selection(fitness, n_parents, self.params)
 
     def set_params(self, params):
         if params["bias"]:
@@ -94,50 +126,31 @@ class RankSelection(Selection):
             raise Exception(f'{params} must contain a value for the key "bias"')
 
     @staticmethod
-    def rank_based_selection(population: List[GeneticAgent], n_parents: int = 1, params: Dict = {}) -> List:
+    def rank_based_selection(fitness: np.array, n_parents: int = 1, params: Dict = {}) -> np.array:
         """
         Performs a rank based selection. Individuals are sorted according to their fitness and assigned a fitness proportionate
         rank, i.e. the individual with the highest fitness is assigned the highest rank raised to a bias. A high bias
         value weighs fitter individuals more than it does weaker individuals, i.e. it increases the selection pressure. A low bias
         means a lower selection pressure, i.e. weaker individuals have a higher change of being included as well.
+        :param fitness: the fitness of every individual of the population
         :param n_parents: The number of parents to be returned by the rank based selection
-        :param population: the population from which the algorithm will choose
-        :param bias: the bias value that decides seleciton pressure
-        :return: a list of selected Genetic Agents
+        :param params: must contain the bias value that decides selection pressure
+        :return: the indices of the selected individuals
         """
-
-        # rank population according to fitness
-        # calculate probability for each entry
-        # select individual
-        bias = params["bias"]
-        sorted_population = sorted(population, key=lambda entry: entry.fitness, reverse=True)
-
-        rank_sum = sum(i ** bias for i in range(1, len(population) + 1))
-
-        probability_population = dict()
-
-        for i in range(len(sorted_population)):
-            rank = i + 1
-            solution = sorted_population[i]
-            probability = rank ** bias / rank_sum
-            probability_population[solution] = probability
-
-        sorted_probability_population = dict(
-            sorted(probability_population.items(), key=lambda item: item[1], reverse=True))
-
-        parents = []
-        for n in range(n_parents):
-            parents.append(roulette_wheel_select(sorted_probability_population))
-
-        return parents
+        order = np.argsort(fitness, kind='stable')
+        ranks = _sample(rank_table(len(order), params["bias"]), n_parents, params)
+        return order[ranks]
 
 
 class TournamentSelection(Selection):
     """
     Implementation of a tournament selection algorithm
     """
-    def select(self, population: List[GeneticAgent], n_parents: int = 1):
-        return TournamentSelection.tournament_selection(population, n_parents, self.params)
+    # tournaments with more participants than this are not drawn explicitly
+    MAX_PARTICIPANTS = 1 << 22
+
+    def select(self, fitness: np.array, n_parents: int = 1) -> np.array:
+        return TournamentSelection.tournament_selection(fitness, n_parents, self.params)
 
     def set_params(self, params):
         if params["tournament_size"]:
@@ -146,25 +159,32 @@ class TournamentSelection(Selection):
             raise Exception(f'{params} must contain a value for the key "tournament_size"')
 
     @staticmethod
-    def tournament_selection(population: List[GeneticAgent], n_parents: int, params: Dict = {}) -> List:
+    def tournament_selection(fitness: np.array, n_parents: int, params: Dict = {}) -> np.array:
         """
-        Performs a tournament selection on a list of Genetic Agents for a specified number of iterations. In a tournament
+        Performs a tournament selection on the fitness of a population for a specified number of iterations. In a tournament
         selection, a random number of individuals is chosen from the population out of which the individual with the best
         fitness is declared winner and added to the parents will be returned.
-        :param population: the population from which the tournament selection algorithm will choose from
+
+        An int tournament_size is the number of participants of every tournament, a float is a fraction of n_parents.
+        All tournaments are held at once by taking the argmax of the fitness over a matrix of random participants. If that
+        matrix would be too large, the winners are drawn from the distribution of the maximum instead, which is the
+        same distribution: with k participants, the winner has at most rank r with probability (r / n) ** k.
+        :param fitness: the fitness of every individual of the population
         :param n_parents: the number of parents that should be returned by the overall tournament selection
-        :param tournament_size: the size of each individual tournament round
-        :return: a list of GeneticAgent of length n_parents
+        :param params: must contain the size of each individual tournament round
+        :return: an array of length n_parents with the indices of the winners
         """
-        tournament_size = math.floor(n_parents * params["tournament_size"])
-
-        parents = []
-        for _ in range(n_parents):
-            tournament_participants = []
-            for _ in range(tournament_size):
-                tournament_participants.append(random.choice(population))
-
-            tournament_winner = sorted(tournament_participants, key=lambda participant: participant.fitness)[-1]
-            parents.append(tournament_winner)
-
-        return parents
+        fitness = np.asarray(fitness)
+        tournament_size = params["tournament_size"]
+        if isinstance(tournament_size, float):
+            tournament_size = math.floor(n_parents * tournament_size)
+        tournament_size = max(tournament_size, 1)
+
+        if n_parents * tournament_size <= TournamentSelection.MAX_PARTICIPANTS:
+            participants = np.random.randint(0, len(fitness), (n_parents, tournament_size))
+            winners = fitness[participants].argmax(axis=1)
+            return participants[np.arange(n_parents), winners]
+
+        order = np.argsort(fitness, kind='stable')
+        ranks = np.floor(len(order) * np.random.random(n_parents) ** (1 / tournament_size)).astype(np.int64)
+        return order[ranks.clip(max=len(order) - 1)]
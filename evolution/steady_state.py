@@ -0,0 +1,166 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, List
+
+import numpy as np
+from tqdm import tqdm
+
+from agents import GeneticAgent
+from evolution import SnakePopulation
+from evolution.evaluation import EvaluationPool
+from evolution.hall_of_fame import HallOfFame
+
+
+class SteadyState:
+    """
+    Class for a steady state evolution algorithm where a single individual is replaced at a time. The games are played
+    asynchronously in an EvaluationPool that is kept busy at all times: as soon as the game of an individual is over,
+    two parents are selected from the evaluated individuals, their child replaces the worst evaluated individual and
+    the game of the child is started straight away. There is no barrier between generations, so a long game only
+    occupies a single worker while the others continue to evaluate children.
+
+    A generation is pop_size evaluations. After every generation the fitness of its evaluations is added to the
+    population data and its best individual to the hall of fame, so the results can be exported like the results of a
+    generational run. With workers the order in which games finish, and therefore the run, is not reproducible.
+    """
+
+    def __init__(self, population: SnakePopulation, workers: int = 0, max_pending: int = None, log_dir: str = None):
+        """
+        Constructor for the SteadyState class.
+        :param population: the population that is evolved
+        :param workers: the number of worker processes that play the games. 0 plays them in the training process.
+        :param max_pending: the number of games that are scheduled at the same time, defaults to twice the number of
+        workers so that a worker never waits for the next game
+        :param log_dir: the directory of the TensorBoard logs, e.g. the directory of the run. None logs into ./runs.
+        """
+        self.population = population
+        self.workers = workers
+        self.max_pending = max_pending if max_pending is not None else 2 * max(workers, 1)
+        # tensorboard takes long to import, so it is only imported once a writer is created
+        from torch.utils.tensorboard import SummaryWriter
+        self.writer = SummaryWriter(log_dir)
+
+    def run(self, n_generations: int) -> None:
+        """
+        Runs the steady state evolution algorithm for n_generations * pop_size evaluations.
+        :return:
+        """
+        population = self.population
+        population.initialise_population()
+        pop_size = population.pop_size
+        individuals = {solution.genome_index: solution for solution in population.individuals}
+        evaluation_pool = EvaluationPool(self.workers)
+
+        # the fitness of every row of the genome matrix, NaN while the individual of the row has not been evaluated
+        fitness = np.full(pop_size, np.nan)
+        unevaluated = list(range(pop_size))[::-1]
+        pending = {}
+        n_evaluations = n_generations * pop_size
+        n_submitted = 0
+        generation_fitness = []
+        best = None
+
+        with tqdm(total=n_evaluations, desc='Evaluating') as progress:
+            while progress.n < n_evaluations:
+                while len(pending) < self.max_pending and n_submitted < n_evaluations:
+                    row = unevaluated.pop() if unevaluated else self._breed(fitness)
+                    if row is None:
+                        break
+                    pending[self._submit(evaluation_pool, row, n_submitted)] = row
+                    n_submitted += 1
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = pending.pop(future)
+                    solution = individuals[row]
+                    solution.game_sequences = []
+                    solution.finish_episode(future.result()[0])
+                    solution.time_alive = solution.episode.n_steps()
+                    solution.calculate_fitness(population.fitness_func)
+                    fitness[row] = solution.fitness
+                    generation_fitness.append(solution.fitness)
+                    if best is None or solution.fitness > best["fitness"]:
+                        best = self._snapshot(row, solution)
+                    progress.update(1)
+
+                    if len(generation_fitness) == pop_size:
+                        self._finish_generation(np.array(generation_fitness), best)
+                        generation_fitness, best = [], None
+
+        evaluation_pool.close()
+        population.close()
+
+    def _breed(self, fitness: np.array):
+        """
+        Replaces the worst evaluated individual by the child of two parents that are selected from the evaluated
+        individuals.
+        :param fitness: the fitness of every row of the genome matrix
+        :return: the row of the child, or None if no individual has been evaluated
+        """
+        evaluated = np.flatnonzero(~np.isnan(fitness))
+        if len(evaluated) == 0:
+            return None
+
+        parents = evaluated[self.population.selection.select(fitness[evaluated], 2)]
+        row = int(evaluated[fitness[evaluated].argmin()])
+        self.population.breed(int(parents[0]), int(parents[1]), row)
+        fitness[row] = np.nan
+        return row
+
+    def _submit(self, evaluation_pool: EvaluationPool, row: int, evaluation: int):
+        """
+        Schedules the game of the individual in a row of the genome matrix.
+        :param evaluation: the number of the evaluation, from which the seed of the game is derived
+        :return: the Future of the Episode of the game
+        """
+        seed_sequence = np.random.SeedSequence(self.population.seed_sequence.entropy, spawn_key=(evaluation,))
+        seeds = (seed_sequence.generate_state(1, np.uint64) >> np.uint64(1)).astype(np.int64)
+        weights, biases = self.population.genomes.stacked_layers([row])
+        return evaluation_pool.submit([weight.numpy() for weight in weights], [bias.numpy() for bias in biases],
+                                      self.population._environment_config(), seeds)
+
+    def _snapshot(self, row: int, solution: GeneticAgent) -> Dict:
+        # the row is overwritten once the individual is replaced, so the genome is copied while it is evaluated
+        return {
+            "fitness": solution.fitness,
+            "weights": self.population.genomes.genome(row).copy(),
+            "biases": self.population.genomes.biases[row].numpy().copy(),
+            "episode": solution.episode,
+        }
+
+    def _finish_generation(self, fitness: np.array, best: Dict) -> None:
+        """
+        Records the results of the last pop_size evaluations as a generation.
+        :param fitness: the fitness of every evaluation of the generation
+        :param best: the snapshot of the best individual of the generation
+        :return: None
+        """
+        population = self.population
+        population.hall_of_fame.add(population.generation, best["fitness"], best["weights"], best["biases"],
+                                    best["episode"])
+
+        fitness = np.sort(fitness)
+        population.population_data.add_generational_fitness(fitness)
+
+        print(f"\n------------- Generation {population.generation} -------------")
+        print(f"Avg Fitness {fitness.mean()}, best fitness: {population.hall_of_fame.fitness(population.hall_of_fame.best())}\n")
+        self.writer.add_scalar("Average Fitness", fitness.mean(), global_step=population.generation)
+        population.generation += 1
+
+    def best_individual_of(self, generation: int) -> GeneticAgent:
+        """
+        Returns the best individual of all generations up to the specified generation where the first generations is
+        generation 0. The last generation is n_generations - 1. The individual is rebuilt from the hall of fame.
+        :param generation: the generation from which the best individual is to be returned
+        :return: the best individual up to and including the generation
+        """
+        return self.population.best_individual_of(generation)
+
+    def best_individual(self) -> GeneticAgent:
+        return self.population.best_individual
+
+    @property
+    def hall_of_fames(self) -> List[HallOfFame]:
+        return [self.population.hall_of_fame]
+
+    def get_population_data(self):
+        return self.population.population_data
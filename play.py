@@ -1,17 +1,26 @@
 import argparse
 import os
 
-import pygame
-from frametovideo.writer import Mp4Writer
-from frametovideo.writer import ImageType
-
 from util.io.loader import GeneticLoader
+from util.io.video_recorder import VideoRecorder
 from pysnakegym.mdp import SnakeMDP
 
+
+class NoDelayClock(object):
+    """
+    Class that replaces the clock of a game that is recorded without a window, so that the game is not slowed down to
+    the frame rate of the screen.
+    """
+
+    def tick(self, framerate: int = 0) -> int:
+        return 0
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
 
-    parser.add_argument("-m", "--model", nargs='?', type=str, default="", help="the path to the pytorch model that will be loaded")
+    parser.add_argument("-m", "--model", nargs='?', type=str, default="", help="the path to the pytorch model or the model archive that will be loaded")
+    parser.add_argument("-g", "--generation", nargs='?', type=int, default=-1, help="the generation of a model archive that will be loaded, defaults to the last generation")
     parser.add_argument("-r", "--record", dest='record', action='store_true', help="indicates whether the game should be recorded or not")
     parser.set_defaults(record=False)
 
@@ -22,28 +31,31 @@ if __name__ == "__main__":
     screen_width = 800
     screen_height = 800
 
+    if record:
+        # the game is drawn into a surface that is never shown, which has to be set before pygame is initialised
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+
     mdp = SnakeMDP(screen_width=screen_width, screen_height=screen_height, snake_size=80, show_game=True)
-    importer = GeneticLoader(model_path, mdp, [mdp.state_dims()[0]], mdp.n_actions())
+    importer = GeneticLoader(model_path, mdp, [mdp.state_dims()[0]], mdp.n_actions(), args.generation)
     genetic_agent = importer.import_model()
 
-    state, reward, done = mdp.reset()
-    n = 0
-
-    base_path = f'docs/{model_path[:-4]}'
-    frames_path = f'{base_path}/frames'
-    output_path = f'{base_path}/'
+    recorder = None
+    if record:
+        mdp.environment.clock = NoDelayClock()
+        output_path = f'docs/{os.path.splitext(model_path)[0]}'
+        os.makedirs(output_path, exist_ok=True)
+        # the frames are encoded by a background thread while the game is played, no images are written
+        recorder = VideoRecorder(f'{output_path}/output_video.mp4', (screen_width, screen_height), fps=60)
 
-    os.makedirs(frames_path, exist_ok=True)
+    state, reward, done = mdp.reset()
 
     while not done:
-        if record:
-            pygame.image.save(mdp.environment.window, f'{frames_path}/game_{n}.jpg')
+        if recorder is not None:
+            recorder.record(mdp.environment.window)
         action = genetic_agent.choose_action(state)
         state_, reward, done = mdp.step(action=action)
         state = state_
-        n += 1
 
-    if record:
-        writer = Mp4Writer(frames_path=frames_path, output_path=output_path, frame_size=(screen_width, screen_height), fps=60, image_type=ImageType.JPG)
-        writer.convert()
-        #writer.clean_frames()
+    if recorder is not None:
+        recorder.close()
+        print(f'{recorder.n_frames} frames recorded to {recorder.path}')
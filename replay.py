@@ -1,14 +1,41 @@
 import argparse
+import os
 
-from pysnakegym.game import SnakeGameSequencePlayer
-from pysnakegym.mdp import SnakeMDP
+import pygame
+from pysnakegym.game import GameSequence, colour
 
 from util.io.loader import GameSequenceLoader
+from util.io.replay_format import ReplayReader
+from util.io.video_recorder import VideoRecorder
+
+
+def draw(window: pygame.Surface, sequence: GameSequence, snake_size: int) -> None:
+    """
+    Draws a frame of a game in the colours of a pysnakegym game, with the head of the snake in red.
+    :param window: the surface into which the frame is drawn
+    :param sequence: the sequence of the frame
+    :param snake_size: the size of a cell of the grid in pixels
+    :return: None
+    """
+    window.fill(colour.black)
+    segments = sequence.snake.position()
+    for index, segment in enumerate(segments):
+        segment_colour = colour.red if index == 0 else colour.blue
+        pygame.draw.rect(window, segment_colour, pygame.Rect(*(segment * snake_size), snake_size, snake_size))
+
+    food = sequence.food.position()
+    pygame.draw.rect(window, colour.green, pygame.Rect(*(food * snake_size), snake_size, snake_size))
+    # the snake starts with a single segment and grows by one for every food it eats
+    label = pygame.font.SysFont(None, 30).render(str(len(segments) - 1), 1, (255, 255, 255))
+    window.blit(label, (1, 1))
+    pygame.display.flip()
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
 
     parser.add_argument("-s", "--sequence", nargs='?', type=str, default="", help="the path to the pytorch model that will be loaded")
+    parser.add_argument("-f", "--frame", nargs='?', type=int, default=0, help="the frame from which the game is replayed")
     parser.add_argument("-r", "--record", dest='record', action='store_true', help="indicates whether the game should be recorded or not")
     parser.set_defaults(record=False)
 
@@ -18,13 +45,34 @@ if __name__ == "__main__":
 
     screen_width = 800
     screen_height = 800
+    snake_size = 80
+
+    if record:
+        # the game is drawn into a surface that is never shown, which has to be set before pygame is initialised
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+    pygame.init()
+    window = pygame.display.set_mode((screen_width, screen_height))
+    clock = pygame.time.Clock()
 
-    mdp = SnakeMDP(screen_width=screen_width, screen_height=screen_height, snake_size=80, show_game=True)
     importer = GameSequenceLoader(sequence_path)
-    sequences = importer.import_sequence()
+    sequences = importer.stream_sequence()
+    # binary replays are decoded one frame at a time while they are played, starting at the keyframe before the frame
+    frames = sequences.frames(args.frame) if isinstance(sequences, ReplayReader) else sequences[args.frame:]
+
+    recorder = None
+    if record:
+        output_path = f'docs/{os.path.splitext(sequence_path)[0]}'
+        os.makedirs(output_path, exist_ok=True)
+        recorder = VideoRecorder(f'{output_path}/replay_video.mp4', (screen_width, screen_height), fps=20)
 
-    player = SnakeGameSequencePlayer(delay=20, record=record, record_path='docs/images')
-    for sequence in sequences:
-        player.add(sequence)
+    for sequence in frames:
+        draw(window, sequence, snake_size)
+        if recorder is not None:
+            recorder.record(window)
+        else:
+            clock.tick(20)
 
-    player.play()
+    if recorder is not None:
+        recorder.close()
+        print(f'{recorder.n_frames} frames recorded to {recorder.path}')
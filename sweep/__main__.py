@@ -0,0 +1,38 @@
+import argparse
+import json
+import os
+import sys
+
+from sweep import runner
+from util.io.loader.json_loader import JsonLoader
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="python -m sweep")
+
+    parser.add_argument("-hp", "--hyper_params", nargs='?', type=str, default="hyper_params.json", help="the hyper parameters json file whose values are changed by the sweep")
+    parser.add_argument("-s", "--sweep", nargs='?', type=str, help="the sweep json file with the grid and random axes and the seeds")
+    parser.add_argument("-o", "--output", nargs='?', type=str, default="models/sweep", help="the directory of the sweep. Jobs that have finished in it before are not run again")
+    parser.add_argument("-p", "--processes", nargs='?', type=int, default=os.cpu_count(), help="the number of jobs that run at the same time")
+
+    args = parser.parse_args()
+    loader = JsonLoader(args.hyper_params)
+    if not loader.load():
+        exit(1)
+    params = loader.get_data()
+
+    with open(args.sweep) as sweep_file:
+        sweep = json.load(sweep_file)
+
+    if args.processes < 0:
+        raise Exception("%s is not recognised as a correct argument for %s. It must be an int >= 0." % (args.processes, "Processes"))
+
+    os.makedirs(args.output, exist_ok=True)
+    failed = runner.run(params, sweep, args.output, args.processes)
+
+    results = runner.gather(args.output)
+    results.to_csv(args.output + runner.RESULTS_TABLE, index=False)
+    print(f"{len(results)} runs written to {args.output + runner.RESULTS_TABLE}")
+
+    if failed:
+        print(f"{len(failed)} jobs failed, they are run again by the next run of the sweep")
+        sys.exit(1)
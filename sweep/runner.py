@@ -0,0 +1,218 @@
+import contextlib
+import copy
+import hashlib
+import itertools
+import json
+import math
+import os
+import random
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+
+RESULT_FILE = "/result.json"
+LOG_FILE = "/train.log"
+RESULTS_TABLE = "/results.csv"
+
+# the random search distributions and how a value is drawn from their arguments
+DISTRIBUTIONS = {
+    "uniform": lambda rng, low, high: rng.uniform(low, high),
+    "log_uniform": lambda rng, low, high: math.exp(rng.uniform(math.log(low), math.log(high))),
+    "int_uniform": lambda rng, low, high: rng.randint(low, high),
+    "choice": lambda rng, *values: copy.deepcopy(rng.choice(values)),
+}
+
+
+def set_param(params: Dict, key: str, value) -> None:
+    """
+    Sets a hyper parameter, a dotted key such as "selection_params.tournament_size" sets a nested value.
+    :param params: the hyper parameters that are changed
+    :param key: the name of the hyper parameter
+    :param value: the new value
+    :return: None
+    """
+    *parents, name = key.split(".")
+    for parent in parents:
+        params = params.setdefault(parent, {})
+    params[name] = value
+
+
+def _sample(rng: random.Random, key: str, spec: Dict):
+    if not isinstance(spec, dict) or len(spec) != 1 or next(iter(spec)) not in DISTRIBUTIONS:
+        raise Exception("%s is not recognised as a correct argument for %s. It must be an object with one of %s." % (spec, key, sorted(DISTRIBUTIONS)))
+    distribution, args = next(iter(spec.items()))
+    return DISTRIBUTIONS[distribution](rng, *args)
+
+
+def expand(sweep: Dict) -> List[Dict]:
+    """
+    Expands the axes of a sweep into the hyper parameters that are changed by every configuration. Every point of the
+    "grid" is combined with every one of the "samples" drawn from the "random" axes.
+    :param sweep: the sweep with the optional "grid", "random", "samples" and "seed" keys
+    :return: a list of the changed hyper parameters of every configuration, each a dict from key to value
+    """
+    grid = sweep.get("grid", {})
+    for key, values in grid.items():
+        if not isinstance(values, list) or len(values) == 0:
+            raise Exception("%s is not recognised as a correct argument for %s. It must be a non empty list of values." % (values, key))
+
+    keys = sorted(grid)
+    points = [dict(zip(keys, values)) for values in itertools.product(*[grid[key] for key in keys])]
+
+    random_axes = sweep.get("random", {})
+    if not random_axes:
+        return points
+
+    rng = random.Random(sweep.get("seed", 0))
+    samples = [{key: _sample(rng, key, random_axes[key]) for key in sorted(random_axes)}
+               for _ in range(sweep.get("samples", 1))]
+    return [dict(point, **sample) for sample in samples for point in points]
+
+
+def config_id(params: Dict) -> str:
+    """
+    Identifies a configuration by its hyper parameters, so that the same configuration always runs in the same directory.
+    :param params: the hyper parameters of the configuration
+    :return: a short hash of the hyper parameters
+    """
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def jobs(base_params: Dict, sweep: Dict, path: str) -> List[Dict]:
+    """
+    Creates a job for every pair of configuration and seed of a sweep.
+    :param base_params: the hyper parameters that the sweep changes
+    :param sweep: the sweep, see expand. Its "seeds" are the seeds that every configuration is run with.
+    :param path: the directory of the sweep
+    :return: the jobs, each with the "config" id, the "seed", the changed hyper parameters "overrides", all "params",
+    and the "path" of its run
+    """
+    seeds = sweep.get("seeds", [0])
+    result = []
+    for overrides in expand(sweep):
+        params = copy.deepcopy(base_params)
+        for key, value in overrides.items():
+            set_param(params, key, value)
+        params["seed"] = None
+        config = config_id(params)
+
+        for seed in seeds:
+            result.append(dict(config=config, seed=seed, overrides=overrides, params=params,
+                               path=f"{path}/{config}/seed_{seed}"))
+    return result
+
+
+def is_finished(job: Dict) -> bool:
+    return os.path.isfile(job["path"] + RESULT_FILE)
+
+
+def run_job(job: Dict) -> Dict:
+    """
+    Trains a single configuration with a single seed. The output of the training is written to the log of the run and
+    the summary of its fitness to result.json once the training is finished. A GENERATIONAL run that was interrupted is
+    continued from its last checkpoint.
+    :param job: the job, see jobs
+    :return: the summary of the run
+    """
+    import numpy as np
+    import torch as T
+
+    from evolution.checkpoint import Checkpoint
+    from train import train
+
+    # every job is one of many processes, more threads per process would only compete for the same cores
+    T.set_num_threads(1)
+    # the hyper parameters of the run record the seed it was run with
+    params, path = dict(job["params"], seed=job["seed"]), job["path"]
+    os.makedirs(path, exist_ok=True)
+    resume = Checkpoint.exists(path) and params["type"] == "GENERATIONAL" and params.get("islands") is None
+
+    start = time.perf_counter()
+    with open(path + LOG_FILE, "a") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        algorithm = train(params, path, job["seed"], resume)
+    duration = time.perf_counter() - start
+
+    # the fitness of every individual in every generation, of shape (population_size, n_generations)
+    fitness = algorithm.get_population_data().get_generational_data()
+    best_per_generation = fitness.max(axis=0)
+    result = dict(config=job["config"], seed=job["seed"], overrides=job["overrides"],
+                  generations=int(fitness.shape[1]),
+                  final_max_fitness=float(best_per_generation[-1]),
+                  final_mean_fitness=float(fitness[:, -1].mean()),
+                  best_fitness=float(best_per_generation.max()),
+                  best_generation=int(np.argmax(best_per_generation)),
+                  duration=duration)
+
+    with open(path + RESULT_FILE, "w") as outfile:
+        json.dump(result, outfile, indent=4, sort_keys=True)
+    return result
+
+
+def run(base_params: Dict, sweep: Dict, path: str, processes: int = 1, progress=print) -> List[Dict]:
+    """
+    Runs every job of a sweep that has not finished yet, at most processes jobs at the same time.
+    :param base_params: the hyper parameters that the sweep changes
+    :param sweep: the sweep, see expand and jobs
+    :param path: the directory of the sweep
+    :param processes: the number of jobs that run at the same time. 0 runs the jobs in this process.
+    :param progress: called with a message whenever a job is finished
+    :return: the jobs that failed, each with its "error"
+    """
+    all_jobs = jobs(base_params, sweep, path)
+    pending = [job for job in all_jobs if not is_finished(job)]
+    progress(f"{len(all_jobs)} jobs, {len(all_jobs) - len(pending)} already finished")
+
+    failed = []
+
+    def done(job, error=None):
+        if error is None:
+            progress(f"Finished {job['config']} seed {job['seed']}")
+        else:
+            progress(f"FAILED {job['config']} seed {job['seed']}: {error}")
+            failed.append(dict(job, error=error))
+
+    if processes == 0:
+        for job in pending:
+            try:
+                run_job(job)
+                done(job)
+            except Exception:
+                done(job, traceback.format_exc())
+        return failed
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(run_job, job): job for job in pending}
+        for future in as_completed(futures):
+            error = future.exception()
+            done(futures[future], None if error is None else repr(error))
+    return failed
+
+
+def gather(path: str):
+    """
+    Collects the summaries of all finished runs of a sweep into one table, one row per run. The hyper parameters that
+    the sweep changes are columns of the table.
+    :param path: the directory of the sweep
+    :return: a pandas DataFrame of the runs, sorted by configuration and seed
+    """
+    import pandas as pd
+
+    rows = []
+    for config in sorted(os.listdir(path)):
+        config_path = f"{path}/{config}"
+        if not os.path.isdir(config_path):
+            continue
+        for run_dir in sorted(os.listdir(config_path)):
+            result_path = f"{config_path}/{run_dir}{RESULT_FILE}"
+            if os.path.isfile(result_path):
+                with open(result_path) as result_file:
+                    result = json.load(result_file)
+                overrides = result.pop("overrides")
+                rows.append(dict(result, **{key: json.dumps(value) if isinstance(value, (list, dict)) else value
+                                            for key, value in overrides.items()}))
+
+    table = pd.DataFrame(rows)
+    if len(table) > 0:
+        table = table.sort_values(["config", "seed"]).reset_index(drop=True)
+    return table
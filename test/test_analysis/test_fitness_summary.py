@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pytest
+
+from util.analysis import fitness_summary
+from util.io.export import GeneticPopulationData, GeneticPopulationDataExporter
+
+
+def _run(path: str, fitness: np.array) -> GeneticPopulationData:
+    # fitness has the shape (n_generations, pop_size) and is streamed to the directory of the run
+    data = GeneticPopulationData(path)
+    for generation in fitness:
+        data.add_generational_fitness(generation)
+    data.close()
+    return data
+
+
+@pytest.fixture
+def fitness():
+    return np.random.default_rng(0).random((50, 12)) * 10
+
+
+def test_chunked_summary_matches_dense_statistics(fitness):
+    summary = fitness_summary.summarise_fitness(fitness, chunk_size=7)
+
+    assert np.allclose(summary["min"], fitness.min(axis=1))
+    assert np.allclose(summary["mean"], fitness.mean(axis=1))
+    assert np.allclose(summary["max"], fitness.max(axis=1))
+    assert np.allclose(summary["std"], fitness.std(axis=1))
+    assert np.allclose(summary["p50"], np.median(fitness, axis=1))
+
+
+def test_summary_is_cached_until_the_run_changes(tmp_path, fitness):
+    path = str(tmp_path)
+    data = _run(path, fitness[:30])
+
+    summary = fitness_summary.summarise_run(path)
+    assert os.path.isfile(path + fitness_summary.SUMMARY_FILE)
+    assert len(summary["max"]) == 30
+
+    # a cached summary is returned without reading the fitness, as long as the size and time of the file are the same
+    file_path = path + GeneticPopulationData.FITNESS_FILE
+    stat = os.stat(file_path)
+    with open(file_path, "r+b") as file:
+        file.seek(GeneticPopulationData.HEADER.size)
+        file.write(np.full(12, -1.0).tobytes())
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert fitness_summary.summarise_run(path)["min"][0] == summary["min"][0]
+
+    data.load_state_dict(data.state_dict())
+    for generation in fitness[30:]:
+        data.add_generational_fitness(generation)
+    data.close()
+    assert len(fitness_summary.summarise_run(path)["max"]) == 50
+
+
+def test_csv_runs_are_converted_in_chunks(tmp_path, fitness):
+    data = GeneticPopulationData()
+    for generation in fitness:
+        data.add_generational_fitness(generation)
+    GeneticPopulationDataExporter(str(tmp_path)).export(data)
+
+    fitness_summary.convert_csv(str(tmp_path), chunk_size=5)
+    assert np.allclose(GeneticPopulationData.read_fitness(str(tmp_path)), fitness)
+
+
+def test_runs_are_found_and_aggregated(tmp_path, fitness):
+    for i, name in enumerate(["a", "b/c"]):
+        _run(str(tmp_path / name), fitness + i)
+        os.makedirs(str(tmp_path / name / "island_0"))
+        _run(str(tmp_path / name / "island_0"), fitness)
+
+    runs = fitness_summary.find_runs(str(tmp_path))
+    assert runs == [str(tmp_path / "a"), str(tmp_path / "b/c")]
+
+    summaries = fitness_summary.summarise_runs(runs, processes=2)
+    aggregated = fitness_summary.aggregate(summaries, "max")
+    assert np.allclose(aggregated["min"], fitness.max(axis=1))
+    assert np.allclose(aggregated["mean"], fitness.max(axis=1) + 0.5)
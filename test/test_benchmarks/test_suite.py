@@ -0,0 +1,55 @@
+import json
+import os
+
+from benchmarks import suite
+
+
+def _results(**medians):
+    return {"results": {name: {"median": median, "min": median, "repeats": 1} for name, median in medians.items()}}
+
+
+def test_compare_reports_benchmarks_slower_than_threshold():
+    baseline = _results(simulate=1.0, crossover=0.5, replace=0.1)
+    results = _results(simulate=1.3, crossover=0.55, replace=0.05)
+
+    regressions = suite.compare(results, baseline, threshold=0.2)
+    assert [regression["name"] for regression in regressions] == ["simulate"]
+    assert abs(regressions[0]["ratio"] - 1.3) < 1e-9
+
+
+def test_compare_ignores_missing_and_tiny_benchmarks():
+    baseline = _results(simulate=1.0, select=0.0001)
+    results = _results(crossover=10.0, select=0.0005)
+
+    assert suite.compare(results, baseline, threshold=0.2) == []
+    assert len(suite.compare(results, baseline, threshold=0.2, min_difference=0.0)) == 1
+
+
+def test_run_times_every_phase():
+    with open(os.path.join(os.path.dirname(__file__), "../../hyper_params.json")) as file:
+        params = json.load(file)
+    results = suite.run(params, pop_sizes=[4], networks=[[4]], board_sizes=[100], simulation_modes=["VECTORIZED"],
+                        repeats=2, progress=lambda case: None)
+
+    names = results["results"].keys()
+    case = "pop=4/net=4/board=5x5"
+    for phase in ["simulate[VECTORIZED]"] + suite.PHASES + ["export[population_data]", "export[game_sequence]"]:
+        assert f"{phase}/{case}" in names
+        assert results["results"][f"{phase}/{case}"]["repeats"] == 2
+    for selection in suite.SELECTIONS:
+        assert f"select[{selection}]/pop=4" in names
+    assert results["environment"]["torch"]
+    json.dumps(results)
+
+
+def test_run_compares_genome_dtypes():
+    with open(os.path.join(os.path.dirname(__file__), "../../hyper_params.json")) as file:
+        params = json.load(file)
+    results = suite.run(params, pop_sizes=[4], networks=[[4]], board_sizes=[100], simulation_modes=["VECTORIZED"],
+                        repeats=1, progress=lambda case: None, genome_dtypes=["FLOAT32", "INT8"], fitness_generations=2)
+
+    dtypes = results["genome_dtypes"]
+    assert set(dtypes) == {"FLOAT32", "INT8"}
+    assert dtypes["INT8"]["genome_bytes"] < dtypes["FLOAT32"]["genome_bytes"]
+    for result in dtypes.values():
+        assert result["best_fitness"] >= result["final_mean_fitness"]
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from pysnakegym.mdp import SnakeMDP
+
+from environment import BatchSnakeMDP
+
+
+def _is_outside(mdp: SnakeMDP) -> bool:
+    head = mdp.environment.grid.snake().head()
+    return not (0 <= head[0] < mdp.environment.grid.width and 0 <= head[1] < mdp.environment.grid.height)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_states_and_rewards_match_snake_mdp(seed):
+    np.random.seed(seed)
+    mdp = SnakeMDP(screen_width=200, screen_height=200, snake_size=20)
+    batch = BatchSnakeMDP(1, screen_width=200, screen_height=200, snake_size=20)
+    state, reward, done = mdp.reset()
+    batch.reset(seeds=[seed])
+
+    # both environments draw food from different generators, so the food of the SnakeMDP is copied over
+    batch._food[0] = mdp.environment.food_position().as_numpy()
+    assert (batch._states()[0] == state).all()
+
+    rng = np.random.default_rng(seed)
+    while not done:
+        action = rng.integers(0, 3)
+        state, reward, done = mdp.step(np.eye(3, dtype=int)[action])
+        states, rewards, dones = batch.step(np.array([action]))
+
+        # the SnakeMDP does not end the game when a snake that is longer than one element leaves the board
+        if dones[0] and not done and _is_outside(mdp):
+            break
+
+        if not done:
+            batch._food[0] = mdp.environment.food_position().as_numpy()
+            states = batch._states()
+
+        assert (states[0] == state).all()
+        assert rewards[0] == reward
+        assert dones[0] == done
+
+
+def test_games_are_independent_of_batch_size():
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 3, size=(200, 4))
+
+    batch = BatchSnakeMDP(4)
+    batch.reset(seeds=[1, 2, 3, 4])
+    single = BatchSnakeMDP(1)
+    single.reset(seeds=[3])
+
+    for step_actions in actions:
+        states, _, _ = batch.step(step_actions)
+        single_states, _, _ = single.step(step_actions[2:3])
+        assert (states[2] == single_states[0]).all()
+
+    assert batch.n_steps()[2] == single.n_steps()[0]
+    assert batch.env_score()[2] == single.env_score()[0]
+
+
+def test_replay_reproduces_game():
+    batch = BatchSnakeMDP(1, seed=7)
+    batch.reset()
+    rng = np.random.default_rng(7)
+    actions = []
+    while not batch.is_done()[0]:
+        actions.append(rng.integers(0, 3))
+        batch.step(np.array(actions[-1:]))
+
+    sequences = batch.replay(batch.seeds[0], actions)
+
+    assert len(sequences) == len(actions) + 1
+    assert (sequences[-1].snake.position() == batch.snake_position(0)).all()
+    assert (sequences[-1].food.position() == batch._food[0]).all()
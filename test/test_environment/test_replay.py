@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+import torch as T
+from pysnakegym.mdp import SnakeMDP
+from pysnakegym.model import FFNN
+
+from agents import GeneticAgent
+from environment import Episode, SeededRandom, replay
+
+
+def _positions(sequences):
+    return [(sequence.snake.position().tolist(), sequence.food.position().tolist()) for sequence in sequences]
+
+
+def test_seeded_random_isolates_global_state():
+    np.random.seed(0)
+    expected = np.random.randint(100, size=5)
+
+    np.random.seed(0)
+    random = SeededRandom(2 ** 62 + 7)
+    with random:
+        inside = np.random.randint(100, size=5)
+    assert (np.random.randint(100, size=5) == expected).all()
+
+    with SeededRandom(2 ** 62 + 7):
+        assert (np.random.randint(100, size=5) == inside).all()
+
+
+def test_unseeded_random_uses_global_state():
+    np.random.seed(0)
+    expected = np.random.randint(100, size=5)
+
+    np.random.seed(0)
+    with SeededRandom():
+        assert (np.random.randint(100, size=5) == expected).all()
+
+
+@pytest.mark.parametrize("seed", [2, 3])
+def test_interleaved_games_replay_exactly(seed):
+    # the board is small so that the snakes eat and new food is drawn during the games
+    agents = [GeneticAgent(SnakeMDP(screen_width=80, screen_height=80, snake_size=20), FFNN([11, 8, 3]), 0.0)
+              for _ in range(2)]
+    recorded = [[] for _ in agents]
+    states = [agent.start_episode(seed * 10 + i) for i, agent in enumerate(agents)]
+    for agent, sequences in zip(agents, recorded):
+        sequences.append(agent.mdp.environment.get_sequence())
+
+    # the games are stepped in turns so that they would share the global random state if it was not isolated
+    done = [False, False]
+    rng = np.random.default_rng(seed)
+    while not all(done):
+        for i, agent in enumerate(agents):
+            if not done[i]:
+                states[i], done[i] = agent.take_action(np.eye(3, dtype=int)[rng.integers(0, 3)])
+                recorded[i].append(agent.mdp.environment.get_sequence())
+
+    assert sum(agent.episode.env_score() for agent in agents) > 0
+    for agent, sequences in zip(agents, recorded):
+        assert agent.episode.is_replayable()
+        assert agent.episode.environment == Episode.SNAKE_MDP_ENVIRONMENT
+        assert agent.game_sequences == []
+        assert _positions(agent.get_replay()) == _positions(sequences)
+
+
+def test_episode_without_seed_cannot_be_replayed():
+    with pytest.raises(Exception):
+        replay(Episode(0, 1, 0.0), 200, 200, 20)
+
+
+@pytest.mark.parametrize("network_seed", range(5))
+def test_game_does_not_depend_on_previous_game(network_seed):
+    T.manual_seed(network_seed)
+    agent = GeneticAgent(SnakeMDP(screen_width=80, screen_height=80, snake_size=20), FFNN([11, 8, 3]), 0.0)
+    episodes = []
+    for seed in [4, 5, 4]:
+        agent.simulate(seed)
+        episodes.append(agent.episode)
+        agent.reset()
+
+    assert episodes[0].n_steps() == episodes[2].n_steps()
+    assert np.array_equal(episodes[0].actions, episodes[2].actions)
+
+
+def test_agents_do_not_share_the_state_of_their_games():
+    mdp = SnakeMDP(screen_width=120, screen_height=120, snake_size=20, show_game=False)
+    agents = [GeneticAgent(mdp, FFNN([11, 4, 3]), 0.0) for _ in range(2)]
+    mdp.reset()
+    agents[0].take_action(np.array([1, 0, 0]))
+
+    assert agents[0].actions == [0]
+    assert agents[1].actions == []
+    assert agents[0].random is not agents[1].random
+    assert agents[0].loop_detector is not agents[1].loop_detector
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+import torch as T
+from pysnakegym.mdp import SnakeMDP
+from pysnakegym.model import FFNN
+
+import evolution.fitness as fitness
+from agents import GeneticAgent
+from environment import BatchSnakeMDP, Episode, Termination
+from environment.termination import COLLIDED, LOOPED, STARVED, LoopDetector
+
+
+@pytest.mark.parametrize("start, length", [(0, 1), (0, 7), (5, 3), (100, 13)])
+def test_loop_detector_finds_loops(start, length):
+    detector = LoopDetector()
+    detector.reset(-1)
+    states = list(range(start)) + [start + step % length for step in range(10 * (start + length))]
+
+    step = next(step for step, state in enumerate(states) if detector.is_loop(state))
+    assert step < 2 * (start + length) + 1
+
+
+def test_loop_detector_does_not_find_loops_without_repetitions():
+    detector = LoopDetector()
+    detector.reset(-1)
+    assert not any(detector.is_loop(state) for state in range(10000))
+
+
+def test_starvation_budget_grows_with_length():
+    termination = Termination(starvation_steps=100, steps_per_length=10)
+    assert not termination.starved(100, 0)
+    assert termination.starved(101, 0)
+    assert not termination.starved(120, 2)
+    assert (termination.starved(np.array([101, 121, 50]), np.array([1, 2, 3])) == [False, True, False]).all()
+
+    assert not Termination().starved(10 ** 6, 1)
+    assert not Termination().starved(np.array([10 ** 6]), np.array([1])).any()
+
+
+def _circling_game(termination: Termination) -> Episode:
+    # a snake that always turns left circles on four cells and only eats food that lands on them
+    batch = BatchSnakeMDP(1, termination=termination)
+    batch.reset(seeds=[3])
+    while not batch.is_done()[0]:
+        batch.step(np.array([0]))
+    return batch.episode(0)
+
+
+def test_circling_snake_starves_without_termination():
+    episode = _circling_game(None)
+    assert episode.termination == STARVED
+    assert episode.steps_without_food == 1001
+
+
+def test_starvation_ends_circling_snake():
+    episode = _circling_game(Termination(starvation_steps=50))
+    assert episode.termination == STARVED
+    assert episode.steps_without_food == 51
+    assert episode.reward_sum() == -10 + 10 * episode.env_score()
+
+
+def test_loop_detection_ends_circling_snake():
+    episode = _circling_game(Termination(loop_detection=True))
+    assert episode.termination == LOOPED
+    assert episode.steps_without_food < 20
+    assert fitness.maximise_moves_without_stalling(episode) == episode.n_steps() - episode.steps_without_food
+
+
+def _agent(bias, termination: Termination) -> GeneticAgent:
+    mdp = SnakeMDP(screen_width=200, screen_height=200, snake_size=20, show_game=False)
+    neural_network = FFNN([11, 4, 3])
+    for layer in neural_network.layers():
+        layer.weight.data = T.zeros_like(layer.weight.data)
+        layer.bias.data = T.zeros_like(layer.bias.data)
+    # the output of the network only depends on the bias of its last layer
+    layer.bias.data = T.tensor(bias, dtype=T.float)
+    return GeneticAgent(mdp, neural_network, 0.0, termination)
+
+
+def test_loop_detection_ends_circling_agent():
+    episode = _agent([1, 0, 0], Termination(loop_detection=True)).simulate(seed=3).episode
+    assert episode.termination == LOOPED
+    assert episode.steps_without_food < 20
+    assert episode.is_stalled()
+
+
+def test_agent_without_loop_collides():
+    episode = _agent([0, 1, 0], Termination(starvation_steps=50, loop_detection=True)).simulate(seed=3).episode
+    assert episode.termination == COLLIDED
+    assert not episode.is_stalled()
+    assert fitness.maximise_moves_without_stalling(episode) == episode.n_steps()
+
+
+def test_vectorized_termination_matches_serial():
+    # the environments draw their food differently, but neither draws food on the circle of the snake for this seed
+    termination = Termination(starvation_steps=30, loop_detection=True)
+    serial = _agent([1, 0, 0], termination).simulate(seed=3).episode
+    vectorized = _circling_game(termination)
+    assert serial.env_score() == vectorized.env_score() == 0
+    assert serial.termination == vectorized.termination == LOOPED
+    assert serial.n_steps() == vectorized.n_steps()
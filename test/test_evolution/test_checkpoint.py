@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+import pytest
+import torch as T
+
+import evolution.fitness as fitness
+from evolution import Generational, SnakePopulation
+from evolution.checkpoint import Checkpoint
+from evolution.selection import TournamentSelection
+from util.io.export import GeneticPopulationData
+
+
+def _algorithm(path, simulation_mode, checkpoint_generations=None):
+    random.seed(0)
+    np.random.seed(0)
+    T.manual_seed(0)
+    population = SnakePopulation(pop_size=8, hidden_layers=[4], mutation_rate=0.1, crossover_rate=0.9, elitism=0.25,
+                                 fitness_func=fitness.maximise_moves,
+                                 selection=TournamentSelection({"tournament_size": 3}), show_game=False,
+                                 screen_width=120, screen_height=120, snake_size=20,
+                                 simulation_mode=simulation_mode, seed=7,
+                                 population_data=GeneticPopulationData(path))
+    return Generational(population, Checkpoint(path, checkpoint_generations), log_dir=path)
+
+
+@pytest.mark.parametrize("simulation_mode", ["SERIAL", "VECTORIZED"])
+def test_resumed_run_is_identical(tmp_path, simulation_mode):
+    uninterrupted = _algorithm(str(tmp_path / "uninterrupted"), simulation_mode)
+    uninterrupted.run(4)
+
+    interrupted = _algorithm(str(tmp_path / "interrupted"), simulation_mode, checkpoint_generations=2)
+    interrupted.run(3)
+    assert Checkpoint.exists(str(tmp_path / "interrupted"))
+
+    # the process is started again with different random states, the checkpoint restores them
+    random.seed(1)
+    np.random.seed(1)
+    T.manual_seed(1)
+    resumed = _algorithm(str(tmp_path / "interrupted"), simulation_mode)
+    resumed.resume(str(tmp_path / "interrupted"))
+    assert resumed.population.generation == 2
+    resumed.run(4)
+
+    expected, actual = uninterrupted.population, resumed.population
+    assert np.array_equal(actual.population_data.get_generational_data(),
+                          expected.population_data.get_generational_data())
+    assert actual.population_data.get_statistics().shape == (4, 4)
+    assert T.equal(actual.genomes.weights, expected.genomes.weights)
+    assert len(actual.hall_of_fame) == 4
+    assert T.equal(resumed.best_individual_of(3).get_genome()[0], uninterrupted.best_individual_of(3).get_genome()[0])
+
+
+def test_checkpoint_is_due(tmp_path):
+    assert Checkpoint(str(tmp_path), every_n_generations=5).is_due(10)
+    assert not Checkpoint(str(tmp_path), every_n_generations=5).is_due(11)
+    assert Checkpoint(str(tmp_path), every_seconds=0).is_due(11)
+    assert not Checkpoint(str(tmp_path)).is_due(10)
@@ -0,0 +1,65 @@
+import pytest
+import torch as T
+
+from evolution.crossover import BlendCrossover, NPointCrossover, UniformCrossover, segment_mask
+from evolution.genome import GenomeMatrix
+
+FEATURES = [11, 6, 3]
+
+
+@pytest.fixture
+def parents():
+    T.manual_seed(0)
+    genomes = GenomeMatrix(40, FEATURES)
+    genomes.initialise()
+    return genomes.weights[:20], genomes.weights[20:], genomes.layer_slices()
+
+
+@pytest.mark.parametrize("n_crossover_points", [0, 1, 2, 5])
+def test_segment_mask_has_alternating_segments(n_crossover_points):
+    T.manual_seed(0)
+    mask = segment_mask(100, 30, n_crossover_points)
+
+    assert mask.shape == (100, 30)
+    changes = (mask[:, 1:] != mask[:, :-1]).sum(dim=1)
+    assert changes.max() <= n_crossover_points
+    if n_crossover_points == 0:
+        assert mask.all()
+
+
+def test_n_point_crossover_swaps_genes(parents):
+    parents_1, parents_2, layers = parents
+    children_1, children_2 = NPointCrossover({}).crossover(parents_1, parents_2, layers, 2)
+
+    from_1 = children_1 == parents_1
+    assert T.all(from_1 | (children_1 == parents_2))
+    # every gene that the first child takes from the first parent goes to the second child from the second parent
+    assert T.equal(children_2[from_1], parents_2[from_1])
+    assert T.equal(children_2[~from_1], parents_1[~from_1])
+
+
+def test_n_point_crossover_chooses_points_per_layer(parents):
+    parents_1, parents_2, layers = parents
+    children_1, _ = NPointCrossover({}).crossover(parents_1, parents_2, layers, 0)
+
+    # without crossover points every layer is swapped entirely
+    assert T.equal(children_1, parents_2)
+
+
+def test_uniform_crossover_probability(parents):
+    parents_1, parents_2, layers = parents
+    children_1, children_2 = UniformCrossover({"p": 0.0}).crossover(parents_1, parents_2, layers)
+
+    assert T.equal(children_1, parents_1)
+    assert T.equal(children_2, parents_2)
+
+
+def test_blend_crossover_stays_in_extended_interval(parents):
+    parents_1, parents_2, layers = parents
+    children_1, children_2 = BlendCrossover({"alpha": 0.5}).crossover(parents_1, parents_2, layers)
+
+    low, high = T.min(parents_1, parents_2), T.max(parents_1, parents_2)
+    extension = 0.5 * (high - low) + 1e-6
+    for children in [children_1, children_2]:
+        assert T.all(children >= low - extension)
+        assert T.all(children <= high + extension)
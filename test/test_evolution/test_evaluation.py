@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import torch as T
+from pysnakegym.model import FFNN
+
+from evolution.evaluation import EvaluationPool, evaluate_genomes
+from evolution.inference import stack_layers
+
+ENVIRONMENT = dict(screen_width=200, screen_height=200, snake_size=20)
+
+
+@pytest.fixture
+def genomes():
+    T.manual_seed(0)
+    weights, biases = stack_layers([FFNN([11, 8, 3]) for _ in range(10)])
+    return [weight.numpy() for weight in weights], [bias.numpy() for bias in biases]
+
+
+@pytest.fixture
+def seeds():
+    return np.arange(10, dtype=np.int64) * 7919
+
+
+def _outcomes(episodes):
+    return [(episode.env_score(), episode.n_steps(), episode.reward_sum(), episode.seed, episode.actions.tolist())
+            for episode in episodes]
+
+
+@pytest.mark.parametrize("n_workers", [1, 3])
+def test_results_do_not_depend_on_number_of_workers(genomes, seeds, n_workers):
+    weights, biases = genomes
+    pool = EvaluationPool(n_workers, chunk_size=4)
+    try:
+        episodes = pool.evaluate(weights, biases, ENVIRONMENT, seeds)
+    finally:
+        pool.close()
+
+    expected = []
+    for start in range(0, len(seeds), 4):
+        chunk = slice(start, start + 4)
+        expected.extend(evaluate_genomes([weight[chunk] for weight in weights], [bias[chunk] for bias in biases],
+                                         ENVIRONMENT, seeds[chunk]))
+
+    assert _outcomes(episodes) == _outcomes(expected)
+
+
+def test_episodes_record_seed_and_actions(genomes, seeds):
+    weights, biases = genomes
+    episodes = evaluate_genomes(weights, biases, ENVIRONMENT, seeds)
+
+    for episode, seed in zip(episodes, seeds):
+        assert episode.seed == seed
+        assert len(episode.actions) == episode.n_steps()
+        assert episode.is_replayable()
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import torch as T
+
+import evolution.fitness as fitness
+from environment import Episode
+from evolution import Generational, SnakePopulation
+from evolution.fitness_cache import FitnessCache
+from evolution.selection import TournamentSelection
+
+
+def test_key_depends_on_genome_and_seed():
+    weights, biases = np.zeros(10, dtype=np.float32), np.zeros(3, dtype=np.float32)
+    key = FitnessCache.key(weights, biases, 1)
+
+    assert key == FitnessCache.key(weights.copy(), biases.copy(), 1)
+    assert key != FitnessCache.key(weights, biases, 2)
+    weights[4] = 1e-7
+    assert key != FitnessCache.key(weights, biases, 1)
+
+
+def test_least_recently_used_episode_is_evicted():
+    cache = FitnessCache(2)
+    episodes = [Episode(i, i, i) for i in range(3)]
+    cache.put(b"a", episodes[0])
+    cache.put(b"b", episodes[1])
+    assert cache.get(b"a") is episodes[0]
+    cache.put(b"c", episodes[2])
+
+    assert len(cache) == 2
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is episodes[0]
+    assert cache.get(b"c") is episodes[2]
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert cache.hit_rate() == 0.75
+
+
+@pytest.mark.parametrize("simulation_mode", ["SERIAL", "VECTORIZED"])
+def test_cached_run_is_identical(tmp_path, simulation_mode):
+    runs = []
+    for cache in [None, FitnessCache(100)]:
+        T.manual_seed(0)
+        np.random.seed(0)
+        population = SnakePopulation(pop_size=10, hidden_layers=[4], mutation_rate=0.01, crossover_rate=0.5,
+                                     elitism=0.5, fitness_func=fitness.maximise_moves,
+                                     selection=TournamentSelection({"tournament_size": 3}), show_game=False,
+                                     screen_width=120, screen_height=120, snake_size=20,
+                                     simulation_mode=simulation_mode, seed=2, fitness_cache=cache, same_games=True)
+        Generational(population, log_dir=str(tmp_path)).run(3)
+        runs.append(np.array(population.population_data.get_generational_data()))
+
+    assert np.array_equal(runs[0], runs[1])
+    # the elites of every generation are not played again
+    assert cache.hits > 0
+    assert cache.hits + cache.misses == 30
@@ -0,0 +1,132 @@
+import copy
+
+import numpy as np
+import pytest
+import torch as T
+from pysnakegym.mdp import SnakeMDP
+from pysnakegym.model import FFNN
+
+from agents import GeneticAgent
+from evolution.genome import GENOME_DTYPES, GenomeMatrix, dequantise, quantise
+
+FEATURES = [11, 6, 4, 3]
+
+
+@pytest.fixture
+def genomes():
+    T.manual_seed(0)
+    genomes = GenomeMatrix(5, FEATURES)
+    genomes.initialise()
+    return genomes
+
+
+def test_offsets(genomes):
+    assert genomes.n_weights == 11 * 6 + 6 * 4 + 4 * 3
+    assert genomes.n_biases == 6 + 4 + 3
+    assert list(genomes.offsets) == [0, 66, 90, 102]
+    assert genomes.weights.shape == (5, genomes.n_weights)
+
+
+def test_initialise_respects_linear_bounds(genomes):
+    for layer, (_, in_features) in enumerate(genomes.layer_shapes):
+        assert genomes.weights[:, genomes.layer_slice(layer)].abs().max() <= 1 / np.sqrt(in_features)
+
+
+def test_attached_network_reads_from_matrix(genomes):
+    network = FFNN(FEATURES)
+    genomes.attach(2, network)
+    state = T.ones(11)
+
+    with T.no_grad():
+        before = network.forward(state)
+        genomes.weights[2] *= 2
+        after = network.forward(state)
+
+    assert not T.allclose(before, after)
+    assert network.layers()[1].weight.data.data_ptr() == genomes.layer(2, 1).data_ptr()
+
+
+def test_stacked_layers(genomes):
+    weights, biases = genomes.stacked_layers([4, 0])
+
+    assert [weight.shape for weight in weights] == [(2, 6, 11), (2, 4, 6), (2, 3, 4)]
+    assert [bias.shape for bias in biases] == [(2, 6), (2, 4), (2, 3)]
+    assert T.equal(weights[1][0], genomes.layer(4, 1))
+    assert T.equal(biases[2][1], genomes.bias(0, 2))
+
+
+def test_deepcopy_of_agent_only_copies_its_row(genomes):
+    network = FFNN(FEATURES)
+    genomes.attach(1, network)
+    agent = GeneticAgent(SnakeMDP(), network, 0.1)
+
+    copied = copy.deepcopy(agent)
+    genomes.weights[1] = 0
+
+    assert copied.neural_network.layers()[0].weight.data.abs().sum() > 0
+    assert copied.neural_network.layers()[0].weight.data.untyped_storage().nbytes() == 66 * 4
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("FLOAT16", 1e-3), ("INT8", 1 / 127)])
+def test_compact_genomes_round_trip(genomes, dtype, tolerance):
+    compact = GenomeMatrix(5, FEATURES, dtype)
+    rows = T.arange(5)
+    compact.set_genomes(rows, genomes.weights)
+
+    assert compact.weights.dtype == GENOME_DTYPES[dtype]
+    assert compact.nbytes() < genomes.nbytes()
+    decoded = compact.genomes(rows)
+    for layer in compact.layer_slices():
+        # every layer is rounded relative to its largest weight
+        error = (decoded[:, layer] - genomes.weights[:, layer]).abs().max(dim=1).values
+        assert (error <= tolerance * genomes.weights[:, layer].abs().max(dim=1).values).all()
+
+
+def test_quantise_keeps_the_largest_weight_of_every_layer(genomes):
+    codes, scales = quantise(genomes.weights, genomes.layer_slices())
+
+    assert scales.shape == (5, 3)
+    for layer in genomes.layer_slices():
+        assert (codes[:, layer].abs().max(dim=1).values == 127).all()
+    assert T.allclose(dequantise(codes, scales, genomes.layer_slices()).abs().max(dim=1).values,
+                      genomes.weights.abs().max(dim=1).values)
+
+
+def test_networks_of_compact_matrix_read_the_loaded_genome(genomes):
+    compact = GenomeMatrix(5, FEATURES, "INT8")
+    compact.set_genomes(T.arange(5), genomes.weights)
+    compact.biases.copy_(genomes.biases)
+    network = FFNN(FEATURES)
+    compact.attach(3, network)
+
+    compact.load(3)
+    assert T.equal(network.layers()[0].weight.data, compact.genomes(T.tensor([3]))[0, compact.layer_slice(0)].view(6, 11))
+    compact.load(0)
+    assert T.equal(network.layers()[0].weight.data, compact.genomes(T.tensor([0]))[0, compact.layer_slice(0)].view(6, 11))
+    assert T.equal(network.layers()[2].bias.data, genomes.bias(3, 2))
+
+
+def test_elites_of_compact_population_are_not_rounded_again():
+    from evolution import SnakePopulation, fitness
+    from evolution.selection import TournamentSelection
+
+    T.manual_seed(0)
+    population = SnakePopulation(pop_size=10, hidden_layers=[4], mutation_rate=0.1, crossover_rate=0.5, elitism=0.5,
+                                 fitness_func=fitness.maximise_moves,
+                                 selection=TournamentSelection({"tournament_size": 3}), show_game=False,
+                                 screen_width=120, screen_height=120, snake_size=20, simulation_mode="VECTORIZED",
+                                 seed=1, genome_dtype="INT8")
+    population.initialise_population()
+    population.simulate()
+    population.calculate_fitness()
+    population.candidate_selection()
+    elites, scales = population.elites.clone(), population.elite_scales.clone()
+    population.crossover()
+    population.mutate_children()
+    population.replace()
+
+    n_children = len(population.children_genomes)
+    elite_rows = population.individuals[n_children:n_children + len(elites)]
+    written, written_scales = population.genomes.codes(T.tensor([solution.genome_index for solution in elite_rows]))
+    assert T.equal(written, elites)
+    assert T.equal(written_scales, scales)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+import torch as T
+from pysnakegym.mdp import SnakeMDP
+
+from environment import Episode
+from evolution.genome import GenomeMatrix
+from evolution.hall_of_fame import HallOfFame, best_genomes
+
+FEATURES = [11, 6, 3]
+
+
+@pytest.fixture
+def genomes():
+    T.manual_seed(0)
+    genomes = GenomeMatrix(4, FEATURES)
+    genomes.initialise()
+    return genomes
+
+
+def _add(hall_of_fame, genomes, generation, fitness, replay=None):
+    row = generation % genomes.pop_size
+    return hall_of_fame.add(generation, fitness, genomes.weights[row].numpy(), genomes.biases[row].numpy(), replay)
+
+
+def test_buffer_grows(genomes):
+    hall_of_fame = HallOfFame(FEATURES, capacity=1)
+    for generation in range(5):
+        _add(hall_of_fame, genomes, generation, generation)
+
+    assert len(hall_of_fame) == 5
+    assert [hall_of_fame.generation(i) for i in range(5)] == [0, 1, 2, 3, 4]
+    assert np.array_equal(hall_of_fame.genome(3)[0], genomes.weights[3].numpy())
+
+
+def test_best_up_to_generation(genomes):
+    hall_of_fame = HallOfFame(FEATURES)
+    for generation, fitness in enumerate([1, 5, 5, 3, 7]):
+        _add(hall_of_fame, genomes, generation, fitness)
+
+    assert hall_of_fame.best() == 4
+    assert hall_of_fame.best(3) == 1
+    assert hall_of_fame.best(0) == 0
+
+
+def test_only_best_keeps_recorded_sequences(genomes):
+    hall_of_fame = HallOfFame(FEATURES)
+    episode = Episode(1, 10, 0, seed=3, actions=np.zeros(10, dtype=np.int8))
+    _add(hall_of_fame, genomes, 0, 2, ["sequence"])
+    _add(hall_of_fame, genomes, 1, 1, episode)
+    _add(hall_of_fame, genomes, 2, 1, ["sequence"])
+    _add(hall_of_fame, genomes, 3, 3, ["sequence"])
+
+    assert [hall_of_fame.replay(i) for i in range(4)] == [None, episode, None, ["sequence"]]
+
+
+def test_agent_is_rebuilt_from_snapshot(genomes):
+    hall_of_fame = HallOfFame(FEATURES)
+    index = _add(hall_of_fame, genomes, 2, 4)
+    agent = hall_of_fame.agent(index, SnakeMDP(), 0.1)
+    genomes.weights.zero_()
+
+    assert agent.fitness == 4
+    weights, _ = hall_of_fame.genome(index)
+    for layer, network_layer in enumerate(agent.neural_network.layers()):
+        assert T.equal(network_layer.weight.data.flatten(), T.from_numpy(weights[genomes.layer_slice(layer)]))
+        assert network_layer.weight.data.abs().sum() > 0
+
+
+def test_best_genomes_are_streamed_across_halls_of_fame(genomes):
+    hall_of_fames = [HallOfFame(FEATURES), HallOfFame(FEATURES)]
+    for generation, fitness in enumerate([1, 5, 5, 3, 7]):
+        _add(hall_of_fames[0], genomes, generation, fitness)
+    for generation, fitness in enumerate([2, 2, 6, 3, 7]):
+        _add(hall_of_fames[1], genomes, generation, fitness)
+
+    assert list(hall_of_fames[0].best_of_generations(5)) == [hall_of_fames[0].best(n) for n in range(5)]
+    streamed = list(best_genomes(hall_of_fames, 5))
+    assert [fitness for fitness, _, _ in streamed] == [2, 5, 6, 6, 7]
+    # generation 2 is won by the second hall of fame, the tie of generation 4 by the first
+    assert np.array_equal(streamed[2][1], hall_of_fames[1].genome(2)[0])
+    assert np.array_equal(streamed[4][1], hall_of_fames[0].genome(4)[0])
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+import torch as T
+from pysnakegym.mdp import SnakeMDP
+from pysnakegym.model import FFNN
+
+from agents import GeneticAgent
+from evolution.inference import BatchedFFNN, NumpyFFNN
+
+
+@pytest.fixture
+def networks():
+    T.manual_seed(0)
+    return [FFNN([11, 22, 3]) for _ in range(5)]
+
+
+@pytest.fixture
+def observations():
+    return np.random.default_rng(0).integers(0, 2, size=(5, 11))
+
+
+def test_forward_matches_single_networks(networks, observations):
+    batched = BatchedFFNN.from_networks(networks)
+    with T.no_grad():
+        output = batched.forward(T.tensor(observations).float())
+        for i, network in enumerate(networks):
+            expected = network.forward(T.tensor(observations[i]).float())
+            assert T.allclose(output[i], expected, atol=1e-6)
+
+
+def test_choose_actions_matches_single_networks(networks, observations):
+    actions = BatchedFFNN.from_networks(networks).choose_actions(observations)
+    with T.no_grad():
+        expected = [T.argmax(network.forward(T.tensor(observation).float())).item()
+                    for network, observation in zip(networks, observations)]
+    assert (actions == np.array(expected)).all()
+
+
+def test_keep_drops_networks(networks, observations):
+    batched = BatchedFFNN.from_networks(networks)
+    mask = np.array([True, False, True, False, True])
+    batched.keep(mask)
+
+    assert len(batched) == 3
+    assert (batched.indices == np.array([0, 2, 4])).all()
+    assert (batched.choose_actions(observations[mask]) == BatchedFFNN.from_networks(networks).choose_actions(observations)[mask]).all()
+
+
+@pytest.mark.parametrize("features", [[11, 22, 3], [11, 16, 8, 3]])
+def test_numpy_forward_matches_torch(features, observations):
+    T.manual_seed(0)
+    network = FFNN(features)
+    numpy_network = NumpyFFNN.from_network(network)
+
+    for observation in observations:
+        with T.no_grad():
+            expected = network.forward(T.tensor(observation).float())
+        assert np.allclose(numpy_network.forward(observation), expected.numpy(), atol=1e-5)
+        assert np.argmax(numpy_network.choose_action(observation)) == T.argmax(expected).item()
+
+
+def test_numpy_network_reuses_its_buffers(networks, observations):
+    numpy_network = NumpyFFNN.from_network(networks[0])
+    output = numpy_network.forward(observations[0])
+    assert numpy_network.forward(observations[1]) is output
+
+    action = numpy_network.choose_action(observations[0])
+    assert action.sum() == 1
+    with pytest.raises(ValueError):
+        action[0] = 1
+
+
+def test_agent_copies_its_network_again_for_every_game(observations):
+    T.manual_seed(0)
+    agent = GeneticAgent(SnakeMDP(screen_width=200, screen_height=200, snake_size=20, show_game=False),
+                         FFNN([11, 22, 3]), 0.0)
+    agent.choose_action(observations[0])
+
+    # the genome of a population changes in place between two games
+    with T.no_grad():
+        agent.neural_network.output_layer.bias.data[:] = T.tensor([0.0, 0.0, 1e6])
+    agent.start_episode(0)
+    assert (agent.choose_action(observations[0]) == np.array([0, 0, 1])).all()
+
+    state_dict = {name: parameter.clone() for name, parameter in agent.neural_network.state_dict().items()}
+    state_dict["output_layer.bias"] = T.tensor([1e6, 0.0, 0.0])
+    agent.set_model(state_dict)
+    assert (agent.choose_action(observations[0]) == np.array([1, 0, 0])).all()
+
+    with T.no_grad():
+        agent.neural_network.output_layer.bias.data[:] = T.tensor([0.0, 1e6, 0.0])
+    agent.set_genome([gene.clone() for gene in agent.get_genome()])
+    assert (agent.choose_action(observations[0]) == np.array([0, 1, 0])).all()
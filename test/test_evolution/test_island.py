@@ -0,0 +1,82 @@
+import queue
+
+import numpy as np
+import pytest
+
+import evolution.fitness as fitness
+from evolution import SnakePopulation
+from evolution.island import IslandModel, Migration
+from evolution.selection import RankSelection, TournamentSelection
+from train import genetic_operators
+from util import GeneticArgumentValidator
+
+PARAMS = dict(pop_size=6, hidden_layers=[4], mutation_rate=0.1, crossover_rate=0.9, elitism=0.0,
+              fitness_func=fitness.maximise_moves, selection=TournamentSelection({"tournament_size": 2}),
+              show_game=False, screen_width=120, screen_height=120, snake_size=20, simulation_mode="VECTORIZED")
+
+
+def _evaluated_population():
+    population = SnakePopulation(seed=1, **PARAMS)
+    population.initialise_population()
+    population.simulate()
+    population.calculate_fitness()
+    return population
+
+
+@pytest.mark.parametrize("n_islands", [1, 2, 5])
+def test_random_destinations_are_a_permutation(n_islands):
+    inboxes = [None] * n_islands
+    for generation in range(10):
+        destinations = [Migration(island, inboxes, 1, 1, "RANDOM", seed=3).destination(generation)
+                        for island in range(n_islands)]
+        assert sorted(destinations) == list(range(n_islands))
+
+    assert Migration(n_islands - 1, inboxes, 1, 1, "RING").destination(0) == 0
+
+
+def test_migration_exchanges_the_fittest_for_the_least_fit():
+    population = _evaluated_population()
+    expected_emigrants = population.genomes.weights[[s.genome_index for s in population.individuals[-2:]]].clone()
+
+    inboxes = [queue.Queue(), queue.Queue()]
+    immigrants = np.ones((2, population.genomes.n_weights), dtype=np.float32)
+    # the immigrants of a later migration arrive before the ones of this migration
+    inboxes[0].put((8, immigrants * 2, np.ones(2), np.array([1.0, 1.0])))
+    inboxes[0].put((4, immigrants, np.ones(2), np.array([1e6, 0.0])))
+
+    worst = [solution.genome_index for solution in population.individuals[:2]]
+    migration = Migration(0, inboxes, 4, 2, "RING")
+    assert migration.is_due(4) and not migration.is_due(0) and not migration.is_due(5)
+    migration.migrate(population, 4)
+
+    generation, weights, _, _ = inboxes[1].get_nowait()
+    assert generation == 4
+    assert np.array_equal(weights, expected_emigrants.numpy())
+    assert (population.genomes.weights[worst] == 1).all()
+    assert population.individuals[-1].genome_index in worst
+    assert population.individuals[-1].fitness == 1e6
+    assert 8 in migration._received
+
+
+def test_island_model_combines_the_islands(tmp_path):
+    islands = [PARAMS, dict(PARAMS, selection=RankSelection({"bias": 2}))]
+    model = IslandModel(islands, migration_interval=1, n_migrants=2, topology="RANDOM", seed=2, path=str(tmp_path))
+    model.run(3)
+
+    data = model.get_population_data().get_generational_data()
+    assert data.shape == (12, 3)
+    for island in range(2):
+        assert (tmp_path / f"island_{island}" / "fitness_data.bin").exists()
+    assert model.best_individual_of(2).fitness == data.max()
+
+
+def test_islands_of_the_same_operators_keep_their_own_params():
+    arg_validator = GeneticArgumentValidator()
+    params = dict(mutation_rate=0.1, crossover_rate=0.9, crossover_points=2, elitism=0.0,
+                  selection_type="TOURNAMENT", mutation_type="GAUSSIAN")
+    islands = [genetic_operators(arg_validator, dict(params, selection_params={"tournament_size": size},
+                                                     mutation_params={"sd": sd}))
+               for size, sd in [(0.1, 0.5), (0.9, 1.0)]]
+
+    assert [island["selection"].params["tournament_size"] for island in islands] == [0.1, 0.9]
+    assert [island["mutation"].params["sd"] for island in islands] == [0.5, 1.0]
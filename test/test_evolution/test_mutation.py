@@ -0,0 +1,68 @@
+import pytest
+import torch as T
+
+from evolution.genome import GenomeMatrix
+from evolution.mutation import GaussianMutation, SelfAdaptiveMutation, UniformMutation, mutation_mask
+
+FEATURES = [11, 6, 3]
+
+
+@pytest.fixture
+def genomes():
+    T.manual_seed(0)
+    genomes = GenomeMatrix(50, FEATURES)
+    genomes.initialise()
+    return genomes
+
+
+def test_mutation_mask_rate():
+    T.manual_seed(0)
+    mask = mutation_mask(T.zeros((200, 500)), 0.1)
+
+    assert mask.dtype == T.bool
+    assert abs(mask.float().mean().item() - 0.1) < 0.01
+
+
+def test_uniform_mutation(genomes):
+    children = genomes.weights.clone()
+    UniformMutation({}).mutate(children, genomes.sigmas, genomes.layer_slices(), 0.5)
+
+    changed = children != genomes.weights
+    assert 0.4 < changed.float().mean().item() < 0.6
+    assert children.min() >= -1 and children.max() <= 1
+
+
+def test_gaussian_mutation_with_zero_rate_keeps_genomes(genomes):
+    children = genomes.weights.clone()
+    GaussianMutation({"sd": 1.0}).mutate(children, genomes.sigmas, genomes.layer_slices(), 0.0)
+
+    assert T.equal(children, genomes.weights)
+
+
+def test_gaussian_mutation_per_layer(genomes):
+    children = genomes.weights.clone()
+    mutation = GaussianMutation({"mean": 0.0, "sd": [1.0, 0.0]})
+    mutation.mutate(children, genomes.sigmas, genomes.layer_slices(), 1.0)
+
+    first, second = genomes.layer_slices()
+    assert not T.equal(children[:, first], genomes.weights[:, first])
+    assert T.equal(children[:, second], genomes.weights[:, second])
+
+
+def test_gaussian_mutation_rejects_wrong_number_of_layers(genomes):
+    with pytest.raises(Exception):
+        GaussianMutation({"sd": [1.0]}).mutate(genomes.weights, genomes.sigmas, genomes.layer_slices(), 1.0)
+
+
+def test_self_adaptive_mutation_evolves_sigmas(genomes):
+    mutation = SelfAdaptiveMutation({"sigma": 0.5})
+    mutation.initialise(genomes)
+    assert T.all(genomes.sigmas == 0.5)
+
+    children = genomes.weights.clone()
+    sigmas = genomes.sigmas.clone()
+    mutation.mutate(children, sigmas, genomes.layer_slices(), 1.0)
+
+    assert not T.equal(sigmas, genomes.sigmas)
+    assert T.all(sigmas > 0)
+    assert not T.equal(children, genomes.weights)
@@ -0,0 +1,43 @@
+import json
+import pstats
+
+import evolution.fitness as fitness
+from evolution import Generational, SnakePopulation
+from evolution.phase_timer import PhaseTimer
+from evolution.selection import TournamentSelection
+
+
+def test_phases_of_every_generation_are_recorded(tmp_path):
+    population = SnakePopulation(pop_size=10, hidden_layers=[4], mutation_rate=0.01, crossover_rate=0.5, elitism=0.2,
+                                 fitness_func=fitness.maximise_moves,
+                                 selection=TournamentSelection({"tournament_size": 3}), show_game=False,
+                                 screen_width=120, screen_height=120, snake_size=20, simulation_mode="VECTORIZED",
+                                 seed=1)
+    Generational(population, phase_timer=PhaseTimer(str(tmp_path), profile_generation=1),
+                 log_dir=str(tmp_path)).run(3)
+
+    with open(str(tmp_path) + PhaseTimer.FILE) as file:
+        records = [json.loads(line) for line in file]
+
+    assert [record["generation"] for record in records] == [0, 1, 2]
+    for record in records:
+        assert set(record["phases"]) == {"simulate", "calculate_fitness", "candidate_selection", "crossover",
+                                         "mutate_children", "replace", "reset"}
+        assert all(times["wall"] >= 0 and times["cpu"] >= 0 for times in record["phases"].values())
+        assert record["steps_per_second"] > 0
+        assert record["evaluations_per_second"] > 0
+
+    assert not (tmp_path / "generation_0.prof").exists()
+    stats = pstats.Stats(str(tmp_path / "generation_1.prof"))
+    assert any(function[2] == "simulate" for function in stats.stats)
+
+
+def test_timer_without_path_does_not_profile(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    timer = PhaseTimer(profile_generation=0)
+    with timer.profile(0):
+        with timer.phase("simulate"):
+            pass
+
+    assert set(timer.times) == {"simulate"}
+    assert list(tmp_path.iterdir()) == []
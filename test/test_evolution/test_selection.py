@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from evolution.selection import RankSelection, RouletteWheelSelection, TournamentSelection, rank_table, \
+    roulette_wheel_select, stochastic_universal_sampling
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    np.random.seed(0)
+
+
+def test_roulette_wheel_select_is_proportional():
+    cumulative = np.cumsum([1.0, 0.0, 3.0])
+    counts = np.bincount(roulette_wheel_select(cumulative, 40000), minlength=3)
+
+    assert counts[1] == 0
+    assert abs(counts[2] / counts[0] - 3) < 0.2
+
+
+def test_stochastic_universal_sampling_has_minimal_spread():
+    cumulative = np.cumsum([1.0, 2.0, 3.0, 4.0])
+    counts = np.bincount(stochastic_universal_sampling(cumulative, 20), minlength=4)
+
+    assert counts.tolist() == [2, 4, 6, 8]
+
+
+@pytest.mark.parametrize("sampling", ["ROULETTE", "SUS"])
+def test_roulette_selection_returns_indices(sampling):
+    fitness = np.array([0.0, 5.0, 0.0, 1.0])
+    parents = RouletteWheelSelection({"sampling": sampling}).select(fitness, 100)
+
+    assert parents.shape == (100,)
+    assert set(parents.tolist()) <= {1, 3}
+
+
+def test_roulette_selection_handles_zero_and_negative_fitness():
+    assert len(RouletteWheelSelection({}).select(np.zeros(5), 10)) == 10
+    parents = RouletteWheelSelection({}).select(np.array([-10.0, -10.0, 0.0]), 50)
+    assert set(parents.tolist()) == {2}
+
+
+def test_rank_table_is_cached_and_favours_high_ranks():
+    table = rank_table(4, 2)
+
+    assert rank_table(4, 2) is table
+    assert np.allclose(np.diff(table, prepend=0), np.array([1, 4, 9, 16]) / 30)
+
+
+def test_rank_selection_prefers_fitter_individuals():
+    fitness = np.array([3.0, 1.0, 2.0])
+    counts = np.bincount(RankSelection({"bias": 1}).select(fitness, 60000), minlength=3)
+
+    assert counts[0] > counts[2] > counts[1]
+    assert abs(counts[0] / counts[1] - 3) < 0.2
+
+
+@pytest.mark.parametrize("tournament_size, n_parents", [(3, 50), (0.2, 50)])
+def test_tournament_selection_returns_winners(tournament_size, n_parents):
+    fitness = np.random.random(100)
+    parents = TournamentSelection({"tournament_size": tournament_size}).select(fitness, n_parents)
+
+    assert parents.shape == (n_parents,)
+    assert fitness[parents].mean() > fitness.mean()
+
+
+def test_large_tournaments_follow_the_same_distribution(monkeypatch):
+    fitness = np.random.random(50)
+    params = {"tournament_size": 4}
+    explicit = TournamentSelection.tournament_selection(fitness, 20000, params)
+    monkeypatch.setattr(TournamentSelection, "MAX_PARTICIPANTS", 0)
+    sampled = TournamentSelection.tournament_selection(fitness, 20000, params)
+
+    assert abs(fitness[explicit].mean() - fitness[sampled].mean()) < 0.01
+    # the best individual wins a tournament with probability 1 - (49 / 50) ** 4
+    best = 1 - (49 / 50) ** 4
+    assert abs(np.mean(explicit == fitness.argmax()) - best) < 0.01
+    assert abs(np.mean(sampled == fitness.argmax()) - best) < 0.01
@@ -0,0 +1,69 @@
+import numpy as np
+import torch as T
+
+import evolution.fitness as fitness
+from environment import replay
+from evolution import SnakePopulation, SteadyState
+from evolution.evaluation import EvaluationPool
+from evolution.selection import TournamentSelection
+
+
+def _population(seed=5, pop_size=6):
+    return SnakePopulation(pop_size=pop_size, hidden_layers=[4], mutation_rate=0.1, crossover_rate=0.9, elitism=0.0,
+                           fitness_func=fitness.maximise_moves,
+                           selection=TournamentSelection({"tournament_size": 2}), show_game=False,
+                           screen_width=120, screen_height=120, snake_size=20, seed=seed)
+
+
+def test_evaluation_pool_without_workers_returns_finished_future():
+    population = _population()
+    population.initialise_population()
+    weights, biases = population.genomes.stacked_layers([0, 1])
+
+    future = EvaluationPool(0).submit([weight.numpy() for weight in weights], [bias.numpy() for bias in biases],
+                                      population._environment_config(), np.array([1, 2]))
+    assert future.done()
+    assert len(future.result()) == 2
+
+
+def test_breed_writes_a_single_row():
+    population = _population()
+    population.initialise_population()
+    before = population.genomes.weights.clone()
+
+    population.breed(0, 1, 2)
+    changed = (population.genomes.weights != before).any(dim=1)
+    assert not changed[[0, 1, 3, 4, 5]].any()
+
+
+def test_steady_state_records_every_generation(tmp_path):
+    T.manual_seed(0)
+    np.random.seed(0)
+    population = _population()
+    algorithm = SteadyState(population, log_dir=str(tmp_path))
+    algorithm.run(3)
+
+    data = algorithm.get_population_data().get_generational_data()
+    assert data.shape == (6, 3)
+    assert (np.diff(data, axis=0) >= 0).all()
+    assert len(population.hall_of_fame) == 3
+    assert population.generation == 3
+
+    # the best of every generation is the best of its evaluations and can be replayed
+    for generation in range(3):
+        index = population.hall_of_fame.best(generation)
+        assert population.hall_of_fame.fitness(index) == data[:, :generation + 1].max()
+        episode = population.hall_of_fame.replay(index)
+        assert len(replay(episode, 120, 120, 20)) == episode.n_steps() + 1
+
+
+def test_steady_state_is_reproducible_without_workers(tmp_path):
+    runs = []
+    for _ in range(2):
+        T.manual_seed(0)
+        np.random.seed(0)
+        algorithm = SteadyState(_population(), log_dir=str(tmp_path))
+        algorithm.run(2)
+        runs.append(np.array(algorithm.get_population_data().get_generational_data()))
+
+    assert np.array_equal(runs[0], runs[1])
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from environment import BatchSnakeMDP
+from util.io.export import GameSequenceExporter
+from util.io.loader import GameSequenceLoader
+from util.io.replay_format import ReplayReader, is_replay_file, write_replay
+
+
+def _positions(sequences):
+    return [(sequence.snake.segments[:sequence.snake.tail_index].tolist(), list(sequence.food.position()))
+            for sequence in sequences]
+
+
+@pytest.fixture
+def sequences():
+    # a small board so that the snake eats and grows
+    game = BatchSnakeMDP(1, screen_width=80, screen_height=80, snake_size=20, seed=4)
+    game.reset()
+    rng = np.random.default_rng(4)
+    actions = []
+    while not game.is_done()[0]:
+        actions.append(rng.integers(0, 3))
+        game.step(np.array(actions[-1:]))
+    assert game.env_score()[0] > 0
+    return game.replay(game.seeds[0], np.array(actions))
+
+
+def test_round_trip(tmp_path, sequences):
+    path = str(tmp_path / "sequence.replay")
+    write_replay(path, sequences, keyframe_interval=4)
+    reader = ReplayReader(path)
+
+    assert len(reader) == len(sequences)
+    assert _positions(reader) == _positions(sequences)
+    assert reader.grid_slots == sequences[0].snake.grid_slots
+
+
+def test_seek_to_any_frame(tmp_path, sequences):
+    path = str(tmp_path / "sequence.replay")
+    write_replay(path, sequences, keyframe_interval=3)
+    reader = ReplayReader(path)
+
+    for frame in [0, 1, 3, 4, len(sequences) - 1, -1]:
+        assert _positions([reader[frame]]) == _positions([sequences[frame]])
+    assert _positions(reader.frames(5)) == _positions(sequences[5:])
+
+
+def test_frames_are_delta_encoded(tmp_path, sequences):
+    path = tmp_path / "sequence.replay"
+    write_replay(str(path), sequences, keyframe_interval=1000)
+
+    # a move without food takes 4 bytes, so the file is much smaller than a keyframe per frame
+    assert path.stat().st_size < 100 + 8 * len(sequences)
+
+
+def test_loader_reads_binary_and_jsonpickle_files(tmp_path, sequences):
+    GameSequenceExporter(str(tmp_path)).export(sequences)
+    GameSequenceExporter(str(tmp_path), binary=False).export(sequences)
+
+    assert is_replay_file(str(tmp_path / "sequence.replay"))
+    assert not is_replay_file(str(tmp_path / "sequence.json"))
+    binary = GameSequenceLoader(str(tmp_path / "sequence.replay")).import_sequence()
+    json = GameSequenceLoader(str(tmp_path / "sequence.json")).import_sequence()
+    assert _positions(binary) == _positions(json) == _positions(sequences)
+
+
+def test_reader_is_a_sequence(tmp_path, sequences):
+    path = str(tmp_path / "sequence.replay")
+    write_replay(path, sequences, keyframe_interval=3)
+    reader = GameSequenceLoader(path).stream_sequence()
+
+    for frames in [slice(5, None), slice(-4, None), slice(1, 8, 3), slice(None, None, -2), slice(4, 2)]:
+        assert _positions(reader[frames]) == _positions(sequences[frames])
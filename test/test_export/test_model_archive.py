@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+import torch as T
+from pysnakegym.mdp import SnakeMDP
+from pysnakegym.model import FFNN
+
+from agents import GeneticAgent
+from util.io.export import ModelArchiveExporter
+from util.io.loader import GeneticLoader
+from util.io.model_archive import ALIGNMENT, HEADER, ModelArchive, is_model_archive
+
+FEATURES = [11, 5, 3]
+
+
+def _agents(n_distinct, repeats):
+    # the best agent of a run only changes every few generations
+    T.manual_seed(0)
+    agents = []
+    for i in range(n_distinct):
+        agent = GeneticAgent(None, FFNN(FEATURES), 0.0)
+        agent.fitness = float(i)
+        agents.extend([agent] * repeats)
+    return agents
+
+
+def _layers(network):
+    return [(layer.weight.data, layer.bias.data) for layer in network.layers()]
+
+
+def test_archive_stores_distinct_genomes_once(tmp_path):
+    agents = _agents(n_distinct=3, repeats=4)
+    ModelArchiveExporter(str(tmp_path)).export(iter(agents))
+
+    path = str(tmp_path) + ModelArchiveExporter.FILE
+    assert is_model_archive(path)
+    archive = ModelArchive(path)
+    assert len(archive) == 12
+    assert archive.features == FEATURES
+    assert archive.weights.shape == (3, 11 * 5 + 5 * 3)
+    assert isinstance(archive.weights, np.memmap)
+    assert archive.weights.offset % ALIGNMENT == 0
+
+    for generation, agent in enumerate(agents):
+        assert archive.fitness(generation) == agent.fitness
+        assert archive.first_generation(generation) == generation - generation % 4
+        for (weight, bias), (expected_weight, expected_bias) in zip(_layers(archive.network(generation)),
+                                                                    _layers(agent.neural_network)):
+            assert T.equal(weight, expected_weight)
+            assert T.equal(bias, expected_bias)
+
+
+def test_loader_opens_any_generation(tmp_path):
+    agents = _agents(n_distinct=2, repeats=2)
+    ModelArchiveExporter(str(tmp_path)).export(agents)
+    path = str(tmp_path) + ModelArchiveExporter.FILE
+    mdp = SnakeMDP(screen_width=200, screen_height=200, snake_size=20, show_game=False)
+
+    for generation, expected in [(0, agents[0]), (3, agents[3]), (-1, agents[3]), (-4, agents[0])]:
+        agent = GeneticLoader(path, mdp, [11], 3, generation).import_model()
+        assert agent.fitness == expected.fitness
+        for loaded, genome in zip(agent.get_genome(), expected.get_genome()):
+            assert T.equal(loaded, genome)
+
+    with pytest.raises(Exception):
+        GeneticLoader(path, mdp, [11], 3, 4).import_model()
+
+
+def test_corrupt_header_is_rejected(tmp_path):
+    path = str(tmp_path / "model.snkm")
+    with open(path, "wb") as file:
+        file.write(b"SNKM" + bytes(HEADER.size))
+
+    with pytest.raises(Exception):
+        ModelArchive(path)
+
+
+@pytest.mark.parametrize("dtype, tolerance", [(np.float16, 1e-3), (np.int8, 1 / 127)])
+def test_compact_archive_stores_rounded_genomes(tmp_path, dtype, tolerance):
+    agents = _agents(n_distinct=2, repeats=2)
+    ModelArchiveExporter(str(tmp_path), dtype).export(agents)
+    archive = ModelArchive(str(tmp_path) + ModelArchiveExporter.FILE)
+
+    assert archive.weights.dtype == dtype
+    for generation, agent in enumerate(agents):
+        for (weight, bias), (expected_weight, expected_bias) in zip(_layers(archive.network(generation)),
+                                                                    _layers(agent.neural_network)):
+            assert (weight - expected_weight).abs().max() <= tolerance * expected_weight.abs().max()
+            assert (bias - expected_bias).abs().max() <= tolerance * expected_bias.abs().max()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from util.io.export import GeneticPopulationData, GeneticPopulationDataExporter
+from util.io.loader import CsvLoader
+
+
+@pytest.fixture
+def generations():
+    return np.random.default_rng(0).random((100, 7))
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_fitness_and_statistics(tmp_path, generations, streamed):
+    data = GeneticPopulationData(str(tmp_path) if streamed else None, capacity=4)
+    for fitness in generations:
+        data.add_generational_fitness(fitness)
+
+    assert np.array_equal(data.get_generational_data(), generations.T)
+    statistics = data.get_statistics()
+    assert np.allclose(statistics, np.stack([generations.min(axis=1), generations.mean(axis=1),
+                                             generations.max(axis=1), generations.std(axis=1)], axis=1))
+    data.close()
+
+
+def test_streamed_data_survives_a_crash(tmp_path, generations):
+    data = GeneticPopulationData(str(tmp_path))
+    for fitness in generations[:10]:
+        data.add_generational_fitness(fitness)
+
+    # a generation that was only partly written when the run crashed
+    with open(str(tmp_path) + GeneticPopulationData.FITNESS_FILE, "ab") as file:
+        file.write(generations[10, :3].tobytes())
+
+    assert np.array_equal(GeneticPopulationData.read_fitness(str(tmp_path)), generations[:10])
+    assert len(GeneticPopulationData.read_statistics(str(tmp_path))) == 10
+
+    loader = CsvLoader(str(tmp_path))
+    assert loader.load()
+    assert np.array_equal(loader.as_numpy(), generations[:10].T)
+
+
+def test_population_size_must_not_change(generations):
+    data = GeneticPopulationData()
+    data.add_generational_fitness(generations[0])
+
+    with pytest.raises(Exception):
+        data.add_generational_fitness(generations[1, :3])
+
+
+def test_exported_csv_matches_dataframe(tmp_path, generations):
+    data = GeneticPopulationData(str(tmp_path))
+    for fitness in generations:
+        data.add_generational_fitness(fitness)
+    GeneticPopulationDataExporter(str(tmp_path), chunk_size=3).export(data)
+    data.close()
+
+    expected = tmp_path / "expected.csv"
+    pd.DataFrame(generations.T).to_csv(expected)
+    assert (tmp_path / "fitness_data.csv").read_text() == expected.read_text()
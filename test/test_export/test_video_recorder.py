@@ -0,0 +1,39 @@
+import os
+
+import cv2
+import numpy as np
+import pygame
+import pytest
+
+from util.io.video_recorder import VideoRecorder
+
+WIDTH, HEIGHT = 64, 48
+
+
+@pytest.fixture(autouse=True)
+def video_driver(monkeypatch):
+    # pygame draws without opening a window
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+
+
+def test_frames_are_encoded_without_images(tmp_path):
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    path = str(tmp_path / "video.mp4")
+
+    # fewer buffers than frames, so recording has to wait for the encoder to hand buffers back
+    with VideoRecorder(path, (WIDTH, HEIGHT), fps=10, n_buffers=2) as recorder:
+        for i in range(20):
+            surface.fill((0, 0, 0))
+            surface.fill((0, 0, 255), pygame.Rect(0, 0, WIDTH // 2, HEIGHT))
+            recorder.record(surface)
+
+    assert recorder.n_frames == 20
+    assert os.listdir(str(tmp_path)) == ["video.mp4"]
+
+    video = cv2.VideoCapture(path)
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == 20
+    ok, frame = video.read()
+    assert ok and frame.shape == (HEIGHT, WIDTH, 3)
+    # the left half is blue, which is the first channel of the BGR frames of opencv
+    assert np.abs(frame[HEIGHT // 2, WIDTH // 4].astype(int) - [255, 0, 0]).max() < 40
+    assert frame[HEIGHT // 2, 3 * WIDTH // 4].max() < 40
@@ -0,0 +1,70 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "../..")
+# the modules that make up most of the import time, importing torch alone takes several seconds
+HEAVY_MODULES = ["torch", "pygame", "cv2", "pandas", "jsonpickle", "torch.utils.tensorboard"]
+# an import may take this many times as long as an interpreter that only imports numpy, which every module imports.
+# Importing torch alone takes about twenty times as long.
+BUDGET_FACTOR = 10
+LIGHTWEIGHT_MODULES = ["util", "util.io.loader", "util.io.export", "evolution", "util.analysis.fitness_summary"]
+
+
+def _import(module: str):
+    """
+    Imports a module in a new interpreter so that no module has been imported before.
+    :return: the heavy modules that were imported
+    """
+    code = ("import json, sys\n"
+            f"import {module}\n"
+            f"print(json.dumps([name for name in {HEAVY_MODULES} if name in sys.modules]))\n")
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, universal_newlines=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def _wall_time(code: str, repeats: int = 3) -> float:
+    """
+    Runs code in a new interpreter.
+    :return: the seconds of the fastest run, including the start of the interpreter
+    """
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+@pytest.fixture(scope="module")
+def budget():
+    return BUDGET_FACTOR * _wall_time("import numpy")
+
+
+@pytest.mark.parametrize("module", LIGHTWEIGHT_MODULES)
+def test_lightweight_imports_do_not_import_heavy_modules(module):
+    assert _import(module) == []
+
+
+@pytest.mark.parametrize("module", LIGHTWEIGHT_MODULES + ["replay"])
+def test_imports_stay_within_budget(module, budget):
+    assert _wall_time(f"import {module}") < budget
+
+
+def test_replay_only_imports_pygame():
+    assert _import("replay") == ["pygame"]
+
+
+def test_play_does_not_import_pandas_or_tensorboard():
+    assert _import("play") == ["torch", "pygame"]
+
+
+def test_lazy_attributes_are_imported_on_access():
+    heavy_modules = _import("util.io.loader; util.io.loader.GeneticLoader")
+    assert "torch" in heavy_modules
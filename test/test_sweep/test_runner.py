@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from sweep import runner
+
+PARAMS = {
+    "generations": 2,
+    "population_size": 4,
+    "mutation_rate": 0.01,
+    "crossover_rate": 0.9,
+    "fitness_function": "MAXIMISE_FOOD_EATEN",
+    "crossover_points": 2,
+    "selection_type": "TOURNAMENT",
+    "selection_params": {"tournament_size": 2},
+    "type": "GENERATIONAL",
+    "replacement_function": "REPLACEMENT",
+    "elitism": 0.0,
+    "graphics": False,
+    "screen_width": 100,
+    "screen_height": 100,
+    "snake_size": 20,
+    "neural_network": [4],
+    "simulation_mode": "VECTORIZED",
+    "seed": None,
+    "starvation_steps": 50,
+}
+
+
+def test_grid_is_combined_with_every_random_sample():
+    sweep = {"grid": {"population_size": [10, 20], "selection_params.tournament_size": [2]},
+             "random": {"mutation_rate": {"log_uniform": [0.001, 0.1]}, "neural_network": {"choice": [[4], [8]]}},
+             "samples": 3, "seed": 1}
+
+    configs = runner.expand(sweep)
+    assert len(configs) == 6
+    assert {config["population_size"] for config in configs} == {10, 20}
+    assert all(0.001 <= config["mutation_rate"] <= 0.1 for config in configs)
+    assert configs == runner.expand(sweep)
+
+
+def test_unknown_distribution_is_rejected():
+    with pytest.raises(Exception):
+        runner.expand({"random": {"mutation_rate": {"normal": [0, 1]}}})
+
+
+def test_jobs_change_nested_params_and_share_directories_per_config(tmp_path):
+    sweep = {"grid": {"selection_params.tournament_size": [2, 3]}, "seeds": [0, 1]}
+
+    jobs = runner.jobs(PARAMS, sweep, str(tmp_path))
+    assert len(jobs) == 4
+    assert [job["params"]["selection_params"]["tournament_size"] for job in jobs] == [2, 2, 3, 3]
+    assert jobs[0]["config"] == jobs[1]["config"] != jobs[2]["config"]
+    assert PARAMS["selection_params"]["tournament_size"] == 2
+    assert len({job["path"] for job in jobs}) == 4
+
+
+def test_finished_jobs_are_skipped_and_gathered(tmp_path):
+    sweep = {"grid": {"mutation_rate": [0.01, 0.1]}, "seeds": [0]}
+    path = str(tmp_path)
+
+    assert runner.run(PARAMS, sweep, path, processes=0, progress=lambda message: None) == []
+    first_results = runner.gather(path)
+    assert len(first_results) == 2
+    assert set(first_results["mutation_rate"]) == {0.01, 0.1}
+    assert (first_results["best_fitness"] >= first_results["final_max_fitness"]).all()
+
+    messages = []
+    runner.run(PARAMS, sweep, path, processes=0, progress=messages.append)
+    assert messages == ["2 jobs, 2 already finished"]
+
+    with open(runner.jobs(PARAMS, sweep, path)[0]["path"] + "/hyperparameters.json") as file:
+        assert json.load(file)["seed"] == 0
@@ -1,22 +1,150 @@
 import argparse
+import random
 from datetime import datetime
 
+import numpy as np
+import torch as T
+
+from environment import Termination
 from util.io.loader.json_loader import JsonLoader
 from util import GeneticArgumentValidator
 from util.io.export import GameSequenceExporter
-from util.io.export import GeneticExporter, GeneticPopulationDataExporter
-from util.io.export import HyperParameterExporter
+from util.io.export import GeneticPopulationData, GeneticPopulationDataExporter
+from util.io.export import HyperParameterExporter, ModelArchiveExporter
 from evolution import Generational
 from evolution import SnakePopulation
+from evolution import SteadyState
+from evolution.checkpoint import Checkpoint
+from evolution.fitness_cache import FitnessCache
+from evolution.genome import NUMPY_DTYPES
+from evolution.hall_of_fame import best_genomes
+from evolution.island import IslandModel
+from evolution.phase_timer import PhaseTimer
+
+
+def genetic_operators(arg_validator: GeneticArgumentValidator, params) -> dict:
+    """
+    Creates the selection, crossover and mutation of a population from the hyper parameters.
+    :param arg_validator: the validator of the hyper parameters
+    :param params: the hyper parameters
+    :return: the keyword arguments of a SnakePopulation for the genetic operators
+    """
+    selection = arg_validator.get_selection(params["selection_type"])
+    selection.set_params(params["selection_params"])
+    mutation = arg_validator.get_mutation(params.get("mutation_type", "UNIFORM"))
+    mutation.set_params(params.get("mutation_params", {}))
+    crossover_func = arg_validator.get_crossover(params.get("crossover_type", "N_POINT"))
+    crossover_func.set_params(params.get("crossover_params", {}))
+    return dict(selection=selection, mutation=mutation, crossover_func=crossover_func,
+                mutation_rate=arg_validator.validate_mutation_rate(params["mutation_rate"]),
+                crossover_rate=arg_validator.validate_crossover_rate(params["crossover_rate"]),
+                crossover_points=arg_validator.validate_n_crossover_points(params["crossover_points"]),
+                elitism=arg_validator.validate_elitism(params["elitism"]))
+
+
+def train(params, path: str, seed: int = None, resume: bool = False, profile: int = None):
+    """
+    Runs a single execution of the evolutionary algorithm and exports its results to a directory.
+    :param params: the hyper parameters of the run
+    :param path: the directory of the run
+    :param seed: the seed of the run. None does not seed the run.
+    :param resume: whether the interrupted run in the directory is continued from its last checkpoint
+    :param profile: the generation of a GENERATIONAL run that is profiled with cProfile. None does not profile.
+    :return: the algorithm after it has run
+    """
+    arg_validator = GeneticArgumentValidator()
+    n_generations = arg_validator.validate_n_generations(params["generations"])
+    pop_size = arg_validator.validate_population_size(params["population_size"])
+    operators = genetic_operators(arg_validator, params)
+    fitness_func = arg_validator.get_fitness_func(params["fitness_function"])
+    algorithm_type = arg_validator.validate_algorithm_type(params["type"])
+    screen_width, screen_height, snake_size = arg_validator.validate_screen_size(params["screen_width"], params["screen_height"], params["snake_size"])
+    graphics = params["graphics"]
+    neural_network = arg_validator.validate_neural_network(params["neural_network"])
+    simulation_mode = arg_validator.validate_simulation_mode(params.get("simulation_mode", "SERIAL"))
+    workers = arg_validator.validate_workers(params.get("workers", 0), simulation_mode)
+    genome_dtype = arg_validator.validate_genome_dtype(params.get("genome_dtype", "FLOAT32"))
+    checkpoint_generations = arg_validator.validate_checkpoint_interval(params.get("checkpoint_generations", None), "Checkpoint Generations")
+    checkpoint_seconds = arg_validator.validate_checkpoint_interval(params.get("checkpoint_seconds", None), "Checkpoint Seconds")
+    fitness_cache_size = arg_validator.validate_fitness_cache_size(params.get("fitness_cache_size", 0))
+    same_games = arg_validator.validate_same_games(params.get("same_games", False))
+    starvation_steps = arg_validator.validate_starvation_steps(params.get("starvation_steps", None))
+    starvation_steps_per_length = arg_validator.validate_starvation_steps_per_length(params.get("starvation_steps_per_length", 0))
+    loop_detection = arg_validator.validate_loop_detection(params.get("loop_detection", False))
+    termination = Termination(starvation_steps, starvation_steps_per_length, loop_detection)
+    islands = arg_validator.validate_islands(params.get("islands", None))
+    migration_interval = arg_validator.validate_migration_interval(params.get("migration_interval", 10))
+    n_migrants = arg_validator.validate_n_migrants(params.get("migrants", 1), pop_size)
+    migration_topology = arg_validator.validate_migration_topology(params.get("migration_topology", "RING"))
+    # every island overrides the genetic operators of the hyper parameters with its own
+    island_operators = [genetic_operators(arg_validator, dict(params, **island)) for island in islands or []]
+
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed)
+        T.manual_seed(seed)
+
+    hp_exporter = HyperParameterExporter(path)
+    hp_exporter.export(params)
+
+    print(f'Generations: {n_generations}; Population Size: {pop_size}; Mutation Rate: {operators["mutation_rate"]}; Crossover Rate: {operators["crossover_rate"]}; Crossover Points: {operators["crossover_points"]}; Elitism: {operators["elitism"]};')
+
+    if islands is not None:
+
+        if resume or algorithm_type != "GENERATIONAL":
+            raise Exception("Islands can only be used by GENERATIONAL runs that are not resumed")
+        population_params = dict(pop_size=pop_size, hidden_layers=neural_network, fitness_func=fitness_func, show_game=False, screen_width=screen_width, screen_height=screen_height, snake_size=snake_size, simulation_mode=simulation_mode, same_games=same_games, termination=termination, genome_dtype=genome_dtype, fitness_cache=FitnessCache(fitness_cache_size) if fitness_cache_size > 0 else None)
+        algorithm = IslandModel([dict(population_params, **operators) for operators in island_operators], migration_interval, n_migrants, migration_topology, seed=seed, path=path)
+        algorithm.run(n_generations=n_generations)
+
+    else:
+
+        # the fitness of every generation is written to the directory of the run as soon as it is known
+        population_data = GeneticPopulationData(path)
+
+        pop = SnakePopulation(pop_size=pop_size, hidden_layers=neural_network, fitness_func=fitness_func, show_game=graphics, screen_width=screen_width, screen_height=screen_height, snake_size=snake_size, simulation_mode=simulation_mode, workers=workers, seed=seed, population_data=population_data, fitness_cache=FitnessCache(fitness_cache_size) if fitness_cache_size > 0 else None, same_games=same_games, termination=termination, genome_dtype=genome_dtype, **operators)
+
+        if algorithm_type == "GENERATIONAL":
+
+            algorithm = Generational(pop, Checkpoint(path, checkpoint_generations, checkpoint_seconds), phase_timer=PhaseTimer(path, profile), log_dir=path)
+            if resume:
+                algorithm.resume(path)
+            algorithm.run(n_generations=n_generations)
+
+        elif algorithm_type == "STEADY_STATE":
+
+            if resume:
+                raise Exception("Only GENERATIONAL runs can be resumed from a checkpoint")
+            algorithm = SteadyState(pop, workers, log_dir=path)
+            algorithm.run(n_generations=n_generations)
+
+    model_archive_exporter = ModelArchiveExporter(path, NUMPY_DTYPES[genome_dtype])
+    # the genomes are streamed out of the hall of fame, without rebuilding the best agent of every generation
+    model_archive_exporter.export_genomes(algorithm.hall_of_fames[0].features, best_genomes(algorithm.hall_of_fames, n_generations))
+
+    genetic_population_data_exporter = GeneticPopulationDataExporter(path)
+    genetic_population_data_exporter.export(algorithm.get_population_data())
+
+    game_sequence_exporter = GameSequenceExporter(path)
+    game_sequence_exporter.export(algorithm.best_individual_of(n_generations - 1).get_replay())
+
+    return algorithm
+
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
 
     parser.add_argument("-hp", "--hyper_params", nargs='?', type=str, help="the path to a hyper parameters json file that will be loaded")
     parser.add_argument("-ex", "--executions", nargs='?', type=int, default=1, help="the number of times the entire algorithm should be run")
+    parser.add_argument("--resume", nargs='?', type=str, default=None, help="the directory of an interrupted run that will be continued from its last checkpoint")
+    parser.add_argument("--profile", nargs='?', type=int, default=None, help="the generation of a GENERATIONAL run that is profiled with cProfile")
 
     args = parser.parse_args()
     hyper_params_path = args.hyper_params
+    if args.resume is not None:
+        # a resumed run uses the hyper parameters it was started with
+        hyper_params_path = args.resume + "/hyperparameters.json"
+        args.executions = 1
     loader = JsonLoader(hyper_params_path)
     if not loader.load():
         exit(1)
@@ -25,49 +153,19 @@ if __name__ == '__main__':
 
     arg_validator = GeneticArgumentValidator()
     n_executions = arg_validator.validate_n_executions(args.executions)
-    n_generations = arg_validator.validate_n_generations(params["generations"])
-    pop_size = arg_validator.validate_population_size(params["population_size"])
-    mutation_rate = arg_validator.validate_mutation_rate(params["mutation_rate"])
-    crossover_rate = arg_validator.validate_crossover_rate(params["crossover_rate"])
-    crossover_points = arg_validator.validate_n_crossover_points(params["crossover_points"])
-    fitness_func = arg_validator.get_fitness_func(params["fitness_function"])
-    selection = arg_validator.get_selection(params["selection_type"])
-    selection.set_params(params["selection_params"])
-    algorithm_type = arg_validator.validate_algorithm_type(params["type"])
-    elitism = arg_validator.validate_elitism(params["elitism"])
-    screen_width, screen_height, snake_size = arg_validator.validate_screen_size(params["screen_width"], params["screen_height"], params["snake_size"])
-    graphics = params["graphics"]
-    neural_network = arg_validator.validate_neural_network(params["neural_network"])
+    seed = arg_validator.validate_seed(params.get("seed", None))
 
     for execution in range(n_executions):
         print(f'Execution: {execution + 1}')
-        pop = SnakePopulation(pop_size=pop_size, hidden_layers=neural_network, mutation_rate=mutation_rate, crossover_rate=crossover_rate, elitism=elitism, fitness_func=fitness_func, selection=selection, show_game=graphics, screen_width=screen_width, screen_height=screen_height, snake_size=snake_size)
-
-        print(f'Generations: {n_generations}; Population Size: {pop_size}; Mutation Rate: {mutation_rate}; Crossover Rate: {crossover_rate}; Crossover Points: {crossover_points}; Elitism: {elitism};')
-
-        if algorithm_type == "GENERATIONAL":
-
-            algorithm = Generational(pop)
-            algorithm.run(n_generations=n_generations)
+        execution_seed = None
+        if seed is not None:
+            execution_seed = seed + execution
 
+        if args.resume is not None:
+            path = args.resume
+        else:
             now = datetime.now()
             date_time = now.strftime("%m_%d_%Y__%H_%M_%S")
             path = './models/evolution/' + date_time
 
-            for n in range(n_generations):
-                genetic_exporter = GeneticExporter(path)
-                genetic_exporter.export(algorithm.best_individual_of(n), f'/torch_model_gen_{n + 1}.pth')
-
-            genetic_population_data_exporter = GeneticPopulationDataExporter(path)
-            genetic_population_data_exporter.export(algorithm.get_population_data())
-
-            hp_exporter = HyperParameterExporter(path)
-            hp_exporter.export(params)
-
-            game_sequence_exporter = GameSequenceExporter(path)
-            game_sequence_exporter.export(algorithm.best_individual_of(n_generations - 1).get_replay())
-
-
-
-
-
+        train(params, path, execution_seed, args.resume is not None, args.profile)
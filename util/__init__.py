@@ -1,3 +1,8 @@
-from util.argument_validator import GeneticArgumentValidator
-from util.argument_validator import FitnessFunctionValidator
-from util.argument_validator import SelectionFunctionValidator
+from util.lazy_import import lazy_attributes
+
+# the validators import the evolution and therefore torch, they are only imported when they are used
+lazy_attributes(__name__, {
+    "GeneticArgumentValidator": "util.argument_validator",
+    "FitnessFunctionValidator": "util.argument_validator",
+    "SelectionFunctionValidator": "util.argument_validator",
+})
@@ -1,8 +1,10 @@
+import argparse
+
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy.signal import medfilt
 
-from util.io.loader import CsvLoader
+from util.analysis.fitness_summary import aggregate, find_runs, summarise_runs
 
 
 def plot_min_mean_max(min_data: np.array, mean_data: np.array, max_data: np.array, smoothed: bool = False):
@@ -36,11 +38,25 @@ def min_mean_max_split(data: np.array) -> (np.array, np.array, np.array):
 
 
 if __name__ == "__main__":
-
-    loader = CsvLoader("../../models/evolution/10_01_2021__08_07_26")
-
-    if loader.load():
-        data = loader.as_numpy()
-        min_data, mean_data, max_data = min_mean_max_split(data)
-
-        plot_min_mean_max(min_data, mean_data, max_data)
+    parser = argparse.ArgumentParser(prog="python -m util.analysis.analysis_main")
+
+    parser.add_argument("paths", nargs='*', default=["models/evolution"], help="the directories of runs or of directories with many runs")
+    parser.add_argument("-p", "--processes", nargs='?', type=int, default=None, help="the number of processes that summarise the runs, defaults to the number of cores")
+    parser.add_argument("-s", "--statistic", nargs='?', type=str, default="max", help="the statistic of every generation that is compared across several runs")
+    parser.add_argument("--smoothed", dest='smoothed', action='store_true', help="smooths the lines of the plot")
+    parser.set_defaults(smoothed=False)
+
+    args = parser.parse_args()
+    runs = [run for path in args.paths for run in find_runs(path)]
+    if len(runs) == 0:
+        raise Exception(f"There are no runs in {args.paths}")
+
+    # the summaries are cached next to the runs, so plotting the same runs again does not read their fitness
+    summaries = summarise_runs(runs, args.processes)
+    if len(runs) == 1:
+        summary = summaries[runs[0]]
+        plot_min_mean_max(summary["min"], summary["mean"], summary["max"], args.smoothed)
+    else:
+        print(f"The {args.statistic} fitness of {len(runs)} runs")
+        aggregated = aggregate(summaries, args.statistic)
+        plot_min_mean_max(aggregated["min"], aggregated["mean"], aggregated["max"], args.smoothed)
@@ -0,0 +1,149 @@
+"""
+Summaries of the fitness of runs that are computed without loading the fitness of a whole run into memory.
+
+The fitness of a run is read from the binary fitness file that is written while the run is training, which is memory
+mapped and summarised in chunks of generations. A run that only has a csv file is converted into a binary fitness file
+once, in chunks of individuals. The summary of a run is cached in fitness_summary.npz next to its fitness, together
+with the size and modification time of the fitness file it was computed from, so that it is only computed again once the
+run has written new generations.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from util.io.export.genetic_exporter import GeneticPopulationData
+
+CSV_FILE = "/fitness_data.csv"
+SUMMARY_FILE = "/fitness_summary.npz"
+PERCENTILES = [10, 25, 50, 75, 90]
+STATISTICS = ["min", "mean", "max", "std"] + [f"p{percentile}" for percentile in PERCENTILES]
+
+
+def is_run(path: str) -> bool:
+    return os.path.isfile(path + GeneticPopulationData.FITNESS_FILE) or os.path.isfile(path + CSV_FILE)
+
+
+def convert_csv(path: str, chunk_size: int = 256) -> None:
+    """
+    Writes the fitness of a csv file into a binary fitness file in the same directory. The csv file has one row per
+    individual, the rows are read in chunks and written into the columns of the memory mapped binary file.
+    :param path: the directory of the run
+    :param chunk_size: the number of individuals that are read at once
+    :return: None
+    """
+    import pandas as pd
+
+    with open(path + CSV_FILE) as file:
+        n_generations = len(file.readline().strip().split(",")) - 1
+        pop_size = sum(1 for line in file if line.strip())
+
+    file_path = path + GeneticPopulationData.FITNESS_FILE
+    # the file is written under a temporary name, so that a conversion that is interrupted is not mistaken for a run
+    with open(file_path + ".tmp", "wb") as file:
+        file.write(GeneticPopulationData.HEADER.pack(GeneticPopulationData.MAGIC, GeneticPopulationData.VERSION,
+                                                     pop_size))
+        file.truncate(GeneticPopulationData.HEADER.size + 8 * pop_size * n_generations)
+
+    if pop_size > 0 and n_generations > 0:
+        fitness = np.memmap(file_path + ".tmp", dtype="<f8", mode="r+", offset=GeneticPopulationData.HEADER.size,
+                            shape=(n_generations, pop_size))
+        start = 0
+        for chunk in pd.read_csv(path + CSV_FILE, index_col=0, chunksize=chunk_size):
+            fitness[:, start:start + len(chunk)] = chunk.to_numpy().T
+            start += len(chunk)
+        fitness.flush()
+        del fitness
+    os.replace(file_path + ".tmp", file_path)
+
+
+def summarise_fitness(fitness: np.array, chunk_size: int = 1024) -> Dict[str, np.array]:
+    """
+    Computes the statistics of every generation, a chunk of generations at a time.
+    :param fitness: an array of shape (n_generations, pop_size), e.g. a memory mapped fitness file
+    :param chunk_size: the number of generations that are read at once
+    :return: a dictionary from the name of every statistic in STATISTICS to an array of shape (n_generations,)
+    """
+    summary = {name: np.zeros(len(fitness)) for name in STATISTICS}
+    for start in range(0, len(fitness), chunk_size):
+        chunk = np.asarray(fitness[start:start + chunk_size])
+        end = start + len(chunk)
+        summary["min"][start:end] = chunk.min(axis=1)
+        summary["mean"][start:end] = chunk.mean(axis=1)
+        summary["max"][start:end] = chunk.max(axis=1)
+        summary["std"][start:end] = chunk.std(axis=1)
+        for percentile, values in zip(PERCENTILES, np.percentile(chunk, PERCENTILES, axis=1)):
+            summary[f"p{percentile}"][start:end] = values
+
+    return summary
+
+
+def summarise_run(path: str, chunk_size: int = 1024) -> Dict[str, np.array]:
+    """
+    Gets the summary of a run from its cache, or computes and caches it if the run has changed since it was cached.
+    :param path: the directory of the run
+    :param chunk_size: the number of generations that are read at once
+    :return: a dictionary from the name of every statistic in STATISTICS to an array of shape (n_generations,)
+    """
+    if not os.path.isfile(path + GeneticPopulationData.FITNESS_FILE):
+        convert_csv(path)
+
+    stat = os.stat(path + GeneticPopulationData.FITNESS_FILE)
+    source = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+    if os.path.isfile(path + SUMMARY_FILE):
+        with np.load(path + SUMMARY_FILE) as cached:
+            if np.array_equal(cached["source"], source):
+                return {name: cached[name] for name in STATISTICS}
+
+    summary = summarise_fitness(GeneticPopulationData.read_fitness(path), chunk_size)
+    # np.savez appends .npz to a name without it, the temporary file keeps the suffix
+    temporary = path + SUMMARY_FILE + ".tmp.npz"
+    np.savez(temporary, source=source, **summary)
+    os.replace(temporary, path + SUMMARY_FILE)
+    return summary
+
+
+def find_runs(root: str) -> List[str]:
+    """
+    Finds the directories of all runs below a directory, e.g. models/evolution. The islands of a run are not runs of
+    their own.
+    :param root: the directory that is searched
+    :return: the sorted directories of the runs
+    """
+    runs = []
+    for directory, subdirectories, _ in os.walk(root):
+        if is_run(directory):
+            runs.append(directory)
+            subdirectories.clear()
+        else:
+            subdirectories.sort()
+    return sorted(runs)
+
+
+def summarise_runs(paths: List[str], processes: int = None, chunk_size: int = 1024) -> Dict[str, Dict[str, np.array]]:
+    """
+    Summarises several runs in a pool of processes. Runs whose summary is cached are only read.
+    :param paths: the directories of the runs
+    :param processes: the number of processes, defaults to the number of cores. 0 summarises the runs in this process.
+    :param chunk_size: the number of generations that are read at once
+    :return: a dictionary from the directory of every run to its summary
+    """
+    if processes == 0 or len(paths) <= 1:
+        return {path: summarise_run(path, chunk_size) for path in paths}
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return dict(zip(paths, executor.map(summarise_run, paths, [chunk_size] * len(paths))))
+
+
+def aggregate(summaries: Dict[str, Dict[str, np.array]], statistic: str = "max") -> Dict[str, np.array]:
+    """
+    Aggregates a statistic of several runs, e.g. the best fitness of every generation of several executions of the same
+    hyper parameters. Only the generations that all runs have reached are aggregated.
+    :param summaries: the summaries of the runs, see summarise_runs
+    :param statistic: the statistic of the runs that is aggregated, one of STATISTICS
+    :return: a dictionary with the min, mean, and max of the statistic across the runs, each of shape (n_generations,)
+    """
+    n_generations = min(len(summary[statistic]) for summary in summaries.values())
+    values = np.stack([summary[statistic][:n_generations] for summary in summaries.values()])
+    return {"min": values.min(axis=0), "mean": values.mean(axis=0), "max": values.max(axis=0)}
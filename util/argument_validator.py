@@ -1,6 +1,9 @@
+import copy
 from typing import List
 
+import evolution.crossover as crossover
 import evolution.fitness as fitness
+import evolution.mutation as mutation
 import evolution.selection as selection
 
 
@@ -18,6 +21,8 @@ class GeneticArgumentValidator:
     def __init__(self):
         self.fitness_validator = FitnessFunctionValidator()
         self.selection_validator = SelectionFunctionValidator()
+        self.mutation_validator = MutationFunctionValidator()
+        self.crossover_validator = CrossoverFunctionValidator()
 
     def validate_n_executions(self, arg):
         if arg > 0:
@@ -37,6 +42,12 @@ class GeneticArgumentValidator:
     def get_selection(self, arg):
         return self.selection_validator.get(arg)
 
+    def get_mutation(self, arg):
+        return self.mutation_validator.get(arg)
+
+    def get_crossover(self, arg):
+        return self.crossover_validator.get(arg)
+
     def validate_n_generations(self, arg: int) -> int:
         if arg >= 0:
             return arg
@@ -73,6 +84,94 @@ class GeneticArgumentValidator:
 
         raise Exception("%s is not recognised as a correct argument for %s. It must be in [\"STEADY_STATE\", \"GENERATIONAL\"]." % (arg, "Algorithm Type"))
 
+    def validate_simulation_mode(self, arg: str) -> str:
+        if arg in ["SERIAL", "BATCHED", "VECTORIZED"]:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be in [\"SERIAL\", \"BATCHED\", \"VECTORIZED\"]." % (arg, "Simulation Mode"))
+
+    def validate_genome_dtype(self, arg: str) -> str:
+        if arg in ["FLOAT32", "FLOAT16", "INT8"]:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be in [\"FLOAT32\", \"FLOAT16\", \"INT8\"]." % (arg, "Genome Dtype"))
+
+    def validate_workers(self, arg: int, simulation_mode: str = "VECTORIZED") -> int:
+        if type(arg) == int and arg == 0:
+            return arg
+
+        # the workers play their games in a numpy environment, so they would not play the games of the other modes
+        if type(arg) == int and arg > 0 and simulation_mode == "VECTORIZED":
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be an int >= 0, and 0 unless the Simulation Mode is \"VECTORIZED\"." % (arg, "Workers"))
+
+    def validate_seed(self, arg):
+        if arg is None or (type(arg) == int and arg >= 0):
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be null or an int >= 0." % (arg, "Seed"))
+
+    def validate_checkpoint_interval(self, arg, name: str):
+        if arg is None or arg > 0:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be null or > 0." % (arg, name))
+
+    def validate_fitness_cache_size(self, arg: int) -> int:
+        if type(arg) == int and arg >= 0:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be an int >= 0." % (arg, "Fitness Cache Size"))
+
+    def validate_same_games(self, arg: bool) -> bool:
+        if type(arg) == bool:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be true or false." % (arg, "Same Games"))
+
+    def validate_starvation_steps(self, arg):
+        if arg is None or (type(arg) == int and arg > 0):
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be null or an int > 0." % (arg, "Starvation Steps"))
+
+    def validate_starvation_steps_per_length(self, arg: int) -> int:
+        if type(arg) == int and arg >= 0:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be an int >= 0." % (arg, "Starvation Steps Per Length"))
+
+    def validate_loop_detection(self, arg: bool) -> bool:
+        if type(arg) == bool:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be true or false." % (arg, "Loop Detection"))
+
+    def validate_islands(self, arg):
+        if arg is None or (type(arg) == list and len(arg) > 0 and all(type(island) == dict for island in arg)):
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be null or a non empty list of objects." % (arg, "Islands"))
+
+    def validate_migration_interval(self, arg: int) -> int:
+        if type(arg) == int and arg > 0:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be an int > 0." % (arg, "Migration Interval"))
+
+    def validate_n_migrants(self, arg: int, pop_size: int) -> int:
+        if type(arg) == int and 0 <= arg <= pop_size:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be in the interval [0, %d]." % (arg, "Migrants", pop_size))
+
+    def validate_migration_topology(self, arg: str) -> str:
+        if arg in ["RING", "RANDOM"]:
+            return arg
+
+        raise Exception("%s is not recognised as a correct argument for %s. It must be in [\"RING\", \"RANDOM\"]." % (arg, "Migration Topology"))
+
     def validate_elitism(self, arg: float) -> float:
         if 0.0 <= arg <= 1.0:
             return arg
@@ -111,6 +210,7 @@ class FitnessFunctionValidator(ArgumentValidator):
         self.fitness_func_mapping["MAXIMISE_MOVES"] = fitness.maximise_moves
         self.fitness_func_mapping["MAXIMISE_FOOD_EATEN"] = fitness.maximise_food_eaten
         self.fitness_func_mapping["MAXIMISE_REWARD"] = fitness.maximise_reward
+        self.fitness_func_mapping["MAXIMISE_MOVES_WITHOUT_STALLING"] = fitness.maximise_moves_without_stalling
 
     def validate(self, arg: str) -> bool:
         return arg in self.fitness_func_mapping.keys()
@@ -135,9 +235,48 @@ class SelectionFunctionValidator(ArgumentValidator):
 
     def get(self, arg):
         if (self.validate(arg)):
-            return self.selection_func_mapping[arg]
+            # every caller sets the params of its own operator, e.g. every island of a run
+            return copy.deepcopy(self.selection_func_mapping[arg])
 
         raise Exception("%s is not recognised as a correct argument for %s" % (arg, "Selection Function"))
 
 
+class MutationFunctionValidator(ArgumentValidator):
+
+    def __init__(self):
+        self.mutation_func_mapping = dict()
+        self.mutation_func_mapping["UNIFORM"] = mutation.UniformMutation({})
+        self.mutation_func_mapping["GAUSSIAN"] = mutation.GaussianMutation({})
+        self.mutation_func_mapping["SELF_ADAPTIVE"] = mutation.SelfAdaptiveMutation({})
+
+    def validate(self, arg: str) -> bool:
+        return arg in self.mutation_func_mapping.keys()
+
+    def get(self, arg):
+        if (self.validate(arg)):
+            # every caller sets the params of its own operator, e.g. every island of a run
+            return copy.deepcopy(self.mutation_func_mapping[arg])
+
+        raise Exception("%s is not recognised as a correct argument for %s" % (arg, "Mutation Function"))
+
+
+class CrossoverFunctionValidator(ArgumentValidator):
+
+    def __init__(self):
+        self.crossover_func_mapping = dict()
+        self.crossover_func_mapping["N_POINT"] = crossover.NPointCrossover({})
+        self.crossover_func_mapping["UNIFORM"] = crossover.UniformCrossover({})
+        self.crossover_func_mapping["BLEND"] = crossover.BlendCrossover({})
+
+    def validate(self, arg: str) -> bool:
+        return arg in self.crossover_func_mapping.keys()
+
+    def get(self, arg):
+        if (self.validate(arg)):
+            # every caller sets the params of its own operator, e.g. every island of a run
+            return copy.deepcopy(self.crossover_func_mapping[arg])
+
+        raise Exception("%s is not recognised as a correct argument for %s" % (arg, "Crossover Function"))
+
+
 
@@ -1,6 +1,11 @@
-from util.io.export.game_sequence_exporter import GameSequenceExporter
-from util.io.export.genetic_exporter import GeneticExporter
-from util.io.export.genetic_exporter import GeneticPopulationData
-from util.io.export.genetic_exporter import GeneticPopulationDataExporter
-from util.io.export.hyper_parameter_exporter import HyperParameterExporter
-from util.io.export.exporter import Exporter
+from util.lazy_import import lazy_attributes
+
+lazy_attributes(__name__, {
+    "GameSequenceExporter": "util.io.export.game_sequence_exporter",
+    "GeneticExporter": "util.io.export.genetic_exporter",
+    "GeneticPopulationData": "util.io.export.genetic_exporter",
+    "GeneticPopulationDataExporter": "util.io.export.genetic_exporter",
+    "HyperParameterExporter": "util.io.export.hyper_parameter_exporter",
+    "ModelArchiveExporter": "util.io.export.model_archive_exporter",
+    "Exporter": "util.io.export.exporter",
+})
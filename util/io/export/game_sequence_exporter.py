@@ -1,25 +1,28 @@
 import pathlib
 
-import jsonpickle
 from pysnakegym.game import GameSequence
 
-from util.io.export import Exporter
+from util.io.export.exporter import Exporter
+from util.io.replay_format import write_replay
 
 
 class GameSequenceExporter(Exporter):
     """
-    Exporter that exports game sequences
+    Exporter that exports game sequences. They are written in the binary replay format by default, the jsonpickle format
+    of older versions can still be chosen.
     """
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, binary: bool = True):
         super().__init__(path)
+        self.binary = binary
 
     def export(self, game_sequences: [GameSequence]):
         pathlib.Path(self.path).mkdir(parents=True, exist_ok=True)
 
+        if self.binary:
+            write_replay(self.path + "/sequence.replay", game_sequences)
+            return
+
+        import jsonpickle
         with open(self.path + "/sequence.json", "w") as outfile:
             outfile.write(jsonpickle.encode(game_sequences))
-
-
-
-
@@ -1,10 +1,11 @@
+import os
 import pathlib
+import struct
+
+from typing import Dict
 
 import numpy as np
-import torch
-import pandas as pd
 
-from agents.genetic_agent import GeneticAgent
 from util.io.export.exporter import Exporter
 
 
@@ -16,7 +17,9 @@ class GeneticExporter(Exporter):
     def __init__(self, path: str):
         super().__init__(path)
 
-    def export(self, agent: GeneticAgent, file_name: str):
+    def export(self, agent: "GeneticAgent", file_name: str):
+        # torch is only imported by the exporter of the networks, not by the readers of the fitness data
+        import torch
         pathlib.Path(self.path).mkdir(parents=True, exist_ok=True)
 
         torch.save(agent.neural_network.state_dict(), self.path + file_name)
@@ -24,29 +27,202 @@ class GeneticExporter(Exporter):
 
 class GeneticPopulationData:
     """
-    Class that encapsulates data to be saved.
+    Class that encapsulates data to be saved. The fitness of every generation is appended to a buffer that doubles in
+    size when it is full, or, if a directory is given, to a binary file in that directory. The file is flushed after
+    every generation together with a csv file of the min, mean, max, and standard deviation of the fitness, so the data
+    of a run survives a crash and memory use does not grow with the number of generations.
+
+    The binary file consists of a header, magic "SNKF", version (uint16), and pop_size (uint32), followed by one row of
+    pop_size float64 values per generation.
     """
-    def __init__(self):
-        self._generational_data = np.array([[]], dtype=np.float)
+    FITNESS_FILE = "/fitness_data.bin"
+    STATISTICS_FILE = "/fitness_statistics.csv"
+    HEADER = struct.Struct("<4sHI")
+    MAGIC = b"SNKF"
+    VERSION = 1
+
+    def __init__(self, path: str = None, capacity: int = 64):
+        """
+        Constructor for the GeneticPopulationData class.
+        :param path: the directory to which the data is streamed. None keeps the data in memory.
+        :param capacity: the number of generations for which memory is allocated up front if the data is kept in memory
+        """
+        self.path = path
+        self.pop_size = None
+        self.n_generations = 0
+        self._capacity = capacity
+        self._fitness = None
+        self._statistics = None
+        self._fitness_file = None
+        self._statistics_file = None
+
+    def _open(self, pop_size: int):
+        self.pop_size = pop_size
+        if self.path is None:
+            self._fitness = np.zeros((self._capacity, pop_size))
+            self._statistics = np.zeros((self._capacity, 4))
+            return
+
+        pathlib.Path(self.path).mkdir(parents=True, exist_ok=True)
+        self._fitness_file = open(self.path + self.FITNESS_FILE, "wb")
+        self._fitness_file.write(self.HEADER.pack(self.MAGIC, self.VERSION, pop_size))
+        self._statistics_file = open(self.path + self.STATISTICS_FILE, "w")
+        self._statistics_file.write("generation,min,mean,max,std\n")
 
     def add_generational_fitness(self, generational_fitness: np.array):
-        if self._generational_data.size == 0:
-            self._generational_data = generational_fitness.T
+        """
+        Appends the fitness of a generation.
+        :param generational_fitness: the fitness of every individual of the generation, of shape (pop_size,) or
+        (1, pop_size)
+        :return:
+        """
+        fitness = np.asarray(generational_fitness, dtype=np.float64).reshape(-1)
+        if self.pop_size is None:
+            self._open(len(fitness))
+        elif len(fitness) != self.pop_size:
+            raise Exception(f"The fitness of {len(fitness)} individuals cannot be added to the data of a population of "
+                            f"{self.pop_size} individuals")
+
+        statistics = np.array([fitness.min(), fitness.mean(), fitness.max(), fitness.std()])
+        if self.path is None:
+            if self.n_generations == len(self._fitness):
+                self._fitness = np.concatenate([self._fitness, np.zeros_like(self._fitness)])
+                self._statistics = np.concatenate([self._statistics, np.zeros_like(self._statistics)])
+            self._fitness[self.n_generations] = fitness
+            self._statistics[self.n_generations] = statistics
         else:
-            self._generational_data = np.hstack((self._generational_data, generational_fitness.T))
+            self._fitness_file.write(fitness.tobytes())
+            self._fitness_file.flush()
+            self._statistics_file.write(",".join([str(self.n_generations)] + [repr(value) for value in statistics]))
+            self._statistics_file.write("\n")
+            self._statistics_file.flush()
+
+        self.n_generations += 1
 
     def get_generational_data(self) -> np.array:
-        return self._generational_data
+        """
+        Gets the fitness of all generations. If the data is streamed to a file, the file is memory mapped.
+        :return: an array of shape (pop_size, n_generations)
+        """
+        if self.pop_size is None:
+            return np.zeros((0, 0))
+        if self.path is None:
+            return self._fitness[:self.n_generations].T
+
+        return GeneticPopulationData.read_fitness(self.path)[:self.n_generations].T
+
+    def get_statistics(self) -> np.array:
+        """
+        Gets the min, mean, max, and standard deviation of the fitness of every generation.
+        :return: an array of shape (n_generations, 4)
+        """
+        if self.pop_size is None:
+            return np.zeros((0, 4))
+        if self.path is None:
+            return self._statistics[:self.n_generations]
+
+        return GeneticPopulationData.read_statistics(self.path)[:self.n_generations]
+
+    def state_dict(self) -> Dict:
+        """
+        Gets the state of the data so that it can be restored after a run was interrupted. Data that is streamed to a
+        file is not part of the state, only the number of generations that were written.
+        :return: a dictionary with the state of the data
+        """
+        state = {"pop_size": self.pop_size, "n_generations": self.n_generations}
+        if self.path is None and self.pop_size is not None:
+            state["fitness"] = self._fitness[:self.n_generations].copy()
+            state["statistics"] = self._statistics[:self.n_generations].copy()
+        return state
+
+    def load_state_dict(self, state: Dict):
+        """
+        Restores the state of the data. Generations that were streamed to the files after the state was saved are
+        removed from the files and new generations are appended.
+        :param state: a dictionary returned by state_dict
+        :return:
+        """
+        self.close()
+        self.pop_size = state["pop_size"]
+        self.n_generations = state["n_generations"]
+        if self.pop_size is None:
+            return
+
+        if self.path is None:
+            self._fitness = np.zeros((max(self.n_generations, self._capacity), self.pop_size))
+            self._statistics = np.zeros((len(self._fitness), 4))
+            self._fitness[:self.n_generations] = state["fitness"]
+            self._statistics[:self.n_generations] = state["statistics"]
+            return
+
+        self._fitness_file = open(self.path + self.FITNESS_FILE, "r+b")
+        self._fitness_file.truncate(self.HEADER.size + 8 * self.pop_size * self.n_generations)
+        self._fitness_file.seek(0, os.SEEK_END)
+
+        with open(self.path + self.STATISTICS_FILE) as file:
+            lines = file.readlines()[:self.n_generations + 1]
+        self._statistics_file = open(self.path + self.STATISTICS_FILE, "w")
+        self._statistics_file.writelines(lines)
+        self._statistics_file.flush()
+
+    def close(self):
+        for file in [self._fitness_file, self._statistics_file]:
+            if file is not None:
+                file.close()
+        self._fitness_file = None
+        self._statistics_file = None
+
+    @staticmethod
+    def read_fitness(path: str) -> np.array:
+        """
+        Memory maps the fitness file in a directory. A generation that was only partly written is ignored.
+        :param path: the directory of the fitness file
+        :return: a read only array of shape (n_generations, pop_size)
+        """
+        file_path = path + GeneticPopulationData.FITNESS_FILE
+        with open(file_path, "rb") as file:
+            magic, version, pop_size = GeneticPopulationData.HEADER.unpack(file.read(GeneticPopulationData.HEADER.size))
+        if magic != GeneticPopulationData.MAGIC:
+            raise Exception(f"{file_path} is not a fitness file")
+
+        n_generations = (os.path.getsize(file_path) - GeneticPopulationData.HEADER.size) // (8 * pop_size)
+        if n_generations == 0:
+            return np.zeros((0, pop_size))
+        return np.memmap(file_path, dtype="<f8", mode="r", offset=GeneticPopulationData.HEADER.size,
+                         shape=(n_generations, pop_size))
+
+    @staticmethod
+    def read_statistics(path: str) -> np.array:
+        """
+        Reads the statistics file in a directory.
+        :param path: the directory of the statistics file
+        :return: an array of shape (n_generations, 4) with the min, mean, max, and standard deviation of every generation
+        """
+        import pandas as pd
+        statistics = pd.read_csv(path + GeneticPopulationData.STATISTICS_FILE, index_col=0)
+        return statistics[["min", "mean", "max", "std"]].to_numpy()
 
 
 class GeneticPopulationDataExporter(Exporter):
 
-    def __init__(self, path: str):
+    def __init__(self, path: str, chunk_size: int = 64):
         super().__init__(path)
-        self._generational_data = np.array([[]], dtype=np.float)
+        self.chunk_size = chunk_size
 
     def export(self, data: GeneticPopulationData):
+        """
+        Writes the fitness of all generations into a csv file with one row per individual and one column per generation.
+        The rows are written in chunks of individuals, so the whole table is never held in memory.
+        :param data: the data to be exported
+        :return:
+        """
+        # pandas is only imported by the exporters and readers of the csv files, not by a running population
+        import pandas as pd
         pathlib.Path(self.path).mkdir(parents=True, exist_ok=True)
-        fitness_df = pd.DataFrame(data.get_generational_data())
-        fitness_df.to_csv(self.path + "/fitness_data.csv")
+        fitness = data.get_generational_data()
 
+        with open(self.path + "/fitness_data.csv", "w") as outfile:
+            pd.DataFrame(columns=range(fitness.shape[1])).to_csv(outfile)
+            for start in range(0, len(fitness), self.chunk_size):
+                chunk = np.asarray(fitness[start:start + self.chunk_size])
+                pd.DataFrame(chunk, index=range(start, start + len(chunk))).to_csv(outfile, header=False)
@@ -0,0 +1,64 @@
+import itertools
+import pathlib
+from typing import Iterable, List
+
+import numpy as np
+import torch
+
+from agents.genetic_agent import GeneticAgent
+from util.io.export.exporter import Exporter
+from util.io.model_archive import ModelArchiveWriter
+
+
+class ModelArchiveExporter(Exporter):
+    """
+    Exporter that saves the networks of the best agent of every generation into a single model archive, see
+    util.io.model_archive.
+    """
+    FILE = "/models.snkm"
+
+    def __init__(self, path: str, dtype=np.float32):
+        """
+        Constructor for the ModelArchiveExporter class.
+        :param path: the directory of the archive
+        :param dtype: the dtype in which the genomes are stored, float32, float16, or int8
+        """
+        super().__init__(path)
+        self.dtype = dtype
+
+    def export(self, agents: Iterable[GeneticAgent]):
+        """
+        Writes the networks of the agents into the archive models.snkm.
+        :param agents: the best agent of every generation, starting with the first generation
+        :return:
+        """
+        agents = iter(agents)
+        agent = next(agents)
+        layers = agent.neural_network.layers()
+        features = [layers[0].in_features] + [layer.out_features for layer in layers]
+        self.export_genomes(features, map(self._genome, itertools.chain([agent], agents)))
+
+    def export_genomes(self, features: List[int], genomes: Iterable[tuple]):
+        """
+        Writes genomes into the archive models.snkm without building a network for them, e.g. the genomes that are
+        streamed out of the hall of fame by evolution.hall_of_fame.best_genomes.
+        :param features: the number of nodes of every layer of the networks, i.e. [input, hidden..., output]
+        :param genomes: the fitness, weights, and biases of the best individual of every generation, starting with the
+        first generation
+        :return:
+        """
+        pathlib.Path(self.path).mkdir(parents=True, exist_ok=True)
+
+        writer = ModelArchiveWriter(self.path + ModelArchiveExporter.FILE, features, self.dtype)
+        for fitness, weights, biases in genomes:
+            writer.add(fitness, weights, biases)
+
+        writer.close()
+
+    @staticmethod
+    def _genome(agent: GeneticAgent) -> tuple:
+        layers = agent.neural_network.layers()
+        with torch.no_grad():
+            weights = torch.cat([layer.weight.data.flatten() for layer in layers]).numpy()
+            biases = torch.cat([layer.bias.data.flatten() for layer in layers]).numpy()
+        return agent.fitness, weights, biases
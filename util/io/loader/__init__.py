@@ -1,6 +1,9 @@
-from util.io.loader.genetic_loader import GeneticLoader
-from util.io.loader.game_sequence_loader import GameSequenceLoader
-from util.io.loader.loader import Loader
-from util.io.loader.csv_loader import CsvLoader
-from util.io.loader.json_loader import JsonLoader
+from util.lazy_import import lazy_attributes
 
+lazy_attributes(__name__, {
+    "GeneticLoader": "util.io.loader.genetic_loader",
+    "GameSequenceLoader": "util.io.loader.game_sequence_loader",
+    "Loader": "util.io.loader.loader",
+    "CsvLoader": "util.io.loader.csv_loader",
+    "JsonLoader": "util.io.loader.json_loader",
+})
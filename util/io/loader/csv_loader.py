@@ -1,12 +1,16 @@
 
+import os
+
 import pandas as pd
 import numpy as np
 
-from util.io.loader import Loader
+from util.io.export.genetic_exporter import GeneticPopulationData
+from util.io.loader.loader import Loader
 
 class CsvLoader(Loader):
     """
-    Class for loading fitness data
+    Class for loading fitness data. If the csv file of a run is missing, e.g. because the run did not finish, the fitness
+    is loaded from the binary fitness file that is written during the run.
     """
     def __init__(self, path: str):
         super().__init__(path)
@@ -14,6 +18,11 @@ class CsvLoader(Loader):
 
     def load(self) -> bool:
         try:
+            if not os.path.exists(self.path + "/fitness_data.csv") and \
+                    os.path.exists(self.path + GeneticPopulationData.FITNESS_FILE):
+                self.df = pd.DataFrame(np.array(GeneticPopulationData.read_fitness(self.path)).T)
+                return True
+
             self.df = pd.read_csv(self.path + "/fitness_data.csv", index_col=0)
             return True
         except Exception as e:
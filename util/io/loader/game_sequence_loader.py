@@ -1,17 +1,34 @@
-import jsonpickle
 from pysnakegym.game import GameSequence
 
-from util.io.loader import Loader
+from util.io.loader.loader import Loader
+from util.io.replay_format import ReplayReader, is_replay_file
 
 
 class GameSequenceLoader(Loader):
     """
-    Importer that imports a list of GameSequences so that they can be replayed
+    Importer that imports a list of GameSequences so that they can be replayed. Both binary replay files and jsonpickle
+    sequence files of older versions can be imported.
     """
     def __init__(self, path: str):
         super().__init__(path)
 
     def import_sequence(self) -> [GameSequence]:
+        if is_replay_file(self.path):
+            return list(ReplayReader(self.path))
+
+        # jsonpickle is only needed for the sequence files of older versions
+        import jsonpickle
         file = open(self.path)
         json_str = file.read()
         return jsonpickle.decode(json_str)
+
+    def stream_sequence(self):
+        """
+        Gets the sequences without loading all of them into memory. Binary replay files are decoded lazily, older
+        jsonpickle files are loaded at once.
+        :return: a ReplayReader for binary replay files, a list of GameSequences for jsonpickle files
+        """
+        if is_replay_file(self.path):
+            return ReplayReader(self.path)
+
+        return self.import_sequence()
@@ -2,28 +2,40 @@ import torch
 from pysnakegym.model import FFNN
 
 from agents import GeneticAgent
-from util.io.loader import Loader
+from util.io.loader.loader import Loader
+from util.io.model_archive import ModelArchive, is_model_archive
 from pysnakegym.mdp import MDP
 
 
 class GeneticLoader(Loader):
     """
-    Importer that imports a neural network model and makes it available
+    Importer that imports a neural network model and makes it available. The model is either a single torch model or a
+    generation of a model archive.
     """
-    def __init__(self, path: str, mdp: MDP, input_dims, n_actions: int):
+    def __init__(self, path: str, mdp: MDP, input_dims, n_actions: int, generation: int = -1):
         """
 
-        :param path: the path of the torch model that will be loaded
+        :param path: the path of the torch model or of the model archive that will be loaded
         :param mdp: the Mark Decision Process that will be used by the GeneticAgent
         :param input_dims: the input dimensions of the MDP
         :param n_actions: the number actions available in the MDP
+        :param generation: the generation of a model archive that is loaded, negative generations count from the last
+        generation. It is ignored for a torch model.
         """
         super().__init__(path)
         self.mdp = mdp
         self.input_dims = input_dims
         self.n_actions = n_actions
+        self.generation = generation
 
     def import_model(self) -> GeneticAgent:
+        if is_model_archive(self.path):
+            # only the genome of the generation is read from the archive
+            archive = ModelArchive(self.path)
+            genetic_agent = GeneticAgent(self.mdp, archive.network(self.generation), 0.0)
+            genetic_agent.fitness = archive.fitness(self.generation)
+            return genetic_agent
+
         model = torch.load(self.path)
         genetic_agent = GeneticAgent(self.mdp, FFNN(self.__get_layers(model)), 0.0)
         genetic_agent.set_model(model)
@@ -1,6 +1,6 @@
 import json
 
-from util.io.loader import Loader
+from util.io.loader.loader import Loader
 
 
 class JsonLoader(Loader):
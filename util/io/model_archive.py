@@ -0,0 +1,220 @@
+"""
+Binary archive of the best network of every generation of a run.
+
+An archive starts with a fixed size header followed by the number of nodes of every layer of the networks, a table with
+one entry per generation, and two contiguous blocks of the weights and biases of the genomes. The best genome of a run
+often stays the same for many generations, so every distinct genome is only stored once and the table maps every
+generation to its row in the blocks. The blocks are aligned so that they can be memory mapped, a genome is read without
+reading the rest of the archive. All values are little endian.
+
+The genomes are stored as float32, float16, or int8. An int8 archive quantises every layer of the weights and of the
+biases of a genome with its own scale, the scales follow the biases in a fifth aligned block.
+
+    header:    magic "SNKM", version (uint16), dtype of the genomes (8 byte numpy dtype string), n_features (uint16),
+               n_generations (uint32), n_genomes (uint32), n_weights (uint32), n_biases (uint32), offsets of the
+               features, the table, the weights, and the biases (uint64)
+    features:  n_features (uint32), the nodes of every layer from the input to the output layer
+    table:     (genome (uint32), fitness (float64), first generation of the genome (uint32)) of every generation
+    weights:   (n_genomes, n_weights) genomes as in a GenomeMatrix
+    biases:    (n_genomes, n_biases)
+    scales:    (n_genomes, 2 * n_layers) float32 scales of the layers of the weights and then of the biases, int8 only
+"""
+import struct
+from typing import List
+
+import numpy as np
+import torch as T
+from pysnakegym.model import FFNN
+
+from evolution.genome import GenomeMatrix, dequantise, quantise
+
+MAGIC = b"SNKM"
+VERSION = 1
+
+HEADER = struct.Struct("<4sH8sHIIIIQQQQ")
+ALIGNMENT = 64
+_TABLE_ENTRY = np.dtype([("genome", "<u4"), ("fitness", "<f8"), ("first_generation", "<u4")])
+
+
+def is_model_archive(path: str) -> bool:
+    """
+    Checks whether a file is a model archive or a single torch model.
+    :param path: the path of the file
+    :return: True if the file starts with the magic bytes of the archive format
+    """
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _layer_slices(features: List[int]) -> (List[slice], List[slice]):
+    # the columns of every layer in the weights and in the biases of a genome
+    layout = GenomeMatrix(0, features)
+    biases = [slice(int(layout.bias_offsets[i]), int(layout.bias_offsets[i + 1])) for i in range(layout.n_layers())]
+    return layout.layer_slices(), biases
+
+
+class ModelArchiveWriter(object):
+    """
+    Class that collects the best genome of every generation and writes them into a model archive. A genome that is
+    equal to the genome of an earlier generation is not stored again.
+    """
+
+    def __init__(self, path: str, features: List[int], dtype=np.float32):
+        """
+        Constructor for the ModelArchiveWriter class.
+        :param path: the path of the archive file
+        :param features: the number of nodes of every layer of the networks, i.e. [input, hidden..., output]
+        :param dtype: the dtype in which the genomes are stored
+        """
+        self.path = path
+        self.features = list(features)
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        if self.dtype.kind not in "fi" or (self.dtype.kind == "i" and self.dtype.itemsize != 1):
+            raise Exception(f"{dtype} is not a dtype of a model archive, it must be a float or int8")
+        self._layers = _layer_slices(self.features)
+        self._scales = []
+        self._table = []
+        self._rows = {}
+        self._weights = []
+        self._biases = []
+
+    def add(self, fitness: float, weights: np.array, biases: np.array) -> None:
+        """
+        Adds the best genome of the next generation.
+        :param fitness: the fitness of the genome
+        :param weights: the weights of the genome, an array of shape (n_weights,)
+        :param biases: the biases of the genome, an array of shape (n_biases,)
+        :return: None
+        """
+        scales = np.zeros(0, dtype="<f4")
+        if self.dtype.kind == "i":
+            weights, weight_scales = quantise(T.as_tensor(np.asarray(weights, dtype=np.float32)).unsqueeze(0),
+                                              self._layers[0])
+            biases, bias_scales = quantise(T.as_tensor(np.asarray(biases, dtype=np.float32)).unsqueeze(0),
+                                           self._layers[1])
+            weights, biases = weights[0].numpy(), biases[0].numpy()
+            scales = T.cat([weight_scales[0], bias_scales[0]]).numpy()
+
+        weights = np.ascontiguousarray(weights, dtype=self.dtype)
+        biases = np.ascontiguousarray(biases, dtype=self.dtype)
+        key = weights.tobytes() + biases.tobytes() + scales.tobytes()
+        if key not in self._rows:
+            self._rows[key] = (len(self._weights), len(self._table))
+            self._weights.append(weights)
+            self._biases.append(biases)
+            self._scales.append(scales)
+
+        row, first_generation = self._rows[key]
+        self._table.append((row, fitness, first_generation))
+
+    def close(self) -> None:
+        if len(self._table) == 0:
+            raise Exception("A model archive needs the genome of at least one generation")
+
+        n_weights, n_biases = len(self._weights[0]), len(self._biases[0])
+        features_offset = HEADER.size
+        table_offset = features_offset + 4 * (len(self.features) + 1)
+        weights_offset = _aligned(table_offset + _TABLE_ENTRY.itemsize * len(self._table))
+        biases_offset = _aligned(weights_offset + self.dtype.itemsize * n_weights * len(self._weights))
+
+        with open(self.path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.dtype.str.encode(), len(self.features), len(self._table),
+                                   len(self._weights), n_weights, n_biases, features_offset, table_offset,
+                                   weights_offset, biases_offset))
+            file.write(np.array([len(self.features)] + self.features, dtype="<u4").tobytes())
+            file.write(np.array(self._table, dtype=_TABLE_ENTRY).tobytes())
+            file.seek(weights_offset)
+            file.write(np.stack(self._weights).tobytes())
+            file.seek(biases_offset)
+            file.write(np.stack(self._biases).tobytes())
+            if self.dtype.kind == "i":
+                file.seek(_aligned(biases_offset + self.dtype.itemsize * n_biases * len(self._biases)))
+                file.write(np.stack(self._scales).astype("<f4").tobytes())
+
+
+class ModelArchive(object):
+    """
+    Class that reads a model archive. The weights and biases are memory mapped, so only the genomes that are used are
+    read from the file.
+    """
+
+    def __init__(self, path: str):
+        """
+        Constructor for the ModelArchive class.
+        :param path: the path of the archive file
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            (magic, version, dtype, n_features, n_generations, n_genomes, n_weights, n_biases, features_offset,
+             table_offset, weights_offset, biases_offset) = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise Exception(f"{path} is not a model archive of version {VERSION}")
+
+            file.seek(features_offset + 4)
+            self.features = np.frombuffer(file.read(4 * n_features), dtype="<u4").tolist()
+            file.seek(table_offset)
+            self._table = np.frombuffer(file.read(_TABLE_ENTRY.itemsize * n_generations), dtype=_TABLE_ENTRY)
+
+        self.dtype = np.dtype(dtype.rstrip(b"\0").decode())
+        self.weights = np.memmap(path, dtype=self.dtype, mode="r", offset=weights_offset, shape=(n_genomes, n_weights))
+        self.biases = np.memmap(path, dtype=self.dtype, mode="r", offset=biases_offset, shape=(n_genomes, n_biases))
+        self.scales = None
+        if self.dtype.kind == "i":
+            self._layers = _layer_slices(self.features)
+            self.scales = np.memmap(path, dtype="<f4", mode="r",
+                                    offset=_aligned(biases_offset + self.dtype.itemsize * n_biases * n_genomes),
+                                    shape=(n_genomes, 2 * (n_features - 1)))
+
+    def __len__(self):
+        return len(self._table)
+
+    def _entry(self, generation: int):
+        if not -len(self) <= generation < len(self):
+            raise Exception(f"The archive {self.path} has no generation {generation}")
+        return self._table[generation]
+
+    def fitness(self, generation: int) -> float:
+        return float(self._entry(generation)["fitness"])
+
+    def first_generation(self, generation: int) -> int:
+        """
+        Gets the generation in which the genome of a generation was first the best genome.
+        :param generation: the index of the generation, negative indices count from the last generation
+        :return: the index of the first generation with the same genome
+        """
+        return int(self._entry(generation)["first_generation"])
+
+    def genome(self, generation: int) -> (np.array, np.array):
+        """
+        Gets the best genome of a generation.
+        :param generation: the index of the generation, negative indices count from the last generation
+        :return: a tuple of the weights and biases of the genome, read only views into the archive. The genome of an
+        int8 archive is dequantised into float32 copies.
+        """
+        row = int(self._entry(generation)["genome"])
+        if self.scales is None:
+            return self.weights[row], self.biases[row]
+
+        scales = T.from_numpy(np.array(self.scales[row:row + 1]))
+        n_layers = scales.shape[1] // 2
+        weights = dequantise(T.from_numpy(np.array(self.weights[row:row + 1])), scales[:, :n_layers], self._layers[0])
+        biases = dequantise(T.from_numpy(np.array(self.biases[row:row + 1])), scales[:, n_layers:], self._layers[1])
+        return weights[0].numpy(), biases[0].numpy()
+
+    def network(self, generation: int) -> FFNN:
+        """
+        Builds the network of the best genome of a generation.
+        :param generation: the index of the generation, negative indices count from the last generation
+        :return: a network with its own float32 copy of the genome
+        """
+        weights, biases = self.genome(generation)
+        genomes = GenomeMatrix(1, self.features)
+        genomes.weights[0] = T.from_numpy(np.array(weights, dtype=np.float32))
+        genomes.biases[0] = T.from_numpy(np.array(biases, dtype=np.float32))
+        neural_network = FFNN(self.features)
+        genomes.attach(0, neural_network)
+        return neural_network
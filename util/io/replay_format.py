@@ -0,0 +1,254 @@
+"""
+Binary replay format for game sequences.
+
+A replay file starts with a fixed size header followed by one record per frame and ends with an index of the keyframes.
+A keyframe stores the whole snake and the food, every other frame only stores how the head moved, whether the tail
+moved along, and the food if it moved. Keyframes are written at the start, every keyframe_interval frames and whenever a
+frame cannot be expressed as a move of the previous one, so any frame can be reached by decoding at most
+keyframe_interval records. All values are little endian.
+
+    header:    magic "SNKR", version (uint16), grid_slots (uint32), food width and height (uint16), keyframe_interval
+               (uint16), n_frames (uint32), offset of the index (uint64)
+    keyframe:  KEYFRAME (uint8), length (uint16), length (x, y) pairs (int16) from head to tail, food (x, y) (int16)
+    move:      MOVE (uint8), flags (uint8), head delta (x, y) (int8), food (x, y) (int16) if the food moved
+    index:     n_keyframes (uint32), (frame (uint32), offset (uint64)) of every keyframe
+"""
+import itertools
+import struct
+from collections.abc import Sequence
+from typing import BinaryIO, Iterator, List, Union
+
+import numpy as np
+from pysnakegym.game import GameSequence
+from pysnakegym.game.core import Direction, Food, Snake, SnakeGameSequence
+
+MAGIC = b"SNKR"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHIHHHIQ")
+KEYFRAME = 0
+MOVE = 1
+GROW = 1
+FOOD_MOVED = 2
+
+_LENGTH = struct.Struct("<BH")
+_MOVE = struct.Struct("<BBbb")
+_INDEX_ENTRY = np.dtype([("frame", "<u4"), ("offset", "<u8")])
+
+
+def is_replay_file(path: str) -> bool:
+    """
+    Checks whether a file is a binary replay file or an older jsonpickle sequence file.
+    :param path: the path of the file
+    :return: True if the file starts with the magic bytes of the replay format
+    """
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def _positions(sequence: GameSequence) -> (np.array, np.array):
+    snake = sequence.snake
+    return snake.segments[:snake.tail_index].astype(np.int16), np.asarray(sequence.food.position()).astype(np.int16)
+
+
+class ReplayWriter(object):
+    """
+    Class that writes game sequences into a binary replay file one frame at a time.
+    """
+
+    def __init__(self, file: BinaryIO, grid_slots: int, width: int, height: int, keyframe_interval: int = 256):
+        """
+        Constructor for the ReplayWriter class.
+        :param file: a binary file that is open for writing and seeking, positioned at its start
+        :param grid_slots: the number of grid slots of the snakes
+        :param width: the width of the grid in which the food is placed
+        :param height: the height of the grid in which the food is placed
+        :param keyframe_interval: the maximum number of frames between two keyframes
+        """
+        self.file = file
+        self.grid_slots = grid_slots
+        self.width = width
+        self.height = height
+        self.keyframe_interval = keyframe_interval
+        self.n_frames = 0
+        self._keyframes = []
+        self._snake = None
+        self._food = None
+        self._since_keyframe = 0
+        self._write_header(0)
+
+    def _write_header(self, index_offset: int):
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.grid_slots, self.width, self.height, self.keyframe_interval,
+                                    self.n_frames, index_offset))
+
+    def add(self, sequence: GameSequence) -> None:
+        """
+        Appends a frame to the replay.
+        :param sequence: the sequence of the frame
+        :return: None
+        """
+        snake, food = _positions(sequence)
+        record = None
+        if self._snake is not None and self._since_keyframe < self.keyframe_interval:
+            record = self._move(snake, food)
+
+        if record is None:
+            self._keyframes.append((self.n_frames, self.file.tell()))
+            record = _LENGTH.pack(KEYFRAME, len(snake)) + snake.tobytes() + food.tobytes()
+            self._since_keyframe = 0
+
+        self.file.write(record)
+        self._snake, self._food = snake, food
+        self._since_keyframe += 1
+        self.n_frames += 1
+
+    def _move(self, snake: np.array, food: np.array):
+        """
+        Encodes a frame as a move of the previous frame.
+        :return: the record of the move, or None if the frame is not a move of the previous frame
+        """
+        previous = self._snake
+        grew = len(snake) == len(previous) + 1
+        if not (grew or len(snake) == len(previous)) or len(snake) == 0:
+            return None
+
+        delta = snake[0].astype(np.int64) - previous[0]
+        if np.abs(delta).max() > 127 or not np.array_equal(snake[1:], previous[:len(snake) - 1]):
+            return None
+
+        flags = GROW if grew else 0
+        food_moved = not np.array_equal(food, self._food)
+        if food_moved:
+            flags |= FOOD_MOVED
+
+        record = _MOVE.pack(MOVE, flags, int(delta[0]), int(delta[1]))
+        return record + food.tobytes() if food_moved else record
+
+    def close(self) -> None:
+        """
+        Writes the keyframe index and completes the header. The file itself is not closed.
+        :return: None
+        """
+        index_offset = self.file.tell()
+        self.file.write(struct.pack("<I", len(self._keyframes)))
+        self.file.write(np.array(self._keyframes, dtype=_INDEX_ENTRY).tobytes())
+        end = self.file.tell()
+        self.file.seek(0)
+        self._write_header(index_offset)
+        self.file.seek(end)
+
+
+class ReplayReader(Sequence):
+    """
+    Class that reads the frames of a binary replay file lazily. Frames can be iterated from any start frame or accessed
+    by index or slice, in which case decoding starts at the closest keyframe before the first frame.
+    """
+
+    def __init__(self, path: str):
+        """
+        Constructor for the ReplayReader class.
+        :param path: the path of the replay file
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            magic, version, self.grid_slots, self.width, self.height, self.keyframe_interval, self.n_frames, \
+                index_offset = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise Exception(f"{path} is not a replay file")
+            if version > VERSION:
+                raise Exception(f"{path} has version {version} of the replay format, only up to {VERSION} is supported")
+
+            file.seek(index_offset)
+            n_keyframes, = struct.unpack("<I", file.read(4))
+            self._keyframes = np.frombuffer(file.read(n_keyframes * _INDEX_ENTRY.itemsize), dtype=_INDEX_ENTRY)
+
+    def __len__(self):
+        return self.n_frames
+
+    def __getitem__(self, frame: Union[int, slice]) -> Union[GameSequence, List[GameSequence]]:
+        if isinstance(frame, slice):
+            # the frames of a slice are decoded in a single pass from the keyframe before its first frame
+            frames = range(*frame.indices(self.n_frames))
+            if len(frames) == 0:
+                return []
+            first = min(frames)
+            decoded = list(itertools.islice(self.frames(first), max(frames) - first + 1))
+            return [decoded[i - first] for i in frames]
+
+        if frame < 0:
+            frame += self.n_frames
+        if not 0 <= frame < self.n_frames:
+            raise IndexError(f"frame {frame} is out of range for a replay of {self.n_frames} frames")
+        frames = self.frames(frame)
+        try:
+            return next(frames)
+        finally:
+            frames.close()
+
+    def __iter__(self) -> Iterator[GameSequence]:
+        return self.frames()
+
+    def frames(self, start: int = 0) -> Iterator[GameSequence]:
+        """
+        Decodes the frames of the replay one at a time.
+        :param start: the first frame to be returned
+        :return: an iterator over the GameSequences of the frames from the start frame to the end of the replay
+        """
+        if self.n_frames == 0 or start >= self.n_frames:
+            return
+
+        keyframe = np.searchsorted(self._keyframes["frame"], start, side="right") - 1
+        frame, offset = int(self._keyframes["frame"][keyframe]), int(self._keyframes["offset"][keyframe])
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            snake, food = None, None
+            while frame < self.n_frames:
+                snake, food = self._read(file, snake, food)
+                if frame >= start:
+                    yield self._sequence(snake, food)
+                frame += 1
+
+    @staticmethod
+    def _read(file: BinaryIO, snake: np.array, food: np.array) -> (np.array, np.array):
+        record_type, = file.read(1)
+        if record_type == KEYFRAME:
+            length, = struct.unpack("<H", file.read(2))
+            snake = np.frombuffer(file.read(4 * length), dtype="<i2").reshape(length, 2)
+            return snake, np.frombuffer(file.read(4), dtype="<i2")
+
+        flags, dx, dy = struct.unpack("<Bbb", file.read(3))
+        head = snake[0] + np.array([dx, dy], dtype=np.int16)
+        body = snake if flags & GROW else snake[:-1]
+        snake = np.concatenate([head[np.newaxis], body])
+        if flags & FOOD_MOVED:
+            food = np.frombuffer(file.read(4), dtype="<i2")
+        return snake, food
+
+    def _sequence(self, snake: np.array, food: np.array) -> GameSequence:
+        position = snake.astype(np.float64)
+        game_snake = Snake(start_position=position[0], direction=Direction.STRAIGHT, snake_size=1,
+                           grid_slots=self.grid_slots)
+        game_snake.segments[:len(position)] = position
+        game_snake.tail_index = len(position)
+        return SnakeGameSequence(game_snake, Food(screen_width=self.width, screen_height=self.height,
+                                                  position=food.astype(np.int64)))
+
+
+def write_replay(path: str, game_sequences: List[GameSequence], keyframe_interval: int = 256) -> None:
+    """
+    Writes a list of game sequences into a binary replay file.
+    :param path: the path of the replay file
+    :param game_sequences: the sequences of the game
+    :param keyframe_interval: the maximum number of frames between two keyframes
+    :return: None
+    """
+    grid_slots, width, height = 0, 0, 0
+    if game_sequences:
+        grid_slots = game_sequences[0].snake.grid_slots
+        width, height = game_sequences[0].food.screen_width, game_sequences[0].food.screen_height
+
+    with open(path, "wb") as file:
+        writer = ReplayWriter(file, grid_slots, width, height, keyframe_interval)
+        for sequence in game_sequences:
+            writer.add(sequence)
+        writer.close()
@@ -0,0 +1,88 @@
+import queue
+import threading
+
+import numpy as np
+import pygame
+
+
+class VideoRecorder(object):
+    """
+    Class that encodes the frames of a pygame surface into an mp4 video without writing any images. Every frame is
+    copied into one of a fixed number of preallocated buffers and encoded by a background thread, which hands the
+    buffer back once the frame is written. If the encoder falls behind, recording a frame waits until a buffer is free,
+    so the memory of the recorder does not grow with the length of the game.
+    """
+
+    def __init__(self, path: str, frame_size: (int, int), fps: int = 60, n_buffers: int = 32):
+        """
+        Constructor for the VideoRecorder class.
+        :param path: the path of the mp4 file
+        :param frame_size: the width and height of the frames in pixels
+        :param fps: the frames per second of the video
+        :param n_buffers: the number of frames that can wait to be encoded
+        """
+        # opencv is only imported when a game is recorded
+        import cv2
+        width, height = frame_size
+        self.path = path
+        self.n_frames = 0
+        self._writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+        if not self._writer.isOpened():
+            raise Exception(f"The video {path} cannot be written")
+
+        self._free = queue.Queue()
+        for _ in range(n_buffers):
+            self._free.put(np.empty((height, width, 3), dtype=np.uint8))
+        self._frames = queue.Queue(maxsize=n_buffers)
+        self._error = None
+        self._thread = threading.Thread(target=self._encode, name="VideoRecorder", daemon=True)
+        self._thread.start()
+
+    def _encode(self):
+        while True:
+            frame = self._frames.get()
+            if frame is None:
+                break
+            try:
+                if self._error is None:
+                    self._writer.write(frame)
+            except Exception as e:
+                # the error is raised in the recording thread by the next frame or by close
+                self._error = e
+            self._free.put(frame)
+        self._writer.release()
+
+    def record(self, surface: pygame.Surface) -> None:
+        """
+        Copies the pixels of a surface into a free buffer and queues it to be encoded.
+        :param surface: the surface, e.g. the window of a game, of the size of the frames
+        :return: None
+        """
+        if self._error is not None:
+            raise self._error
+
+        frame = self._free.get()
+        pixels = pygame.surfarray.pixels3d(surface)
+        # pygame indexes pixels by (x, y) in RGB, opencv expects rows of BGR pixels
+        np.copyto(frame, pixels.transpose(1, 0, 2)[:, :, ::-1])
+        # the surface is locked while its pixels are referenced
+        del pixels
+        self._frames.put(frame)
+        self.n_frames += 1
+
+    def close(self) -> None:
+        """
+        Waits until all queued frames are encoded and closes the video.
+        :return: None
+        """
+        if self._thread.is_alive():
+            self._frames.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,31 @@
+import importlib
+import sys
+import types
+from typing import Dict
+
+
+def lazy_attributes(package: str, attributes: Dict[str, str]) -> None:
+    """
+    Makes the attributes of a package import their module when they are first accessed, so that importing the package
+    does not import the heavy dependencies of all of its modules. It works like a module level __getattr__, which is
+    only available from python 3.7, by changing the class of the module of the package.
+    :param package: the name of the package, i.e. __name__ in its __init__.py
+    :param attributes: the name of every attribute and the module it is imported from
+    :return: None
+    """
+
+    class LazyModule(types.ModuleType):
+
+        def __getattr__(self, name: str):
+            if name not in attributes:
+                raise AttributeError(f"module {package} has no attribute {name}")
+
+            value = getattr(importlib.import_module(attributes[name]), name)
+            # the attribute is only imported once, later accesses find it in the module
+            setattr(self, name, value)
+            return value
+
+        def __dir__(self):
+            return sorted(set(super().__dir__()) | set(attributes))
+
+    sys.modules[package].__class__ = LazyModule